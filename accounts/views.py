@@ -876,20 +876,31 @@ class UserBooksView(APIView):
                 )
 
             from django.core.paginator import Paginator
-            from books.serializers import BookListSerializer
+            from books.cards import CARD_COLUMNS, card_list
+            from books.pagination import (
+                SavedBookCursorPagination,
+                paginate_with_cursor,
+                wants_cursor_pagination,
+            )
+
+            # 비정규화된 도서 카드만 조회 (카테고리 JOIN 없음)
+            books = user.saved_books.order_by("-id").values(*CARD_COLUMNS)
 
-            books = user.saved_books.all().order_by("-id")
+            # 커서 페이지네이션 (COUNT/OFFSET 없음)
+            if wants_cursor_pagination(request):
+                page, meta = paginate_with_cursor(
+                    SavedBookCursorPagination, books, request, view=self
+                )
+                return Response({"results": card_list(page), **meta})
 
             # 페이지네이션
             page = request.GET.get("page", 1)
             paginator = Paginator(books, 10)
             page_obj = paginator.get_page(page)
 
-            serializer = BookListSerializer(page_obj, many=True)
-
             return Response(
                 {
-                    "results": serializer.data,
+                    "results": card_list(page_obj),
                     "count": paginator.count,
                     "num_pages": paginator.num_pages,
                     "current_page": page_obj.number,
@@ -986,9 +997,22 @@ class UserThreadsView(APIView):
             from django.core.paginator import Paginator
             from books.serializers import ThreadListSerializer
             from books.models import Thread
+            from books.pagination import (
+                ThreadCursorPagination,
+                paginate_with_cursor,
+                wants_cursor_pagination,
+            )
 
             threads = Thread.objects.filter(user=user).order_by("-created_at")
 
+            # 커서 페이지네이션 (COUNT/OFFSET 없음)
+            if wants_cursor_pagination(request):
+                page, meta = paginate_with_cursor(
+                    ThreadCursorPagination, threads, request, view=self
+                )
+                serializer = ThreadListSerializer(page, many=True)
+                return Response({"results": serializer.data, **meta})
+
             # 페이지네이션
             page = request.GET.get("page", 1)
             paginator = Paginator(threads, 10)
@@ -1018,20 +1042,41 @@ class BookSaveToggleView(APIView):
 
     def post(self, request, book_id):
         try:
+            from django.db import transaction
+            from django.db.models import F
+            from books.detail_cache import invalidate_detail, invalidate_saved_books
             from books.models import Book
 
-            book = Book.objects.get(id=book_id)
-
-            if request.user.saved_books.filter(id=book_id).exists():
-                request.user.saved_books.remove(book)
-                is_saved = False
-                message = "책이 저장 목록에서 제거되었습니다."
-            else:
-                request.user.saved_books.add(book)
-                is_saved = True
-                message = "책이 저장 목록에 추가되었습니다."
-
-            saved_count = book.saved_by_users.count()
+            book = Book.objects.only("id").get(id=book_id)
+            SavedBook = User.saved_books.through
+
+            with transaction.atomic():
+                # 삭제/생성된 행 수로 판단해 동시 요청에도 카운터가 어긋나지 않도록 함
+                removed, _ = SavedBook.objects.filter(
+                    user=request.user, book=book
+                ).delete()
+                if removed:
+                    delta = -removed
+                    is_saved = False
+                    message = "책이 저장 목록에서 제거되었습니다."
+                else:
+                    _, created = SavedBook.objects.get_or_create(
+                        user=request.user, book=book
+                    )
+                    delta = 1 if created else 0
+                    is_saved = True
+                    message = "책이 저장 목록에 추가되었습니다."
+
+                # 저장 수 카운터를 DB에서 원자적으로 증감 (COUNT 재계산 없음)
+                books = Book.objects.filter(id=book_id)
+                if delta:
+                    books.update(saved_count=F("saved_count") + delta)
+                saved_count = books.values_list("saved_count", flat=True)[0]
+
+            # 사용자별 저장 ID 집합과 (저장 수가 바뀐) 공용 상세 캐시 무효화
+            invalidate_saved_books(request.user)
+            if delta:
+                invalidate_detail(book_id)
 
             return Response(
                 {"is_saved": is_saved, "saved_count": saved_count, "message": message}
@@ -0,0 +1,201 @@
+"""
+도서 검색용 텍스트 분석기
+- 정규화 (유니코드 NFKC, 소문자화)
+- 토큰화 (단어 + 한글 음절 n-gram + 영문/숫자 문자 3-gram)
+- 형태소 분석 (MeCab + 한국어 사전이 설정된 경우)
+- 초성 키 추출 ("한강" -> "ㅎㄱ")
+"""
+
+import logging
+import re
+import unicodedata
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+HANGUL_RE = re.compile(r"[가-힣]")
+
+# 검색 색인 대상 필드
+SEARCH_FIELDS = ("title", "author", "publisher", "description")
+
+# 한글 초성 (유니코드 음절 순서)
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+CHOSUNG_QUERY_RE = re.compile(r"^[ㄱ-ㅎ\s]+$")
+
+# 검색 토큰으로 사용하는 형태소 품사 (mecab-ko-dic 기준)
+CONTENT_POS = ("NNG", "NNP", "NR", "SL", "SH", "SN", "VV", "VA", "XR")
+
+
+def normalize_text(text):
+    """검색용 텍스트 정규화 (NFKC + 소문자)"""
+    if not text:
+        return ""
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def _hangul_ngrams(word):
+    """한글 단어를 음절 unigram/bigram으로 분해"""
+    grams = list(word)
+    grams.extend(word[i : i + 2] for i in range(len(word) - 1))
+    return grams
+
+
+def _trigrams(word):
+    """영문/숫자 단어를 문자 3-gram으로 분해 (단어 중간 부분 일치용)"""
+    return [word[i : i + 3] for i in range(len(word) - 2)]
+
+
+def _unique(terms):
+    return list(dict.fromkeys(terms))
+
+
+class NgramAnalyzer:
+    """단어 + 한글 음절 n-gram + 영문/숫자 3-gram 분석기 (외부 의존성 없음)"""
+
+    # 토큰 형식이 바뀌면 이름을 바꿔 저장된 검색 토큰을 다시 분석하게 함
+    name = "ngram-v2"
+
+    def tokenize(self, text):
+        """
+        문서 색인용 토큰 목록 반환
+        한글 단어는 조사/어미가 붙어도 부분 일치하도록 음절 n-gram을,
+        영문/숫자 단어는 단어 일부로도 찾을 수 있도록("cook" -> "Cookbook") 3-gram을 함께 색인합니다.
+        """
+        tokens = []
+        for word in WORD_RE.findall(normalize_text(text)):
+            tokens.append(word)
+            if HANGUL_RE.search(word):
+                if len(word) > 1:
+                    tokens.extend(_hangul_ngrams(word))
+            elif len(word) > 3:
+                tokens.extend(_trigrams(word))
+        return tokens
+
+    def ngram_terms(self, query):
+        """
+        검색어의 필수 토큰 목록
+        3자 미만의 영문/숫자 단어는 단어 전체가 일치해야 합니다.
+        """
+        terms = []
+        for word in WORD_RE.findall(normalize_text(query)):
+            if HANGUL_RE.search(word) and len(word) > 1:
+                terms.extend(word[i : i + 2] for i in range(len(word) - 1))
+            elif not HANGUL_RE.search(word) and len(word) > 3:
+                terms.extend(_trigrams(word))
+            else:
+                terms.append(word)
+        return _unique(terms)
+
+    def query_term_sets(self, query):
+        """
+        검색어를 색인 조회용 필수 토큰 집합 목록으로 변환
+        앞의 집합부터 시도하며, 각 집합의 모든 토큰을 포함한 문서만 검색 결과가 됩니다.
+        """
+        return [self.ngram_terms(query)]
+
+
+class MecabAnalyzer(NgramAnalyzer):
+    """
+    MeCab 형태소 분석기
+    활용형("읽었다")을 원형("읽")으로 색인해 굴절형도 검색되도록 합니다.
+    """
+
+    name = "mecab-v2"
+
+    def __init__(self, tagger):
+        self.tagger = tagger
+
+    def morphemes(self, text):
+        terms = []
+        node = self.tagger.parseToNode(normalize_text(text))
+        while node:
+            features = node.feature.split(",")
+            pos = features[0]
+            if node.surface and pos.split("+")[0] in CONTENT_POS:
+                if len(features) > 7 and features[4] == "Inflect":
+                    # 예: 읽/VV/*+었/EP/*+다/EF/* -> 읽
+                    terms.append(features[7].split("/")[0])
+                else:
+                    terms.append(node.surface)
+            node = node.next
+        return terms
+
+    def tokenize(self, text):
+        return self.morphemes(text) + super().tokenize(text)
+
+    def query_term_sets(self, query):
+        # 형태소 일치를 먼저 시도하고, 없으면 n-gram 부분 일치로 검색
+        return [_unique(self.morphemes(query)), self.ngram_terms(query)]
+
+
+_analyzer = None
+
+
+def get_analyzer():
+    """
+    설정에 맞는 분석기 반환
+    MECAB_DICDIR(mecab-ko-dic 경로)이 설정되어 있고 MeCab을 불러올 수 있을 때만
+    형태소 분석기를 사용합니다.
+    """
+    global _analyzer
+    if _analyzer is not None:
+        return _analyzer
+
+    dicdir = getattr(settings, "MECAB_DICDIR", "")
+    if dicdir:
+        try:
+            import MeCab
+
+            _analyzer = MecabAnalyzer(MeCab.Tagger(f"-d {dicdir}"))
+            logger.info(f"🔤 [Analyzer] MeCab 형태소 분석기 사용: {dicdir}")
+        except (ImportError, RuntimeError) as e:
+            logger.warning(f"⚠️ MeCab 로드 실패, n-gram 분석기 사용: {e}")
+    if _analyzer is None:
+        _analyzer = NgramAnalyzer()
+    return _analyzer
+
+
+def tokenize(text):
+    return get_analyzer().tokenize(text)
+
+
+def query_term_sets(query):
+    return get_analyzer().query_term_sets(query)
+
+
+def analyze_fields(values, fields=SEARCH_FIELDS):
+    """
+    필드별 텍스트를 한 번에 분석해 저장용 토큰 사전으로 반환
+    예: {"analyzer": "ngram-v2", "title": [...], "author": [...]}
+    """
+    analyzer = get_analyzer()
+    tokens = {"analyzer": analyzer.name}
+    for field in fields:
+        tokens[field] = analyzer.tokenize(values.get(field, ""))
+    return tokens
+
+
+def to_chosung(text):
+    """
+    텍스트를 초성 키로 변환 (단어 구분 공백 유지)
+    예: "소년이 온다" -> "ㅅㄴㅇ ㅇㄷ", 영문/숫자는 소문자로 그대로 유지
+    """
+    chars = []
+    for char in normalize_text(text):
+        if "가" <= char <= "힣":
+            chars.append(CHOSUNG[(ord(char) - 0xAC00) // 588])
+        elif char.isspace():
+            if chars and chars[-1] != " ":
+                chars.append(" ")
+        elif char.isalnum():
+            chars.append(char)
+    return "".join(chars).strip()
+
+
+def is_chosung_query(query):
+    """초성으로만 이루어진 검색어인지 확인 (예: "ㅎㄱ")"""
+    # NFKC는 호환용 자모(ㅎ)를 조합용 자모로 바꾸므로 NFC만 적용
+    query = unicodedata.normalize("NFC", query or "").strip()
+    return bool(query) and bool(CHOSUNG_QUERY_RE.match(query))
@@ -0,0 +1,153 @@
+"""
+근사 최근접 이웃(ANN) 인덱스 - IVF (Inverted File)
+- 구면 k-means로 임베딩을 n_lists개 목록으로 나누고 목록별 행 번호를 저장
+- 검색 시 질의와 가까운 nprobe개 목록의 행만 점수 계산 (nprobe가 클수록 재현율↑, 지연↑)
+- 임베딩 저장소 옆에 .npz로 저장하고 워커는 처음 검색할 때 적재
+"""
+
+import time
+
+import numpy as np
+
+from .embeddings import EMBEDDING_DTYPE, SIMILARITY_BLOCK_SIZE, normalize_rows
+
+# 검색 시 기본 탐색 목록 수
+DEFAULT_NPROBE = 8
+# k-means 학습에 사용할 목록당 최대 샘플 수
+KMEANS_SAMPLES_PER_LIST = 256
+
+
+def default_n_lists(size):
+    """목록 수 기본값 (약 4 * sqrt(N))"""
+    return max(1, min(size, int(4 * np.sqrt(size))))
+
+
+def assign_lists(matrix, centroids, block_size=SIMILARITY_BLOCK_SIZE):
+    """각 행을 가장 가까운 중심점 번호로 배정 (블록 단위)"""
+    assign = np.empty(matrix.shape[0], dtype=np.int64)
+    for offset in range(0, matrix.shape[0], block_size):
+        block = matrix[offset : offset + block_size]
+        assign[offset : offset + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assign
+
+
+def _kmeans(matrix, n_lists, iterations, rng):
+    """구면 k-means 중심점 학습 (샘플 행 사용, 중심점은 정규화)"""
+    size = matrix.shape[0]
+    sample_size = min(size, n_lists * KMEANS_SAMPLES_PER_LIST)
+    sample = np.asarray(
+        matrix[np.sort(rng.choice(size, sample_size, replace=False))],
+        dtype=EMBEDDING_DTYPE,
+    )
+    centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+
+    for _ in range(iterations):
+        assign = assign_lists(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+
+        # 빈 목록은 임의의 샘플로 다시 시작
+        empty = np.bincount(assign, minlength=n_lists) == 0
+        if empty.any():
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+class IVFIndex:
+    """중심점과 목록별 행 번호 (order[offsets[i]:offsets[i + 1]] = i번 목록)"""
+
+    def __init__(self, centroids, order, offsets, nprobe=DEFAULT_NPROBE):
+        self.centroids = np.asarray(centroids, dtype=EMBEDDING_DTYPE)
+        self.order = np.asarray(order, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.nprobe = int(nprobe)
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    def __len__(self):
+        return len(self.order)
+
+    @classmethod
+    def build(cls, matrix, n_lists=None, nprobe=DEFAULT_NPROBE, iterations=10, seed=0):
+        """정규화된 임베딩 행렬로 인덱스 생성"""
+        size = matrix.shape[0]
+        n_lists = min(n_lists or default_n_lists(size), size)
+        centroids = _kmeans(matrix, n_lists, iterations, np.random.default_rng(seed))
+        assign = assign_lists(matrix, centroids)
+
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=n_lists)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        return cls(centroids, order, offsets, nprobe)
+
+    def probe(self, query_vector, nprobe=None, min_rows=0):
+        """
+        질의와 가까운 nprobe개 목록에 속한 행 번호
+        행 수가 min_rows보다 적으면 다음으로 가까운 목록을 더 탐색 (결과 수 보장)
+        """
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        lists = np.argsort(-(self.centroids @ query_vector))
+        sizes = np.cumsum(np.diff(self.offsets)[lists])
+        enough = int(np.searchsorted(sizes, min_rows)) + 1
+        lists = lists[: max(nprobe, min(enough, self.n_lists))]
+        return np.concatenate(
+            [self.order[self.offsets[i] : self.offsets[i + 1]] for i in lists]
+        )
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                centroids=self.centroids,
+                order=self.order,
+                offsets=self.offsets,
+                nprobe=self.nprobe,
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                data["centroids"], data["order"], data["offsets"], int(data["nprobe"])
+            )
+
+
+def recall_report(index, ivf, nprobes, k=10, queries=200, seed=0):
+    """
+    임의의 도서를 질의로 삼아 전수 검색 대비 ANN 재현율/지연 측정
+    index: VectorIndex (전수 검색 기준)
+    반환값: [{"nprobe", "recall", "ann_ms", "exact_ms", "scanned"}, ...]
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(index), min(queries, len(index)), replace=False)
+    queries = [np.asarray(index.matrix[row]) for row in rows]
+
+    start = time.perf_counter()
+    exact = [
+        {book_id for book_id, _ in index.search(q, k, exact=True)} for q in queries
+    ]
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    report = []
+    for nprobe in nprobes:
+        start = time.perf_counter()
+        found = [index.search(q, k, nprobe=nprobe, ann=ivf) for q in queries]
+        ann_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        hits = sum(
+            len(truth & {book_id for book_id, _ in result})
+            for truth, result in zip(exact, found)
+        )
+        scanned = np.mean([len(ivf.probe(q, nprobe, min_rows=k)) for q in queries])
+        report.append(
+            {
+                "nprobe": nprobe,
+                "recall": hits / max(sum(len(truth) for truth in exact), 1),
+                "ann_ms": ann_ms,
+                "exact_ms": exact_ms,
+                "scanned": float(scanned / len(index)),
+            }
+        )
+    return report
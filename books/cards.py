@@ -0,0 +1,66 @@
+"""
+도서 카드 (목록 응답용 비정규화 데이터)
+- Book.card에 저장된 카드를 JOIN/시리얼라이저 없이 그대로 응답
+- 카드가 아직 없는 도서(백필 전)는 한 번의 쿼리로 계산해 채움
+"""
+
+from .fieldsets import requested_fieldset
+from .models import Book
+
+# 목록 응답 필드 (BookListSerializer와 동일)
+CARD_FIELDS = (
+    "id",
+    "title",
+    "cover",
+    "author",
+    "publisher",
+    "pub_date",
+    "subTitle",
+    "category_name",
+)
+CARD_COLUMNS = ("id", "card")
+
+
+def _fill_missing(rows):
+    """카드가 비어 있는 행을 원본 컬럼으로 계산해 채움"""
+    missing = [row["id"] for row in rows if not row["card"]]
+    if not missing:
+        return
+    books = Book.objects.select_related("category").in_bulk(missing)
+    for row in rows:
+        book = books.get(row["id"])
+        if not row["card"] and book is not None:
+            book.refresh_card()
+            row["card"] = book.card
+
+
+def _select(request):
+    """요청된 필드셋(?fields=/?exclude=)에 맞는 카드 필드 목록"""
+    fields, exclude = requested_fieldset(request)
+    names = [name for name in CARD_FIELDS if not fields or name in fields]
+    return [name for name in names if name not in exclude]
+
+
+def card_list(rows, request=None):
+    """
+    values("id", "card") 행 목록을 응답용 카드 목록으로 변환
+    반환값: [{"id": 1, "title": ..., "category_name": ...}, ...] (입력 순서 유지)
+    """
+    rows = list(rows)
+    _fill_missing(rows)
+    names = _select(request)
+    cards = []
+    for row in rows:
+        card = {"id": row["id"], **row["card"]}
+        cards.append({name: card.get(name) for name in names})
+    return cards
+
+
+def cards_in_order(book_ids, request=None):
+    """도서 ID 순서대로 카드 목록 반환 (없는 ID는 제외, 쿼리 한 번)"""
+    rows = Book.objects.filter(id__in=book_ids).values(*CARD_COLUMNS)
+    rows_by_id = {row["id"]: row for row in rows}
+    return card_list(
+        [rows_by_id[book_id] for book_id in book_ids if book_id in rows_by_id],
+        request,
+    )
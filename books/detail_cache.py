@@ -0,0 +1,136 @@
+"""
+도서 상세 캐시
+- 사용자와 무관한 상세 응답을 도서당 한 번만 캐싱
+- 사용자별 필드(is_saved)는 응답 시점에 사용자별 저장 도서 ID 집합으로 덮어씀
+- 도서별 버전 키로 모든 필드셋 변형을 한 번에 무효화
+  (없는 ID 요청으로 키가 쌓이지 않도록 상세 캐시보다 긴 만료 시간 사용)
+- 연관 도서 버전(공용)을 함께 사용해 연관 도서 재생성 시 모든 상세를 무효화
+- ?related=k 로 연관 도서 수 지정 (저장된 순위 범위 내)
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .fieldsets import fieldset_cache_key, requested_fieldset
+from .versions import bump_version, get_version, get_versions
+
+# 연관 도서 기본/최대 개수
+RELATED_DEFAULT = 3
+RELATED_MAX = 20
+
+
+# === 공용 상세 응답 ===
+
+
+def _detail_version_ttl():
+    """도서별 버전 토큰 만료 시간 (상세 캐시 TTL 이상, 만료되면 새 버전)"""
+    return settings.CACHE_TTL * 2
+
+
+def _detail_version_key(book_id):
+    return f"{settings.CACHE_KEY_PREFIX}:book_detail:{book_id}:version"
+
+
+def _related_version_key():
+    return f"{settings.CACHE_KEY_PREFIX}:book_related:version"
+
+
+def _combine(book_version, related_version):
+    return f"{book_version}.{related_version}"
+
+
+def detail_version(book_id):
+    """도서 상세 버전 (도서별 버전 + 연관 도서 버전)"""
+    book_version = get_version(_detail_version_key(book_id), _detail_version_ttl())
+    return _combine(book_version, get_version(_related_version_key()))
+
+
+def invalidate_detail(book_id):
+    """도서 상세 캐시 무효화 (도서 수정, 저장 수 변경 시)"""
+    bump_version(_detail_version_key(book_id), _detail_version_ttl())
+
+
+def invalidate_related():
+    """연관 도서가 바뀌면 모든 도서 상세 캐시 무효화 (연관 도서 재생성/적재 후 호출)"""
+    bump_version(_related_version_key())
+
+
+def related_limit(request):
+    """요청된 연관 도서 수 (?related=k, 0 ~ RELATED_MAX)"""
+    try:
+        limit = int(request.GET.get("related", RELATED_DEFAULT))
+    except (ValueError, TypeError):
+        return RELATED_DEFAULT
+    return max(0, min(limit, RELATED_MAX))
+
+
+def _detail_cache_key(book_id, version, request):
+    cache_key = (
+        f"{settings.CACHE_KEY_PREFIX}:book_detail_with_related:{book_id}:v{version}"
+    )
+    if any(requested_fieldset(request)):
+        cache_key = f"{cache_key}:{fieldset_cache_key(request)}"
+    limit = related_limit(request)
+    if limit != RELATED_DEFAULT:
+        cache_key = f"{cache_key}:related_{limit}"
+    return cache_key
+
+
+def detail_cache_key(book_id, request):
+    """도서 상세 공용 캐시 키 (필드셋 포함, 사용자 정보 제외)"""
+    return _detail_cache_key(book_id, detail_version(book_id), request)
+
+
+def detail_cache_keys(book_ids, request):
+    """여러 도서의 상세 캐시 키 {book_id: key} (버전 키를 한 번에 조회)"""
+    version_keys = {book_id: _detail_version_key(book_id) for book_id in book_ids}
+    versions = get_versions(list(version_keys.values()), _detail_version_ttl())
+    related_version = get_version(_related_version_key())
+    return {
+        book_id: _detail_cache_key(
+            book_id, _combine(versions[key], related_version), request
+        )
+        for book_id, key in version_keys.items()
+    }
+
+
+# === 사용자별 오버레이 ===
+
+
+def _saved_books_key(user_id):
+    return f"{settings.CACHE_KEY_PREFIX}:user:{user_id}:saved_book_ids"
+
+
+def saved_book_ids(user):
+    """사용자가 저장한 도서 ID 집합 (캐시 미스 시 쿼리 한 번)"""
+    key = _saved_books_key(user.id)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(user.saved_books.values_list("id", flat=True))
+        cache.set(key, ids, settings.CACHE_TTL)
+    return ids
+
+
+def invalidate_saved_books(user):
+    """저장 도서 변경 시 사용자별 ID 집합 무효화"""
+    cache.delete(_saved_books_key(user.id))
+
+
+def request_saved_book_ids(request):
+    """현재 요청 사용자의 저장 도서 ID 집합 (비로그인 시 빈 집합)"""
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return frozenset()
+    return saved_book_ids(user)
+
+
+def apply_user_overlay(data, request, book_id, saved_ids=None):
+    """
+    공용 상세 응답에 현재 사용자의 필드를 덮어쓴 사본 반환
+    saved_ids: 미리 조회한 저장 도서 ID 집합 (여러 도서에 적용할 때 한 번만 조회)
+    """
+    if "is_saved" not in data:
+        return data
+    if saved_ids is None:
+        saved_ids = request_saved_book_ids(request)
+    return {**data, "is_saved": int(book_id) in saved_ids}
@@ -0,0 +1,167 @@
+"""
+임베딩 워커 (Redis 리스트 기반 요청 큐)
+- 모델은 run_embedding_worker 프로세스에서 한 번만 로드
+- 웹 워커는 요청 큐에 문장을 넣고 요청별 응답 키에서 벡터를 기다림 (타임아웃)
+- 워커는 짧은 시간(batch_wait_ms) 동안 들어온 요청을 모아 한 번에 인코딩
+"""
+
+import json
+import logging
+import time
+import uuid
+
+import numpy as np
+from django.conf import settings
+
+from .embeddings import EMBEDDING_DTYPE
+
+logger = logging.getLogger(__name__)
+
+# 응답 상태 (응답 바이트의 첫 바이트)
+REPLY_OK = b"\x00"
+REPLY_ERROR = b"\x01"
+# 응답 키 유지 시간 (클라이언트가 타임아웃으로 떠난 경우 정리)
+REPLY_TTL = 60
+
+
+class EmbeddingWorkerError(Exception):
+    """임베딩 워커 오류 (인코딩 실패)"""
+
+
+class EmbeddingWorkerTimeout(EmbeddingWorkerError):
+    """제한 시간 안에 임베딩 워커 응답이 없음"""
+
+
+def get_connection():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection("default")
+
+
+def queue_key():
+    return f"{settings.CACHE_KEY_PREFIX}:embedding_worker:requests"
+
+
+def reply_key(request_id):
+    return f"{settings.CACHE_KEY_PREFIX}:embedding_worker:reply:{request_id}"
+
+
+# === 클라이언트 (웹 워커) ===
+
+
+def encode_remote(texts, timeout=None, conn=None):
+    """
+    임베딩 워커에 문장 인코딩 요청
+    반환값: float32 행렬 [len(texts), dim] (정규화 전)
+    """
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, 0), dtype=EMBEDDING_DTYPE)
+    timeout = timeout or settings.EMBEDDING_WORKER_TIMEOUT
+    conn = conn or get_connection()
+
+    request_id = uuid.uuid4().hex
+    payload = {"id": request_id, "texts": texts, "deadline": time.time() + timeout}
+    conn.lpush(queue_key(), json.dumps(payload, ensure_ascii=False))
+
+    item = conn.blpop(reply_key(request_id), timeout=timeout)
+    if item is None:
+        raise EmbeddingWorkerTimeout(f"임베딩 워커 응답 없음 ({timeout}초)")
+
+    data = item[1]
+    if data[:1] != REPLY_OK:
+        raise EmbeddingWorkerError(data[1:].decode("utf-8", "replace"))
+    return np.frombuffer(data[1:], dtype=EMBEDDING_DTYPE).reshape(len(texts), -1)
+
+
+# === 워커 ===
+
+
+def parse_request(raw):
+    """
+    큐 페이로드를 요청 dict로 변환
+    형식이 잘못된 페이로드는 로그를 남기고 None (워커는 버리고 계속 처리)
+    """
+    try:
+        request = json.loads(raw)
+        if not (
+            isinstance(request, dict)
+            and "id" in request
+            and isinstance(request.get("texts"), list)
+        ):
+            raise TypeError("id와 문자열 목록 texts가 필요합니다.")
+        request["deadline"] = float(request["deadline"])
+    except (ValueError, TypeError, KeyError) as e:
+        logger.warning(f"⚠️ [EmbeddingWorker] 잘못된 요청 버림 ({e!r}): {raw!r:.200}")
+        return None
+    return request
+
+
+def collect_batch(conn, max_texts, wait, block_timeout=1):
+    """
+    요청을 하나 기다린 뒤 wait초 동안 추가 요청을 모아 반환
+    max_texts: 한 배치에 담을 최대 문장 수
+    반환값: 요청 dict 목록 (기한이 지난 요청은 제외)
+    """
+    item = conn.brpop(queue_key(), timeout=block_timeout)
+    if item is None:
+        return []
+
+    first = parse_request(item[1])
+    if first is None:
+        return []
+
+    requests = [first]
+    size = len(first["texts"])
+    deadline = time.monotonic() + wait
+    while size < max_texts:
+        raw = conn.rpop(queue_key())
+        if raw is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, 0.001))
+            continue
+        request = parse_request(raw)
+        if request is None:
+            continue
+        requests.append(request)
+        size += len(request["texts"])
+
+    now = time.time()
+    expired = [request for request in requests if request["deadline"] < now]
+    if expired:
+        logger.warning(f"⚠️ [EmbeddingWorker] 기한이 지난 요청 {len(expired)}건 건너뜀")
+    return [request for request in requests if request["deadline"] >= now]
+
+
+def serve_batch(conn, encode, requests):
+    """
+    모은 요청의 문장을 한 번에 인코딩하고 요청별 응답 키로 전달
+    encode: 문장 목록 -> float32 행렬
+    """
+    texts = [text for request in requests for text in request["texts"]]
+    if not texts:
+        return 0
+
+    pipe = conn.pipeline()
+    try:
+        vectors = np.asarray(encode(texts), dtype=EMBEDDING_DTYPE)
+    except Exception as e:
+        logger.exception("❌ [EmbeddingWorker] 인코딩 실패")
+        for request in requests:
+            key = reply_key(request["id"])
+            pipe.rpush(key, REPLY_ERROR + str(e).encode("utf-8"))
+            pipe.expire(key, REPLY_TTL)
+        pipe.execute()
+        return 0
+
+    offset = 0
+    for request in requests:
+        count = len(request["texts"])
+        key = reply_key(request["id"])
+        pipe.rpush(key, REPLY_OK + vectors[offset : offset + count].tobytes())
+        pipe.expire(key, REPLY_TTL)
+        offset += count
+    pipe.execute()
+    return len(texts)
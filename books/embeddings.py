@@ -0,0 +1,408 @@
+"""
+도서 임베딩 벡터 관리
+- 임베딩 모델 로드 (프로세스당 한 번)
+- BookEmbedding.vector(float32 bytes)를 정규화된 행렬로 메모리에 적재
+- 코사인 유사도 기반 의미 검색 (행렬 곱 한 번)
+"""
+
+import hashlib
+import logging
+import threading
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+
+from .versions import bump_version, get_version
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+EMBEDDING_DTYPE = np.float32
+
+
+def book_text(title, author, category_name, description):
+    """임베딩에 사용하는 도서 텍스트 (생성 커맨드와 동일한 형식)"""
+    return f"제목: {title} 저자: {author} 카테고리: {category_name} 설명: {description}"
+
+
+def content_hash(text):
+    """임베딩 입력 텍스트 해시 (모델이 바뀌면 해시도 바뀌어 다시 인코딩됨)"""
+    value = f"{EMBEDDING_MODEL_NAME}\n{text}".encode("utf-8")
+    return hashlib.sha256(value).hexdigest()
+
+
+def vector_to_bytes(vector):
+    return np.asarray(vector, dtype=EMBEDDING_DTYPE).tobytes()
+
+
+def bytes_to_vector(data):
+    return np.frombuffer(data, dtype=EMBEDDING_DTYPE)
+
+
+def normalize_rows(matrix):
+    """행 단위 L2 정규화 (내적 = 코사인 유사도)"""
+    matrix = np.asarray(matrix, dtype=EMBEDDING_DTYPE)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+# === 연관 도서 ===
+
+
+# 유사도 계산 블록 크기 (블록 x 전체 행 수만큼의 float32 행렬만 메모리에 유지)
+SIMILARITY_BLOCK_SIZE = 256
+
+
+def top_k_blocks(matrix, rows, k, block_size=SIMILARITY_BLOCK_SIZE):
+    """
+    정규화된 행렬에서 rows 각 행의 상위 k개 이웃을 블록 단위로 계산 (자기 자신 제외)
+    N x N 유사도 행렬을 만들지 않고 블록 x N 행렬에 argpartition 적용
+    yield: (블록 행 번호 배열, 이웃 행 번호 배열 [블록, k], 점수 배열 [블록, k])
+    """
+    rows = np.asarray(list(rows), dtype=np.int64)
+    k = min(k, matrix.shape[0] - 1)
+    if not len(rows) or k <= 0:
+        return
+
+    for offset in range(0, len(rows), block_size):
+        block = rows[offset : offset + block_size]
+        scores = matrix[block] @ matrix.T
+        scores[np.arange(len(block)), block] = -np.inf
+
+        top = np.argpartition(scores, -k, axis=1)[:, -k:]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        yield (
+            block,
+            np.take_along_axis(top, order, axis=1),
+            np.take_along_axis(top_scores, order, axis=1),
+        )
+
+
+def rank_neighbours(matrix, rows, k, block_size=SIMILARITY_BLOCK_SIZE):
+    """
+    정규화된 행렬에서 rows 각 행의 상위 k개 이웃 (자기 자신 제외)
+    반환값: {row: [(col, score), ...]} 유사도 내림차순
+    """
+    result = {int(row): [] for row in rows}
+    for block, top, top_scores in top_k_blocks(matrix, list(result), k, block_size):
+        for row, cols, scores in zip(block.tolist(), top.tolist(), top_scores.tolist()):
+            result[row] = list(zip(cols, scores))
+    return result
+
+
+def rows_needing_neighbours(
+    matrix, changed, current, k, block_size=SIMILARITY_BLOCK_SIZE
+):
+    """
+    일부 행의 벡터가 바뀌었을 때 연관 도서를 다시 계산해야 하는 행 집합
+    current: {row: [(col, score), ...]} 저장된 연관 도서 (없는 행은 재계산)
+    - 새로 인코딩한 행
+    - 저장된 목록이 k개보다 짧거나, 점수가 없거나, 바뀐 행을 포함하는 행
+    - 바뀐 행과의 유사도가 저장된 마지막 순위 점수보다 높은 행
+    """
+    changed = set(changed)
+    needs = set(changed)
+    size = matrix.shape[0]
+    expected = min(k, size - 1)
+
+    # 바뀐 행을 블록 단위로 나눠 각 행과의 최대 유사도 계산 (N x 블록)
+    best = np.full(size, -np.inf, dtype=EMBEDDING_DTYPE)
+    columns = np.fromiter(changed, dtype=np.int64)
+    for offset in range(0, len(columns), block_size):
+        block = columns[offset : offset + block_size]
+        scores = matrix @ matrix[block].T
+        scores[block, np.arange(len(block))] = -np.inf
+        np.maximum(best, scores.max(axis=1), out=best)
+
+    for row in range(size):
+        if row in needs:
+            continue
+        entries = current.get(row)
+        if (
+            entries is None
+            or len(entries) < expected
+            or any(score is None or col in changed for col, score in entries)
+            or (entries and best[row] > entries[-1][1])
+        ):
+            needs.add(row)
+    return needs
+
+
+def save_related_books(embedding, ranked):
+    """
+    연관 도서를 순위/점수와 함께 저장
+    ranked: [(book_id, score), ...] 유사도 내림차순
+    """
+    from .models import RelatedBook
+
+    entries = [
+        RelatedBook(embedding=embedding, book_id=book_id, rank=rank, score=float(score))
+        for rank, (book_id, score) in enumerate(ranked)
+    ]
+    return RelatedBook.objects.bulk_create(entries)
+
+
+def bulk_save_related_books(ranked_by_embedding, batch_size=1000):
+    """
+    여러 임베딩의 연관 도서를 한 번에 교체 (기존 행 삭제 후 batch_size 단위 bulk_create)
+    ranked_by_embedding: {embedding_id: [(book_id, score), ...]} 유사도 내림차순
+    반환값: 저장한 연관 도서 행 수
+    """
+    from .models import RelatedBook
+
+    embedding_ids = list(ranked_by_embedding)
+    for offset in range(0, len(embedding_ids), batch_size):
+        RelatedBook.objects.filter(
+            embedding_id__in=embedding_ids[offset : offset + batch_size]
+        ).delete()
+
+    entries = (
+        RelatedBook(
+            embedding_id=embedding_id, book_id=book_id, rank=rank, score=float(score)
+        )
+        for embedding_id, ranked in ranked_by_embedding.items()
+        for rank, (book_id, score) in enumerate(ranked)
+    )
+    count = 0
+    while batch := list(islice(entries, batch_size)):
+        RelatedBook.objects.bulk_create(batch)
+        count += len(batch)
+    return count
+
+
+def related_fixture_records(embedding, entries):
+    """BookEmbedding과 연관 도서 순위를 Django fixture 레코드로 변환"""
+    records = [
+        {
+            "model": "books.bookembedding",
+            "pk": embedding.pk,
+            "fields": {"book": embedding.book_id},
+        }
+    ]
+    for entry in entries:
+        records.append(
+            {
+                "model": "books.relatedbook",
+                "pk": entry.pk,
+                "fields": {
+                    "embedding": embedding.pk,
+                    "book": entry.book_id,
+                    "rank": entry.rank,
+                    "score": entry.score,
+                },
+            }
+        )
+    return records
+
+
+# === 임베딩 모델 ===
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """SentenceTransformer 모델 반환 (최초 호출 시 로드)"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+
+                logger.info(f"🧠 [Embedding] 모델 로드: {EMBEDDING_MODEL_NAME}")
+                _model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+    return _model
+
+
+def encode_query(text):
+    """
+    검색어 한 건을 정규화된 float32 벡터로 인코딩
+    EMBEDDING_WORKER_ENABLED면 임베딩 워커에 요청 (타임아웃 시 EmbeddingWorkerTimeout)
+    """
+    if settings.EMBEDDING_WORKER_ENABLED:
+        from .embedding_worker import encode_remote
+
+        return normalize_rows(encode_remote([text])[0])
+    vector = get_model().encode(text)
+    return normalize_rows(vector)
+
+
+def encode_books(model, book_ids, texts, batch_size=64, processes=0, on_chunk=None):
+    """
+    book_ids 순서대로 texts[book_id]를 청크 단위로 인코딩
+    processes > 1이면 프로세스 풀로 분산 (인코딩 중 예외가 나도 풀은 종료)
+    on_chunk(done): 청크를 인코딩할 때마다 호출 (진행 상황 출력용)
+    반환값: {book_id: vector}
+    """
+    pool = None
+    if processes > 1:
+        pool = model.start_multi_process_pool(target_devices=["cpu"] * processes)
+
+    chunk_size = batch_size * max(processes, 1) * 8
+    vectors_by_id = {}
+    try:
+        for offset in range(0, len(book_ids), chunk_size):
+            chunk = book_ids[offset : offset + chunk_size]
+            chunk_texts = [texts[book_id] for book_id in chunk]
+            if pool is not None:
+                vectors = model.encode_multi_process(
+                    chunk_texts, pool, batch_size=batch_size
+                )
+            else:
+                vectors = model.encode(
+                    chunk_texts,
+                    batch_size=batch_size,
+                    convert_to_numpy=True,
+                    show_progress_bar=False,
+                )
+            vectors_by_id.update(zip(chunk, vectors))
+            if on_chunk is not None:
+                on_chunk(offset + len(chunk))
+    finally:
+        if pool is not None:
+            model.stop_multi_process_pool(pool)
+    return vectors_by_id
+
+
+# === 벡터 행렬 ===
+
+
+def _version_key():
+    return f"{settings.CACHE_KEY_PREFIX}:book_embeddings:version"
+
+
+def vectors_version():
+    return get_version(_version_key())
+
+
+def invalidate_vectors():
+    """모든 워커의 임베딩 행렬을 무효화 (임베딩 재생성 후 호출)"""
+    bump_version(_version_key())
+
+
+# ANN 인덱스를 사용할 최소 도서 수 (이보다 적으면 전수 비교가 충분히 빠르고 정확함)
+ANN_MIN_ROWS = 10000
+
+
+class VectorIndex:
+    """정규화된 임베딩 행렬과 행 번호 -> 도서 ID 매핑"""
+
+    def __init__(self, book_ids, matrix, ann_loader=None):
+        self.book_ids = np.asarray(book_ids, dtype=np.int64)
+        self.matrix = matrix
+        self.positions = {int(book_id): i for i, book_id in enumerate(book_ids)}
+        self._ann = None
+        self._ann_loader = ann_loader
+
+    def __len__(self):
+        return len(self.book_ids)
+
+    @property
+    def ann(self):
+        """근사 최근접 이웃 인덱스 (처음 사용할 때 적재, 없으면 None)"""
+        if self._ann_loader is not None:
+            self._ann, self._ann_loader = self._ann_loader(), None
+        return self._ann
+
+    @classmethod
+    def from_rows(cls, rows):
+        """rows: (book_id, float32 bytes) 튜플의 iterable"""
+        book_ids, vectors = [], []
+        for book_id, data in rows:
+            if data:
+                book_ids.append(book_id)
+                vectors.append(bytes_to_vector(data))
+        if not vectors:
+            return cls([], np.zeros((0, 0), dtype=EMBEDDING_DTYPE))
+        return cls(book_ids, normalize_rows(np.vstack(vectors)))
+
+    def search(
+        self, query_vector, limit=10, exclude=(), nprobe=None, exact=False, ann=None
+    ):
+        """
+        코사인 유사도 상위 도서 반환
+        ANN 인덱스가 있으면 가까운 목록의 행만 비교 (exact=True거나 도서 수가
+        ANN_MIN_ROWS 미만이면 전수 비교, 탐색한 행이 limit보다 적으면 목록을 더 탐색)
+        반환값: [(book_id, score), ...]
+        """
+        if not len(self):
+            return []
+        if ann is None and not exact and len(self) >= ANN_MIN_ROWS:
+            ann = self.ann
+        excluded = [self.positions[b] for b in exclude if b in self.positions]
+        if ann is not None:
+            rows = ann.probe(query_vector, nprobe, min_rows=limit + len(excluded))
+            scores = self.matrix[rows] @ query_vector
+        else:
+            rows = None
+            scores = self.matrix @ query_vector
+
+        if excluded:
+            if rows is None:
+                scores[excluded] = -np.inf
+            else:
+                scores[np.isin(rows, excluded)] = -np.inf
+
+        limit = min(limit, len(scores))
+        if not limit:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        positions = top if rows is None else rows[top]
+        return [
+            (int(self.book_ids[pos]), float(scores[i]))
+            for i, pos in zip(top, positions)
+            if np.isfinite(scores[i])
+        ]
+
+
+_vectors = None
+_vectors_version = None
+_vectors_lock = threading.Lock()
+
+
+def load_vector_index():
+    """
+    임베딩 행렬 적재
+    파일 저장소(EMBEDDING_STORE_DIR)가 있으면 메모리 맵으로 열고, 없으면 DB에서 읽음
+    """
+    from .models import BookEmbedding
+    from .vector_store import read_ann_index, read_vector_store
+
+    stored = read_vector_store()
+    if stored is not None:
+        book_ids, matrix, manifest = stored
+        logger.info(f"🧠 [Embedding] 임베딩 저장소 메모리 맵: {len(book_ids)}권")
+        return VectorIndex(
+            book_ids, matrix, ann_loader=lambda: read_ann_index(manifest)
+        )
+
+    rows = BookEmbedding.objects.values_list("book_id", "vector").iterator()
+    index = VectorIndex.from_rows(rows)
+    logger.info(f"🧠 [Embedding] DB에서 임베딩 행렬 적재: {len(index)}권")
+    return index
+
+
+def get_vector_index():
+    """현재 버전의 임베딩 행렬 반환 (버전이 바뀌었으면 다시 적재)"""
+    global _vectors, _vectors_version
+
+    version = vectors_version()
+    if _vectors is not None and _vectors_version == version:
+        return _vectors
+
+    with _vectors_lock:
+        if _vectors is None or _vectors_version != version:
+            _vectors, _vectors_version = load_vector_index(), version
+    return _vectors
+
+
+def semantic_search(query, limit=10):
+    """자연어 검색어와 의미가 가까운 도서 반환 [(book_id, score), ...]"""
+    index = get_vector_index()
+    if not len(index):
+        return []
+    return index.search(encode_query(query), limit)
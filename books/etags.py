@@ -0,0 +1,46 @@
+"""
+조건부 응답 (ETag / If-None-Match)
+- 리소스별 버전 토큰으로 강한 ETag 생성 (응답 본문을 만들지 않고도 계산 가능)
+- If-None-Match가 일치하면 시리얼라이저/DB 작업 없이 304 반환
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .versions import bump_version, get_version
+
+
+def _category_version_key():
+    return f"{settings.CACHE_KEY_PREFIX}:categories:version"
+
+
+def category_version():
+    return get_version(_category_version_key())
+
+
+def invalidate_categories():
+    """카테고리 추가/수정/삭제 시 카테고리 버전 변경"""
+    bump_version(_category_version_key())
+
+
+def make_etag(*parts):
+    """버전/요청 파라미터로 강한 ETag 생성 (예: "3f1c...")"""
+    value = ":".join(map(str, parts)).encode("utf-8")
+    return quote_etag(hashlib.blake2b(value, digest_size=12).hexdigest())
+
+
+def not_modified(request, etag):
+    """If-None-Match가 etag와 일치하면 304 응답, 아니면 None"""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return None
+    etags = parse_etags(header)
+    if "*" in etags or etag in etags:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response["ETag"] = etag
+        return response
+    return None
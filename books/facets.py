@@ -0,0 +1,67 @@
+"""
+검색 결과 패싯(카테고리별 건수)
+- 카테고리마다 count()를 실행하지 않고 GROUP BY 한 번으로 집계
+- 이미 계산된 검색 결과(queryset)를 그대로 사용하므로 검색을 다시 실행하지 않음
+- 목록 검색은 색인의 도서별 카테고리로 집계 (검색 결과 ID를 DB로 보내지 않음)
+"""
+
+from collections import Counter
+
+from django.db.models import Count
+
+from .models import Category
+
+# ?facets= 로 요청할 수 있는 패싯
+FACET_NAMES = ("category",)
+
+
+def requested_facets(request):
+    """요청된 패싯 이름 목록 (예: ?facets=category)"""
+    names = request.GET.get("facets", "").split(",")
+    return [name for name in FACET_NAMES if name in names]
+
+
+def category_facets(queryset):
+    """
+    queryset의 카테고리별 도서 수
+    반환값: [{"id": 1, "name": "소설/시/희곡", "count": 12}, ...] 건수 내림차순
+    """
+    rows = (
+        queryset.order_by()
+        .values("category_id", "category__name")
+        .annotate(count=Count("id"))
+        .order_by("-count", "category_id")
+    )
+    return [
+        {"id": row["category_id"], "name": row["category__name"], "count": row["count"]}
+        for row in rows
+    ]
+
+
+def category_facets_from_map(book_categories):
+    """
+    {book_id: category_id}의 카테고리별 도서 수 (category_facets와 같은 형식)
+    카테고리 이름만 한 번 조회
+    """
+    counts = Counter(book_categories.values())
+    names = dict(Category.objects.filter(id__in=counts).values_list("id", "name"))
+    return [
+        {"id": category_id, "name": names.get(category_id), "count": count}
+        for category_id, count in sorted(
+            counts.items(), key=lambda item: (-item[1], item[0])
+        )
+    ]
+
+
+def build_facets(names, queryset=None, book_categories=None):
+    """
+    요청된 패싯을 계산해 {"category": [...]} 형태로 반환
+    book_categories({book_id: category_id})가 있으면 queryset 대신 사용
+    """
+    facets = {}
+    if "category" in names:
+        if book_categories is not None:
+            facets["category"] = category_facets_from_map(book_categories)
+        else:
+            facets["category"] = category_facets(queryset)
+    return facets
@@ -0,0 +1,78 @@
+"""
+희소 필드셋 (?fields= / ?exclude=)
+- 응답 필드를 요청한 필드로 줄임 (예: ?fields=id,title,cover)
+- 같은 필드 목록으로 .only()를 적용해 필요한 컬럼만 조회
+"""
+
+
+def _split(value):
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+def requested_fieldset(request):
+    """요청의 (fields, exclude) 목록 반환 (없으면 빈 목록)"""
+    if request is None:
+        return [], []
+    params = request.query_params
+    return _split(params.get("fields")), _split(params.get("exclude"))
+
+
+def fieldset_cache_key(request):
+    """캐시 키에 붙일 필드셋 문자열 (순서와 무관하게 같은 키)"""
+    fields, exclude = requested_fieldset(request)
+    return f"fields_{','.join(sorted(fields))}:exclude_{','.join(sorted(exclude))}"
+
+
+class SparseFieldsetMixin:
+    """
+    ModelSerializer용 믹스인
+    fields/exclude 인자 또는 context의 request 쿼리 파라미터로 출력 필드를 줄입니다.
+    """
+
+    # source가 "*"인 필드(SerializerMethodField 등)가 읽는 모델 컬럼
+    column_sources = {}
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        exclude = kwargs.pop("exclude", None)
+        super().__init__(*args, **kwargs)
+
+        if fields is None and exclude is None:
+            fields, exclude = requested_fieldset(self.context.get("request"))
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in exclude or ():
+            self.fields.pop(name, None)
+
+    @classmethod
+    def only_columns(cls, fields, exclude):
+        """출력 필드에 필요한 모델 컬럼 목록 (필드셋 요청이 없으면 None)"""
+        if not fields and not exclude:
+            return None
+
+        concrete = {field.name for field in cls.Meta.model._meta.concrete_fields}
+        columns = {"id"}
+        for name, field in cls(fields=fields, exclude=exclude).fields.items():
+            if name in cls.column_sources:
+                sources = cls.column_sources[name]
+            else:
+                # 예: category_name(source="category.name") -> category
+                sources = (field.source.split(".")[0],)
+            columns.update(source for source in sources if source in concrete)
+        return sorted(columns)
+
+
+def narrow_queryset(queryset, serializer_class, request):
+    """요청된 필드셋에 맞게 queryset에 .only() 적용"""
+    if not issubclass(serializer_class, SparseFieldsetMixin):
+        return queryset
+    columns = serializer_class.only_columns(*requested_fieldset(request))
+    if columns is None:
+        # 응답에서 제외한 컬럼(검색 토큰/카드 등)은 조회하지 않음
+        excluded = getattr(serializer_class.Meta, "exclude", ())
+        return queryset.defer(*excluded) if excluded else queryset
+    # select_related 대상 FK는 지연 로딩할 수 없으므로 항상 포함
+    if isinstance(queryset.query.select_related, dict):
+        columns = columns + list(queryset.query.select_related)
+    return queryset.only(*columns)
@@ -0,0 +1,171 @@
+"""
+fixture 스트리밍 입출력
+- FixtureWriter: 레코드를 만들어지는 대로 한 건씩 기록 (compact / jsonl / indent)
+- iter_fixture_records: JSON 배열 또는 JSONL fixture를 한 건씩 읽음
+- load_fixture_records: 모델별 batch_size 단위 bulk_create/bulk_update로 적재
+  (저장 신호가 없으므로 임베딩/연관 도서만 허용, 커밋 후 상세 캐시 무효화)
+전체 레코드를 메모리에 올리지 않으므로 카탈로그 크기와 무관하게 메모리 사용량이 일정
+"""
+
+import json
+import textwrap
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from .detail_cache import invalidate_related
+
+FIXTURE_FORMATS = ("compact", "jsonl", "indent")
+# 스트리밍 적재 가능한 모델 (bulk_create/bulk_update는 저장 신호를 보내지 않으므로
+# 검색 토큰/카드 계산이 필요한 도서 등은 loaddata 사용)
+STREAM_MODELS = ("books.bookembedding", "books.relatedbook")
+
+
+def fixture_extension(fmt):
+    return ".jsonl" if fmt == "jsonl" else ".json"
+
+
+class FixtureWriter:
+    """
+    fixture 레코드를 파일에 한 건씩 기록
+    - compact: 한 줄에 레코드 하나인 JSON 배열 (loaddata 호환)
+    - jsonl: JSON Lines (loaddata 호환, 확장자 .jsonl)
+    - indent: 기존 json.dump(indent=2)와 같은 형식
+    """
+
+    def __init__(self, path, fmt="compact"):
+        if fmt not in FIXTURE_FORMATS:
+            raise ValueError(f"지원하지 않는 fixture 형식: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.count = 0
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "w", encoding="utf-8")
+        if self.fmt != "jsonl":
+            self._file.write("[")
+        return self
+
+    def write(self, record):
+        if self.fmt == "jsonl":
+            self._file.write(json.dumps(record, ensure_ascii=False))
+            self._file.write("\n")
+        else:
+            self._file.write("\n" if not self.count else ",\n")
+            if self.fmt == "indent":
+                data = json.dumps(record, ensure_ascii=False, indent=2)
+                self._file.write(textwrap.indent(data, "  "))
+            else:
+                self._file.write(json.dumps(record, ensure_ascii=False))
+        self.count += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.fmt != "jsonl":
+            self._file.write("\n]" if self.count else "]")
+        self._file.close()
+        return False
+
+
+def iter_fixture_records(path, chunk_size=1 << 16):
+    """fixture 파일의 레코드를 한 건씩 반환 (.jsonl은 줄 단위, 그 외는 JSON 배열)"""
+    with open(path, encoding="utf-8") as f:
+        if str(path).endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        # JSON 배열: 청크 단위로 읽으며 원소를 하나씩 디코딩
+        decoder = json.JSONDecoder()
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer.startswith("["):
+            raise ValueError(f"JSON 배열 형식의 fixture가 아닙니다: {path}")
+        buffer, pos, eof = buffer[1:], 0, False
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == "]":
+                return
+            try:
+                record, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield record
+
+
+def _save_records(label, records):
+    """같은 모델의 레코드 묶음 저장 (기존 PK는 bulk_update, 새 PK는 bulk_create)"""
+    model = apps.get_model(label)
+    objs, field_names = [], set()
+    for record in records:
+        values = {}
+        for name, value in record["fields"].items():
+            field = model._meta.get_field(name)
+            if field.many_to_many:
+                raise ValueError(f"다대다 필드는 지원하지 않습니다: {label}.{name}")
+            values[field.attname] = field.to_python(value)
+            field_names.add(field.name)
+        objs.append(model(pk=record.get("pk"), **values))
+
+    pks = [obj.pk for obj in objs if obj.pk is not None]
+    existing = set(model.objects.filter(pk__in=pks).values_list("pk", flat=True))
+    to_update = [obj for obj in objs if obj.pk in existing]
+    if to_update and field_names:
+        # fixture에 없는 필드(예: 임베딩 벡터)는 그대로 유지
+        model.objects.bulk_update(to_update, sorted(field_names))
+    model.objects.bulk_create([obj for obj in objs if obj.pk not in existing])
+    return model
+
+
+def load_fixture_records(records, batch_size=1000):
+    """
+    fixture 레코드를 batch_size 단위로 적재 (트랜잭션 하나)
+    레코드를 처음 등장한 모델 순서대로 저장하므로 참조 대상(예: 임베딩)이 먼저 저장됨
+    STREAM_MODELS 외의 모델이 있으면 ValueError (전체 롤백)
+    커밋 후 연관 도서 버전을 올려 모든 도서 상세 캐시/ETag 무효화
+    반환값: 적재한 레코드 수
+    """
+    pending, loaded_models, count = {}, set(), 0
+
+    def flush():
+        for label, batch in pending.items():
+            if batch:
+                loaded_models.add(_save_records(label, batch))
+                batch.clear()
+
+    with transaction.atomic():
+        for record in records:
+            label = record["model"].lower()
+            if label not in STREAM_MODELS:
+                raise ValueError(
+                    f"스트리밍 적재를 지원하지 않는 모델입니다: {record['model']} "
+                    "(loaddata를 사용하세요)"
+                )
+            batch = pending.setdefault(label, [])
+            batch.append(record)
+            count += 1
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+
+        # PK를 지정해 넣었으므로 시퀀스 재설정 (PostgreSQL 등)
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), loaded_models)
+        if sequence_sql:
+            with connection.cursor() as cursor:
+                for sql in sequence_sql:
+                    cursor.execute(sql)
+
+        if count:
+            transaction.on_commit(invalidate_related)
+    return count
@@ -0,0 +1,82 @@
+"""
+키워드 + 벡터 하이브리드 검색
+- 역색인(BM25F) 결과와 임베딩 최근접 결과를 Reciprocal Rank Fusion으로 결합
+- 단계별 소요 시간을 함께 반환 (Server-Timing 헤더용)
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+
+from .analysis import is_chosung_query
+from .embedding_worker import EmbeddingWorkerError
+from .embeddings import semantic_search
+from .search_index import search_book_ids
+
+logger = logging.getLogger(__name__)
+
+# RRF 상수 (순위 1위와 하위 순위의 점수 차이를 완화)
+RRF_K = 60
+# 각 검색 단계에서 가져올 후보 수
+CANDIDATE_LIMIT = 100
+
+
+class StageTimer:
+    """단계별 소요 시간(ms) 측정"""
+
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def measure(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.timings[stage] = self.timings.get(stage, 0.0) + elapsed
+
+    def header(self):
+        """Server-Timing 헤더 값 (예: lexical;dur=0.42, vector;dur=12.1)"""
+        return ", ".join(
+            f"{stage};dur={duration:.2f}" for stage, duration in self.timings.items()
+        )
+
+
+def reciprocal_rank_fusion(ranked_lists, k=RRF_K):
+    """
+    여러 순위 목록을 RRF 점수(sum 1 / (k + rank))로 결합
+    반환값: [(book_id, score), ...] 점수 내림차순
+    """
+    scores = {}
+    for ranked in ranked_lists:
+        for rank, book_id in enumerate(ranked, start=1):
+            scores[book_id] = scores.get(book_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+def hybrid_search_ids(query, fields=None, limit=CANDIDATE_LIMIT, timer=None):
+    """
+    하이브리드 검색 결과 도서 ID 목록 반환
+    임베딩을 사용할 수 없으면(모델 미설치/임베딩 없음) 키워드 결과만 사용합니다.
+    """
+    timer = timer or StageTimer()
+
+    with timer.measure("lexical"):
+        lexical_ids = search_book_ids(query, fields, CANDIDATE_LIMIT)
+
+    vector_ids = []
+    # 초성 검색어는 의미가 없으므로 벡터 검색 생략
+    if not is_chosung_query(query):
+        try:
+            with timer.measure("vector"):
+                vector_ids = [
+                    book_id for book_id, _ in semantic_search(query, CANDIDATE_LIMIT)
+                ]
+        except (ImportError, EmbeddingWorkerError):
+            logger.warning("⚠️ 임베딩 모델을 사용할 수 없어 키워드 검색만 사용")
+
+    with timer.measure("fusion"):
+        fused = reciprocal_rank_fusion([lexical_ids, vector_ids])
+
+    return [book_id for book_id, _ in fused[:limit]]
@@ -0,0 +1,94 @@
+from django.core.management.base import BaseCommand, CommandError
+from books.ann_index import DEFAULT_NPROBE, IVFIndex, recall_report
+from books.embeddings import ANN_MIN_ROWS, VectorIndex, invalidate_vectors
+from books.vector_store import read_vector_store, store_dir, write_ann_index
+import time
+
+
+class Command(BaseCommand):
+    help = "임베딩 저장소로 근사 최근접 이웃(IVF) 인덱스를 만들고 전수 검색 대비 재현율을 보고합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            default="",
+            help="임베딩 저장소 디렉터리 (기본값: settings.EMBEDDING_STORE_DIR)",
+        )
+        parser.add_argument(
+            "--lists",
+            type=int,
+            default=0,
+            help="k-means 목록 수 (0이면 약 4 * sqrt(도서 수))",
+        )
+        parser.add_argument(
+            "--nprobe",
+            type=int,
+            default=DEFAULT_NPROBE,
+            help="검색 시 탐색할 목록 수 (클수록 재현율↑, 지연↑)",
+        )
+        parser.add_argument(
+            "--recall_k", type=int, default=10, help="재현율을 측정할 상위 k"
+        )
+        parser.add_argument(
+            "--queries", type=int, default=200, help="재현율 측정에 사용할 질의 수"
+        )
+        parser.add_argument(
+            "--report_only",
+            action="store_true",
+            help="인덱스를 저장하지 않고 재현율/지연만 보고",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["dir"] or None
+
+        stored = read_vector_store(directory)
+        if stored is None:
+            raise CommandError(
+                f"임베딩 저장소가 없습니다: {store_dir(directory)} "
+                "(build_vector_store를 먼저 실행하세요)"
+            )
+        book_ids, matrix, _ = stored
+        self.stdout.write(f"ANN 인덱스를 생성합니다: {len(book_ids)}권")
+
+        start_time = time.time()
+        if options["report_only"]:
+            ivf = IVFIndex.build(
+                matrix, n_lists=options["lists"] or None, nprobe=options["nprobe"]
+            )
+        else:
+            ivf = write_ann_index(options["lists"], options["nprobe"], directory)
+            # 웹 워커들이 새 인덱스를 적재하도록 무효화
+            invalidate_vectors()
+        self.stdout.write(
+            f"인덱스 생성 완료: 목록 {ivf.n_lists}개 ({time.time() - start_time:.2f}초)"
+        )
+        if len(book_ids) < ANN_MIN_ROWS:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"도서 수가 {ANN_MIN_ROWS}권 미만이므로 검색에는 전수 비교를 사용합니다."
+                )
+            )
+
+        # nprobe별 재현율 보고 (전수 검색 기준)
+        nprobes = sorted(
+            {n for n in (1, 2, 4, ivf.nprobe, 16, 32, 64) if n <= ivf.n_lists}
+        )
+        report = recall_report(
+            VectorIndex(book_ids, matrix),
+            ivf,
+            nprobes,
+            k=options["recall_k"],
+            queries=options["queries"],
+        )
+        self.stdout.write(
+            f"{'nprobe':>6} {'recall@' + str(options['recall_k']):>10} "
+            f"{'탐색 비율':>8} {'ANN(ms)':>8} {'전수(ms)':>8}"
+        )
+        for row in report:
+            line = (
+                f"{row['nprobe']:>6} {row['recall']:>10.3f} {row['scanned']:>9.1%} "
+                f"{row['ann_ms']:>8.2f} {row['exact_ms']:>8.2f}"
+            )
+            if row["nprobe"] == ivf.nprobe:
+                line = self.style.SUCCESS(f"{line}  <- 기본값")
+            self.stdout.write(line)
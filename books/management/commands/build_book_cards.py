@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from books.models import Book
+import time
+
+
+class Command(BaseCommand):
+    help = "모든 책의 목록용 카드(card)를 저장합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch_size", type=int, default=500, help="한 번에 저장할 책의 수"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        self.stdout.write("도서 카드 생성을 시작합니다...")
+        start_time = time.time()
+
+        books = Book.objects.select_related("category").order_by("id")
+        total_books = books.count()
+
+        batch = []
+        updated = 0
+        for i, book in enumerate(books.iterator(chunk_size=batch_size)):
+            old_card = book.card
+            book.refresh_card()
+            if book.card != old_card:
+                batch.append(book)
+
+            if len(batch) >= batch_size:
+                Book.objects.bulk_update(batch, ["card"])
+                updated += len(batch)
+                batch = []
+                self.stdout.write(f"{i + 1}/{total_books} 처리 중...")
+
+        if batch:
+            Book.objects.bulk_update(batch, ["card"])
+            updated += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"도서 카드 생성 완료: {updated}/{total_books}권 갱신 "
+                f"({time.time() - start_time:.2f}초)"
+            )
+        )
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from books.analysis import SEARCH_FIELDS, get_analyzer
+from books.models import Book
+from books.search_index import invalidate_index
+import time
+
+UPDATE_FIELDS = ["search_tokens", "title_chosung", "author_chosung"]
+
+
+class Command(BaseCommand):
+    help = "모든 책의 검색 토큰(search_tokens)과 제목/저자 초성 키를 저장합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch_size", type=int, default=500, help="한 번에 저장할 책의 수"
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="이미 같은 분석기로 만든 토큰이 있어도 다시 분석",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        force = options["force"]
+        analyzer_name = get_analyzer().name
+
+        self.stdout.write(f"검색 토큰 생성을 시작합니다... (분석기: {analyzer_name})")
+        start_time = time.time()
+
+        books = Book.objects.only(
+            "id", "search_tokens", "title_chosung", *SEARCH_FIELDS
+        ).order_by("id")
+        total_books = books.count()
+
+        batch = []
+        updated = 0
+        for i, book in enumerate(books.iterator(chunk_size=batch_size)):
+            if (
+                force
+                or book.search_tokens.get("analyzer") != analyzer_name
+                or not book.title_chosung
+            ):
+                book.refresh_search_tokens()
+                batch.append(book)
+
+            if len(batch) >= batch_size:
+                Book.objects.bulk_update(batch, UPDATE_FIELDS)
+                updated += len(batch)
+                batch = []
+                self.stdout.write(f"{i + 1}/{total_books} 처리 중...")
+
+        if batch:
+            Book.objects.bulk_update(batch, UPDATE_FIELDS)
+            updated += len(batch)
+
+        # bulk_update는 시그널을 보내지 않으므로 직접 색인 무효화
+        invalidate_index()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"검색 토큰 생성 완료: {updated}/{total_books}권 갱신 "
+                f"({time.time() - start_time:.2f}초)"
+            )
+        )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from books.embeddings import invalidate_vectors
+from books.vector_store import export_vector_store, store_dir
+import time
+
+
+class Command(BaseCommand):
+    help = "DB에 저장된 임베딩 벡터를 파일 저장소(.npy)로 내보냅니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            default="",
+            help="저장할 디렉터리 (기본값: settings.EMBEDDING_STORE_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["dir"] or None
+
+        self.stdout.write(f"임베딩 저장소를 생성합니다: {store_dir(directory)}")
+        start_time = time.time()
+
+        manifest = export_vector_store(directory)
+        if manifest is None:
+            self.stdout.write(self.style.WARNING("저장된 임베딩 벡터가 없습니다."))
+            return
+
+        # 웹 워커들이 새 저장소를 다시 메모리 맵하도록 무효화
+        invalidate_vectors()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"임베딩 저장소 생성 완료: {manifest['count']}권 x {manifest['dim']}차원 "
+                f"({time.time() - start_time:.2f}초)"
+            )
+        )
@@ -1,15 +1,34 @@
-import json
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from sentence_transformers import SentenceTransformer
 from django.core.management.base import BaseCommand
-from books.models import Book, BookEmbedding
+from books.models import Book, BookEmbedding, RelatedBook
+from books.detail_cache import invalidate_related
+from books.embeddings import (
+    EMBEDDING_MODEL_NAME,
+    SIMILARITY_BLOCK_SIZE,
+    book_text,
+    bulk_save_related_books,
+    bytes_to_vector,
+    content_hash,
+    encode_books,
+    invalidate_vectors,
+    normalize_rows,
+    rank_neighbours,
+    related_fixture_records,
+    rows_needing_neighbours,
+    vector_to_bytes,
+)
+from books.fixture_stream import FIXTURE_FORMATS, FixtureWriter, fixture_extension
+from books.vector_store import export_vector_store
 from django.db import transaction
 import time
 
 
 class Command(BaseCommand):
-    help = "책 설명, 제목, 저자, 카테고리를 활용해 임베딩을 생성하고 연관 도서를 추출합니다."
+    help = (
+        "책 설명, 제목, 저자, 카테고리를 활용해 임베딩을 생성하고 연관 도서를 추출합니다. "
+        "텍스트 해시가 바뀐 책과 새 책만 인코딩합니다."
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -27,24 +46,98 @@ class Command(BaseCommand):
             default=0,
             help="처리를 종료할 책 ID (0이면 마지막 책까지)",
         )
+        parser.add_argument(
+            "--related_k",
+            type=int,
+            default=10,
+            help="책마다 저장할 연관 도서 수 (API는 이 수 이내에서 원하는 만큼 조회)",
+        )
+        parser.add_argument(
+            "--encode_batch_size",
+            type=int,
+            default=64,
+            help="모델에 한 번에 넣을 문장 수",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=0,
+            help="인코딩 프로세스 수 (2 이상이면 encode_multi_process 사용)",
+        )
+        parser.add_argument(
+            "--block_size",
+            type=int,
+            default=SIMILARITY_BLOCK_SIZE,
+            help="유사도를 한 번에 계산할 행 수 (메모리 사용량: 블록 x 전체 책 수)",
+        )
+        parser.add_argument(
+            "--write_batch_size",
+            type=int,
+            default=1000,
+            help="DB에 한 번에 저장할 행 수 (bulk_create/bulk_update 배치 크기)",
+        )
+        parser.add_argument(
+            "--fixture_format",
+            choices=FIXTURE_FORMATS,
+            default="compact",
+            help="fixture 파일 형식 (compact: 한 줄에 레코드 하나, jsonl: JSON Lines, indent: 들여쓰기)",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="텍스트 해시와 관계없이 모든 책을 다시 인코딩하고 연관 도서 재계산",
+        )
+
+    def encode_stale_books(
+        self, stale_ids, texts, book_embeddings, encode_batch_size, processes
+    ):
+        """변경/신규 책을 인코딩해 book_embeddings에 추가 (모델은 이때만 로드)"""
+        start_time = time.time()
+        self.stdout.write("임베딩 모델을 로드합니다...")
+        model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+        self.stdout.write(f"모델 로드 완료 ({time.time() - start_time:.2f}초)")
+
+        # 배치 단위로 인코딩 (processes > 1이면 프로세스 풀로 분산)
+        if processes > 1:
+            self.stdout.write(f"인코딩 프로세스 {processes}개를 시작합니다...")
+        start_time = time.time()
+
+        def report(done):
+            elapsed = time.time() - start_time
+            rate = done / elapsed if elapsed else 0
+            eta = (len(stale_ids) - done) / rate if rate else 0
+            self.stdout.write(
+                f"{done}/{len(stale_ids)} 책 임베딩 생성 완료 "
+                f"({rate:.1f}권/초, 경과: {elapsed:.2f}초, 예상 남은 시간: {eta:.2f}초)"
+            )
+
+        book_embeddings.update(
+            encode_books(
+                model,
+                stale_ids,
+                texts,
+                batch_size=encode_batch_size,
+                processes=processes,
+                on_chunk=report,
+            )
+        )
 
     def handle(self, *args, **options):
         batch_size = options["batch_size"]
         start_id = options["start_id"]
         end_id = options["end_id"]
+        related_k = options["related_k"]
+        full = options["full"]
+        encode_batch_size = options["encode_batch_size"]
+        processes = options["processes"]
+        block_size = options["block_size"]
+        write_batch_size = options["write_batch_size"]
+        fixture_format = options["fixture_format"]
 
         self.stdout.write("책 임베딩 생성 및 연관 도서 추출을 시작합니다...")
 
-        # 문장 임베딩 모델 로드
-        start_time = time.time()
-        self.stdout.write("임베딩 모델을 로드합니다...")
-        model = SentenceTransformer(
-            "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
-        )
-        self.stdout.write(f"모델 로드 완료 ({time.time() - start_time:.2f}초)")
-
         # 책 데이터 필터링
-        books_query = Book.objects.all()
+        books_query = Book.objects.select_related("category").order_by("id")
         if start_id > 1:
             books_query = books_query.filter(id__gte=start_id)
         if end_id > 0:
@@ -56,95 +149,176 @@ class Command(BaseCommand):
         else:
             books = books_query
 
-        total_books = books.count()
-        self.stdout.write(f"총 {total_books}권의 책에 대한 임베딩을 생성합니다.")
-
-        # 각 책에 대한 임베딩 생성
-        book_embeddings = {}
-        start_time = time.time()
-        for i, book in enumerate(books):
-            # 책 정보 결합
-            book_info = f"제목: {book.title} 저자: {book.author} 카테고리: {book.category.name} 설명: {book.description}"
-
-            # 임베딩 생성
-            embedding = model.encode(book_info)
-            book_embeddings[book.id] = embedding
-
-            if (i + 1) % 10 == 0 or (i + 1) == total_books:
-                elapsed = time.time() - start_time
-                eta = (elapsed / (i + 1)) * (total_books - (i + 1))
-                self.stdout.write(
-                    f"{i + 1}/{total_books} 책 임베딩 생성 완료 "
-                    f"(경과: {elapsed:.2f}초, 예상 남은 시간: {eta:.2f}초)"
-                )
+        # 인코딩할 텍스트와 해시 계산
+        texts, hashes = {}, {}
+        for book in books:
+            texts[book.id] = book_text(
+                book.title, book.author, book.category.name, book.description
+            )
+            hashes[book.id] = content_hash(texts[book.id])
+        book_ids = list(texts)
+        total_books = len(book_ids)
+        if not total_books:
+            self.stdout.write(self.style.SUCCESS("처리할 책이 없습니다."))
+            return
 
-        # 코사인 유사도 계산 및 연관 도서 추출
-        self.stdout.write("코사인 유사도 계산 및 연관 도서 추출을 시작합니다...")
+        # 기존 임베딩 중 해시가 같은 책은 벡터 재사용
+        existing = {
+            embedding.book_id: embedding
+            for embedding in BookEmbedding.objects.filter(book_id__in=book_ids).only(
+                "id", "book_id", "vector", "content_hash"
+            )
+        }
+        stale_ids = [
+            book_id
+            for book_id in book_ids
+            if full
+            or book_id not in existing
+            or not existing[book_id].vector
+            or existing[book_id].content_hash != hashes[book_id]
+        ]
+        self.stdout.write(
+            f"총 {total_books}권 중 {len(stale_ids)}권의 임베딩을 생성합니다."
+        )
 
-        # 임베딩 벡터를 numpy 배열로 변환
-        book_ids = list(book_embeddings.keys())
-        embeddings_array = np.array([book_embeddings[book_id] for book_id in book_ids])
+        # 변경/신규 책만 임베딩 생성
+        stale = set(stale_ids)
+        book_embeddings = {
+            book_id: bytes_to_vector(existing[book_id].vector)
+            for book_id in book_ids
+            if book_id in existing and book_id not in stale
+        }
+        if stale_ids:
+            self.encode_stale_books(
+                stale_ids, texts, book_embeddings, encode_batch_size, processes
+            )
+        else:
+            # 삭제된 책은 저장소와 다른 책의 연관 도서 목록에 남아 있으므로 계속 진행
+            self.stdout.write(
+                "변경된 책이 없습니다. 연관 도서와 임베딩 저장소만 갱신합니다."
+            )
 
-        # 코사인 유사도 계산
+        # 연관 도서를 다시 계산할 책 선정
+        self.stdout.write("코사인 유사도 계산 및 연관 도서 추출을 시작합니다...")
         start_time = time.time()
-        similarity_matrix = cosine_similarity(embeddings_array)
-        self.stdout.write(f"코사인 유사도 계산 완료 ({time.time() - start_time:.2f}초)")
+        matrix = normalize_rows(
+            np.vstack([book_embeddings[book_id] for book_id in book_ids])
+        )
+        positions = {book_id: i for i, book_id in enumerate(book_ids)}
+        changed_rows = [positions[book_id] for book_id in stale_ids]
 
-        # 연관 도서 추출 및 저장
-        start_time = time.time()
-        embeddings_to_save = []
+        if full:
+            rows = set(range(len(book_ids)))
+        else:
+            current = {}
+            stored = (
+                RelatedBook.objects.filter(embedding__book_id__in=book_ids)
+                .order_by("embedding_id", "rank")
+                .values_list("embedding__book_id", "book_id", "score")
+            )
+            for book_id, related_id, score in stored:
+                entries = current.setdefault(positions[book_id], [])
+                # 범위 밖 도서는 목록에서 빠지므로 길이 부족으로 재계산됨
+                if related_id in positions:
+                    entries.append((positions[related_id], score))
+            rows = rows_needing_neighbours(
+                matrix, changed_rows, current, related_k, block_size
+            )
+        neighbours = rank_neighbours(matrix, sorted(rows), related_k, block_size)
+        self.stdout.write(
+            f"연관 도서 재계산 대상: {len(rows)}권 ({time.time() - start_time:.2f}초)"
+        )
 
+        # 임베딩 및 연관 도서 저장
+        start_time = time.time()
         with transaction.atomic():
-            # 기존 임베딩 데이터 삭제 (처리하는 책에 대해서만)
-            BookEmbedding.objects.filter(book_id__in=book_ids).delete()
-
-            # 새로운 임베딩 및 연관 도서 저장
-            for i, book_id in enumerate(book_ids):
-                if (i + 1) % 10 == 0 or (i + 1) == len(book_ids):
-                    self.stdout.write(f"DB 저장 진행 중: {i + 1}/{len(book_ids)}")
-
-                book = Book.objects.get(id=book_id)
-
-                # 자기 자신을 제외한 유사도 점수
-                similarities = similarity_matrix[i]
-                similarities[i] = -1  # 자기 자신 제외
-
-                # 상위 3개 연관 도서 인덱스 추출
-                top_indices = np.argsort(similarities)[-3:][::-1]
-                related_book_ids = [book_ids[idx] for idx in top_indices]
-
-                # 임베딩 저장
-                embedding_obj = BookEmbedding.objects.create(book=book)
-
-                # 연관 도서 추가
-                related_books = Book.objects.filter(id__in=related_book_ids)
-                embedding_obj.related_books.add(*related_books)
-
-                # Django fixture 형식으로 저장할 데이터 준비
-                embeddings_to_save.append(
-                    {
-                        "model": "books.bookembedding",
-                        "pk": embedding_obj.pk,
-                        "fields": {"book": book.id, "related_books": related_book_ids},
-                    }
+            # 임베딩: 기존 행은 bulk_update, 새 책은 bulk_create
+            to_update, to_create = [], []
+            for book_id in stale_ids:
+                vector = vector_to_bytes(book_embeddings[book_id])
+                if book_id in existing:
+                    embedding_obj = existing[book_id]
+                    embedding_obj.vector = vector
+                    embedding_obj.content_hash = hashes[book_id]
+                    to_update.append(embedding_obj)
+                else:
+                    to_create.append(
+                        BookEmbedding(
+                            book_id=book_id, vector=vector, content_hash=hashes[book_id]
+                        )
+                    )
+            BookEmbedding.objects.bulk_update(
+                to_update, ["vector", "content_hash"], batch_size=write_batch_size
+            )
+            BookEmbedding.objects.bulk_create(to_create, batch_size=write_batch_size)
+
+            # 새로 만든 임베딩의 PK 조회 (백엔드에 따라 bulk_create가 PK를 채우지 않음)
+            embedding_ids = {
+                book_id: embedding_obj.id for book_id, embedding_obj in existing.items()
+            }
+            if to_create:
+                embedding_ids.update(
+                    BookEmbedding.objects.filter(
+                        book_id__in=[
+                            embedding_obj.book_id for embedding_obj in to_create
+                        ]
+                    ).values_list("book_id", "id")
                 )
 
-        self.stdout.write(f"DB 저장 완료 ({time.time() - start_time:.2f}초)")
+            # 연관 도서: 대상 임베딩의 기존 행 삭제 후 일괄 삽입
+            related_count = bulk_save_related_books(
+                {
+                    embedding_ids[book_ids[row]]: [
+                        (book_ids[col], score) for col, score in neighbours[row]
+                    ]
+                    for row in sorted(rows)
+                },
+                batch_size=write_batch_size,
+            )
+
+        self.stdout.write(
+            f"DB 저장 완료: 임베딩 {len(stale_ids)}건, 연관 도서 {related_count}건 "
+            f"({time.time() - start_time:.2f}초)"
+        )
+
+        # 커밋 후 연관 도서가 바뀐 상세 캐시/ETag 무효화
+        if rows:
+            invalidate_related()
 
-        # Django fixture 형식으로 JSON 파일 저장
+        # 전체 임베딩을 파일 저장소로 내보낸 뒤 웹 워커들이 다시 메모리 맵하도록 무효화
+        export_vector_store()
+        invalidate_vectors()
+
+        # Django fixture 형식으로 저장 (처리 범위 전체를 청크 단위로 읽어 바로 기록)
         start_time = time.time()
 
         # 파일명 결정 (배치 처리 시 구분)
         if batch_size > 0 or start_id > 1 or end_id > 0:
-            file_name = f"related_books_{start_id}_to_{book_ids[-1]}.json"
+            file_name = f"related_books_{start_id}_to_{book_ids[-1]}"
         else:
-            file_name = "related_books.json"
+            file_name = "related_books"
+        file_name += fixture_extension(fixture_format)
 
-        # Django fixture 형식으로 JSON 파일 저장
-        with open(f"books/fixtures/{file_name}", "w", encoding="utf-8") as f:
-            json.dump(embeddings_to_save, f, ensure_ascii=False, indent=2)
+        # 처리한 책은 ID 순으로 연속된 범위이므로 IN 목록 대신 범위로 조회
+        embeddings = (
+            BookEmbedding.objects.filter(
+                book_id__gte=book_ids[0], book_id__lte=book_ids[-1]
+            )
+            .only("id", "book_id")
+            .prefetch_related("related_entries")
+            .order_by("book_id")
+        )
+        with FixtureWriter(f"books/fixtures/{file_name}", fixture_format) as writer:
+            for embedding_obj in embeddings.iterator(chunk_size=write_batch_size):
+                writer.write_many(
+                    related_fixture_records(
+                        embedding_obj, embedding_obj.related_entries.all()
+                    )
+                )
 
-        self.stdout.write(f"JSON 파일 저장 완료 ({time.time() - start_time:.2f}초)")
+        self.stdout.write(
+            f"JSON 파일 저장 완료: {writer.count}건 ({time.time() - start_time:.2f}초)"
+        )
 
         self.stdout.write(
             self.style.SUCCESS("책 임베딩 생성 및 연관 도서 추출이 완료되었습니다!")
@@ -153,5 +327,6 @@ class Command(BaseCommand):
             f"연관 도서 데이터가 books/fixtures/{file_name} 파일로 저장되었습니다."
         )
         self.stdout.write(
-            f"Django fixture 형식으로 저장되어 'python manage.py loaddata {file_name.replace('.json', '')}'로 로드할 수 있습니다."
+            f"Django fixture 형식으로 저장되어 'python manage.py loaddata {file_name}' 또는 "
+            f"'python manage.py load_fixture_stream books/fixtures/{file_name}'로 로드할 수 있습니다."
         )
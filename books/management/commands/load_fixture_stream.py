@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from books.fixture_stream import iter_fixture_records, load_fixture_records
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        "fixture 파일(JSON 배열 또는 JSONL)을 한 건씩 읽어 일괄 저장합니다. "
+        "loaddata와 달리 파일 전체를 메모리에 올리지 않습니다. "
+        "(임베딩/연관 도서 fixture 전용)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="fixture 파일 경로")
+        parser.add_argument(
+            "--batch_size",
+            type=int,
+            default=1000,
+            help="모델별로 한 번에 저장할 레코드 수",
+        )
+
+    def handle(self, *args, **options):
+        for path in options["paths"]:
+            start_time = time.time()
+            self.stdout.write(f"fixture를 적재합니다: {path}")
+            try:
+                count = load_fixture_records(
+                    iter_fixture_records(path), batch_size=options["batch_size"]
+                )
+            except (OSError, ValueError, IntegrityError) as e:
+                raise CommandError(f"fixture 적재 실패 ({path}): {e}")
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{count}건 적재 완료 ({time.time() - start_time:.2f}초)"
+                )
+            )
@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand
+from books.embedding_worker import collect_batch, get_connection, queue_key, serve_batch
+from books.embeddings import get_model
+import time
+
+
+class Command(BaseCommand):
+    help = "임베딩 모델을 한 번 로드하고 Redis 요청 큐의 인코딩 요청을 묶어서 처리하는 워커를 실행합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch_wait_ms",
+            type=float,
+            default=5,
+            help="첫 요청 이후 추가 요청을 모으는 시간 (밀리초)",
+        )
+        parser.add_argument(
+            "--max_batch",
+            type=int,
+            default=256,
+            help="한 번에 인코딩할 최대 문장 수",
+        )
+        parser.add_argument(
+            "--encode_batch_size",
+            type=int,
+            default=64,
+            help="모델에 한 번에 넣을 문장 수",
+        )
+        parser.add_argument(
+            "--report_every",
+            type=int,
+            default=60,
+            help="처리량을 기록할 간격 (초)",
+        )
+
+    def handle(self, *args, **options):
+        wait = options["batch_wait_ms"] / 1000
+        max_batch = options["max_batch"]
+        encode_batch_size = options["encode_batch_size"]
+        report_every = options["report_every"]
+
+        start_time = time.time()
+        self.stdout.write("임베딩 모델을 로드합니다...")
+        model = get_model()
+        self.stdout.write(f"모델 로드 완료 ({time.time() - start_time:.2f}초)")
+
+        def encode(texts):
+            return model.encode(
+                texts,
+                batch_size=encode_batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+
+        conn = get_connection()
+        self.stdout.write(
+            self.style.SUCCESS(f"임베딩 워커 시작: {queue_key()} (Ctrl+C로 종료)")
+        )
+
+        encoded, batches, busy = 0, 0, 0.0
+        report_at = time.monotonic() + report_every
+        try:
+            while True:
+                requests = collect_batch(conn, max_batch, wait)
+                if requests:
+                    batch_start = time.monotonic()
+                    encoded += serve_batch(conn, encode, requests)
+                    busy += time.monotonic() - batch_start
+                    batches += 1
+
+                if time.monotonic() >= report_at and batches:
+                    self.stdout.write(
+                        f"{encoded}건 인코딩 / {batches}배치 "
+                        f"(배치당 {encoded / batches:.1f}건, {encoded / busy:.1f}건/초)"
+                    )
+                    encoded, batches, busy = 0, 0, 0.0
+                    report_at = time.monotonic() + report_every
+        except KeyboardInterrupt:
+            self.stdout.write("임베딩 워커를 종료합니다.")
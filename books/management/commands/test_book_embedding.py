@@ -1,25 +1,48 @@
 import json
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
 from django.core.management.base import BaseCommand
 from books.models import Book, BookEmbedding
+from books.detail_cache import invalidate_related
+from books.embeddings import (
+    book_text,
+    bytes_to_vector,
+    content_hash,
+    get_model,
+    invalidate_vectors,
+    load_vector_index,
+    normalize_rows,
+    related_fixture_records,
+    save_related_books,
+    vector_to_bytes,
+)
+from books.vector_store import export_vector_store
 from django.db import transaction
+from django.db.models import Q
+import time
 
 
 class Command(BaseCommand):
-    help = "단일 책에 대한 임베딩 생성 및 연관 도서 추출 테스트"
+    help = (
+        "단일 책에 대한 임베딩 생성 및 연관 도서 추출 테스트 "
+        "(저장된 벡터를 재사용하고 변경된 타겟 책만 인코딩)"
+    )
 
     def add_arguments(self, parser):
         parser.add_argument("--book_id", type=int, default=1, help="테스트할 책의 ID")
-        parser.add_argument("--top_k", type=int, default=3, help="추출할 연관 도서 수")
+        parser.add_argument("--top_k", type=int, default=3, help="출력할 연관 도서 수")
+        parser.add_argument(
+            "--related_k",
+            type=int,
+            default=10,
+            help="저장할 연관 도서 수 (generate_book_embeddings의 --related_k와 동일하게)",
+        )
 
     def handle(self, *args, **options):
         book_id = options["book_id"]
         top_k = options["top_k"]
+        related_k = options["related_k"]
 
         try:
-            target_book = Book.objects.get(id=book_id)
+            target_book = Book.objects.select_related("category").get(id=book_id)
         except Book.DoesNotExist:
             self.stdout.write(
                 self.style.ERROR(f"ID가 {book_id}인 책이 존재하지 않습니다.")
@@ -30,60 +53,97 @@ class Command(BaseCommand):
             f'"{target_book.title}" 책에 대한 임베딩 테스트를 시작합니다...'
         )
 
-        # 문장 임베딩 모델 로드
-        self.stdout.write("임베딩 모델을 로드합니다...")
-        model = SentenceTransformer(
-            "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
-        )
-
-        # 모든 책 데이터 가져오기 (비교를 위해)
-        books = Book.objects.all()
-        self.stdout.write(f"총 {books.count()}권의 책 중 연관 도서를 찾습니다.")
-
-        # 책 정보 결합 및 임베딩 생성
-        book_embeddings = {}
-
-        # 타겟 책 임베딩
-        target_book_info = f"제목: {target_book.title} 저자: {target_book.author} 카테고리: {target_book.category.name} 설명: {target_book.description}"
-        target_embedding = model.encode(target_book_info)
-        book_embeddings[target_book.id] = target_embedding
-
-        # 다른 모든 책 임베딩
-        for book in books:
-            if book.id == target_book.id:
-                continue
+        start_time = time.time()
 
-            book_info = f"제목: {book.title} 저자: {book.author} 카테고리: {book.category.name} 설명: {book.description}"
-            embedding = model.encode(book_info)
-            book_embeddings[book.id] = embedding
+        # 저장된 임베딩 행렬 적재 (파일 저장소 메모리 맵 또는 DB)
+        index = load_vector_index()
+        self.stdout.write(f"저장된 임베딩 {len(index)}권을 불러왔습니다.")
 
-        self.stdout.write("모든 책의 임베딩 생성 완료")
-
-        # 코사인 유사도 계산
-        self.stdout.write("코사인 유사도 계산 중...")
-        similarities = {}
-        target_embedding = book_embeddings[target_book.id]
-
-        for book_id, embedding in book_embeddings.items():
-            if book_id == target_book.id:
-                continue
+        # 타겟 책은 텍스트 해시가 바뀌었거나 벡터가 없을 때만 인코딩
+        target_book_info = book_text(
+            target_book.title,
+            target_book.author,
+            target_book.category.name,
+            target_book.description,
+        )
+        target_hash = content_hash(target_book_info)
+        embedding_obj = BookEmbedding.objects.filter(book=target_book).first()
+        to_encode = {}
+        if (
+            embedding_obj is None
+            or not embedding_obj.vector
+            or embedding_obj.content_hash != target_hash
+        ):
+            to_encode[target_book.id] = target_book_info
+
+        # 벡터가 없는 책은 처음 한 번만 인코딩해 저장 (이후 실행에서 재사용)
+        missing = Book.objects.select_related("category").filter(
+            Q(embedding__isnull=True) | Q(embedding__vector__isnull=True)
+        )
+        for book in missing:
+            to_encode.setdefault(
+                book.id,
+                book_text(
+                    book.title, book.author, book.category.name, book.description
+                ),
+            )
 
-            similarity = cosine_similarity([target_embedding], [embedding])[0][0]
-            similarities[book_id] = similarity
+        if to_encode:
+            self.stdout.write(f"{len(to_encode)}권의 임베딩을 생성합니다...")
+            vectors = get_model().encode(
+                list(to_encode.values()), convert_to_numpy=True, show_progress_bar=False
+            )
+            with transaction.atomic():
+                for (encoded_id, text), vector in zip(to_encode.items(), vectors):
+                    BookEmbedding.objects.update_or_create(
+                        book_id=encoded_id,
+                        defaults={
+                            "vector": vector_to_bytes(vector),
+                            "content_hash": content_hash(text),
+                        },
+                    )
+            export_vector_store()
+            invalidate_vectors()
+            index = load_vector_index()
+
+        embedding_obj = BookEmbedding.objects.get(book=target_book)
+        target_vector = normalize_rows(bytes_to_vector(embedding_obj.vector))
+
+        # 재사용한 저장소에 남아 있는 삭제된 책은 순위에서 제외
+        existing_ids = set(Book.objects.values_list("id", flat=True))
+        stale_ids = [
+            stored_id
+            for stored_id in index.book_ids.tolist()
+            if stored_id not in existing_ids
+        ]
+        if stale_ids:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"저장된 임베딩 중 삭제된 책 {len(stale_ids)}권을 제외합니다."
+                )
+            )
 
-        # 상위 K개 연관 도서 추출
-        top_related_books = sorted(
-            similarities.items(), key=lambda x: x[1], reverse=True
-        )[:top_k]
+        # 행렬 곱 한 번으로 연관 도서 추출 (저장할 related_k개 중 상위 top_k개 출력)
+        ranked = index.search(
+            target_vector,
+            max(top_k, related_k),
+            exclude=[target_book.id, *stale_ids],
+            exact=True,
+        )
+        top_related_books = ranked[:top_k]
+        related = Book.objects.select_related("category").in_bulk(
+            [related_book_id for related_book_id, _ in top_related_books]
+        )
 
         # 결과 출력
-        self.stdout.write(f'"{target_book.title}" 책의 상위 {top_k}개 연관 도서:')
+        self.stdout.write(
+            f'"{target_book.title}" 책의 상위 {top_k}개 연관 도서 '
+            f"({time.time() - start_time:.2f}초):"
+        )
         self.stdout.write("-" * 50)
 
-        related_book_ids = []
         for i, (related_book_id, similarity) in enumerate(top_related_books, 1):
-            related_book = Book.objects.get(id=related_book_id)
-            related_book_ids.append(related_book_id)
+            related_book = related[related_book_id]
 
             self.stdout.write(
                 f"{i}. {related_book.title} (저자: {related_book.author})"
@@ -92,25 +152,15 @@ class Command(BaseCommand):
             self.stdout.write(f"   유사도: {similarity:.4f}")
             self.stdout.write("-" * 50)
 
-        # Django fixture 형식으로 결과 저장
-        # 기존 BookEmbedding이 있다면 삭제하고 새로 생성
-        BookEmbedding.objects.filter(book=target_book).delete()
-
-        # 임베딩 객체 생성
-        embedding_obj = BookEmbedding.objects.create(book=target_book)
-
-        # 연관 도서 추가
-        related_books = Book.objects.filter(id__in=related_book_ids)
-        embedding_obj.related_books.add(*related_books)
+        # 연관 도서를 순위/점수와 함께 저장 (기존 목록을 같은 길이의 목록으로 교체)
+        with transaction.atomic():
+            embedding_obj.related_entries.all().delete()
+            entries = save_related_books(embedding_obj, ranked[:related_k])
+        # 커밋 후 상세 캐시/ETag 무효화
+        invalidate_related()
 
         # Django fixture 형식으로 저장할 데이터 준비
-        fixture_data = [
-            {
-                "model": "books.bookembedding",
-                "pk": embedding_obj.pk,
-                "fields": {"book": target_book.id, "related_books": related_book_ids},
-            }
-        ]
+        fixture_data = related_fixture_records(embedding_obj, entries)
 
         # JSON 파일로 저장
         with open("books/fixtures/test_related_book.json", "w", encoding="utf-8") as f:
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.21 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0002_book_audiobook_file"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="search_tokens",
+            field=models.JSONField(
+                blank=True, default=dict, help_text="검색 색인용 필드별 분석 토큰"
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.21 on 2026-10-17 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0003_book_search_tokens"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="author_chosung",
+            field=models.CharField(
+                blank=True, default="", help_text="저자 초성 검색 키", max_length=255
+            ),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="title_chosung",
+            field=models.CharField(
+                blank=True, default="", help_text="제목 초성 검색 키", max_length=255
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.21 on 2026-10-17 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0004_book_chosung"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bookembedding",
+            name="vector",
+            field=models.BinaryField(
+                blank=True, help_text="임베딩 벡터 (float32 bytes)", null=True
+            ),
+        ),
+    ]
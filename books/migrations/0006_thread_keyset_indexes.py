@@ -0,0 +1,26 @@
+# Generated by Django 4.2.21 on 2026-10-17 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0005_bookembedding_vector"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="thread",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="books_threa_created_ffee09_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="thread",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="books_threa_user_id_bc3ab4_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.21 on 2026-10-17 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0006_thread_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="card",
+            field=models.JSONField(
+                blank=True, default=dict, help_text="목록 응답용 도서 카드 (비정규화)"
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.21 on 2026-10-17 15:40
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_saved_count(apps, schema_editor):
+    Book = apps.get_model("books", "Book")
+    books = Book.objects.annotate(num_saved=Count("saved_by_users")).filter(
+        num_saved__gt=0
+    )
+    for book in books.only("id").iterator():
+        Book.objects.filter(id=book.id).update(saved_count=book.num_saved)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_initial"),
+        ("books", "0007_book_card"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="saved_count",
+            field=models.PositiveIntegerField(
+                default=0, help_text="이 책을 저장한 사용자 수 (비정규화)"
+            ),
+        ),
+        migrations.RunPython(backfill_saved_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 4.2.21 on 2026-10-17 16:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_related_books(apps, schema_editor):
+    # 기존 M2M 행을 순위 테이블로 복사 (기존 데이터에는 순서/점수가 없어 저장 순서를 순위로 사용)
+    BookEmbedding = apps.get_model("books", "BookEmbedding")
+    RelatedBook = apps.get_model("books", "RelatedBook")
+    Through = BookEmbedding.related_books.through
+    rows = Through.objects.order_by("bookembedding_id", "id").values_list(
+        "bookembedding_id", "book_id"
+    )
+    entries = []
+    rank, previous = 0, None
+    for embedding_id, book_id in rows.iterator():
+        rank = rank + 1 if embedding_id == previous else 0
+        previous = embedding_id
+        entries.append(
+            RelatedBook(embedding_id=embedding_id, book_id=book_id, rank=rank)
+        )
+    RelatedBook.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0008_book_saved_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RelatedBook",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "rank",
+                    models.PositiveSmallIntegerField(
+                        default=0, help_text="유사도 순위 (0부터)"
+                    ),
+                ),
+                (
+                    "score",
+                    models.FloatField(blank=True, help_text="코사인 유사도", null=True),
+                ),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="books.book",
+                    ),
+                ),
+                (
+                    "embedding",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_entries",
+                        to="books.bookembedding",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("rank", "id"),
+                "indexes": [
+                    models.Index(
+                        fields=["embedding", "rank"],
+                        name="books_relat_embeddi_c1e824_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(copy_related_books, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="bookembedding",
+            name="related_books",
+        ),
+        migrations.AddField(
+            model_name="bookembedding",
+            name="related_books",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="related_to",
+                through="books.RelatedBook",
+                to="books.book",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.21 on 2026-10-17 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0009_related_book_rank"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bookembedding",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="임베딩 입력 텍스트 해시",
+                max_length=64,
+            ),
+        ),
+    ]
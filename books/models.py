@@ -2,6 +2,7 @@ import datetime
 from django.db import models
 from django.conf import settings
 from django.urls import reverse
+from .analysis import SEARCH_FIELDS, analyze_fields, to_chosung
 
 
 # Create your models here.
@@ -30,21 +31,91 @@ class Book(models.Model):
     audiobook_file = models.CharField(
         max_length=500, blank=True, null=True, help_text="오디오북 파일 경로"
     )
+    search_tokens = models.JSONField(
+        default=dict, blank=True, help_text="검색 색인용 필드별 분석 토큰"
+    )
+    title_chosung = models.CharField(
+        max_length=255, blank=True, default="", help_text="제목 초성 검색 키"
+    )
+    author_chosung = models.CharField(
+        max_length=255, blank=True, default="", help_text="저자 초성 검색 키"
+    )
+    card = models.JSONField(
+        default=dict, blank=True, help_text="목록 응답용 도서 카드 (비정규화)"
+    )
+    saved_count = models.PositiveIntegerField(
+        default=0, help_text="이 책을 저장한 사용자 수 (비정규화)"
+    )
 
     def __str__(self):
         return self.title
 
+    def refresh_search_tokens(self):
+        """제목/저자/출판사/설명을 분석해 검색 토큰과 초성 키 갱신"""
+        self.search_tokens = analyze_fields(
+            {field: getattr(self, field) for field in SEARCH_FIELDS}
+        )
+        self.title_chosung = to_chosung(self.title)[:255]
+        self.author_chosung = to_chosung(self.author)[:255]
+
+    def refresh_card(self, category_name=None):
+        """목록 응답용 카드 갱신 (BookListSerializer와 같은 형식, id 제외)"""
+        if category_name is None:
+            try:
+                category_name = self.category.name
+            except Category.DoesNotExist:
+                # loaddata에서 카테고리보다 먼저 저장되는 경우 (카테고리 저장 시 갱신)
+                category_name = ""
+        pub_date = self.pub_date
+        self.card = {
+            "title": self.title,
+            "cover": self.cover,
+            "author": self.author,
+            "publisher": self.publisher,
+            "pub_date": (
+                pub_date.isoformat() if hasattr(pub_date, "isoformat") else pub_date
+            ),
+            "subTitle": self.subTitle,
+            "category_name": category_name,
+        }
+
 
 class BookEmbedding(models.Model):
     book = models.OneToOneField(
         Book, on_delete=models.CASCADE, related_name="embedding"
     )
-    related_books = models.ManyToManyField(Book, related_name="related_to", blank=True)
+    related_books = models.ManyToManyField(
+        Book, through="RelatedBook", related_name="related_to", blank=True
+    )
+    vector = models.BinaryField(
+        null=True, blank=True, help_text="임베딩 벡터 (float32 bytes)"
+    )
+    content_hash = models.CharField(
+        max_length=64, blank=True, default="", help_text="임베딩 입력 텍스트 해시"
+    )
 
     def __str__(self):
         return f"Related books for {self.book.title}"
 
 
+class RelatedBook(models.Model):
+    """연관 도서 (유사도 순위와 점수 유지)"""
+
+    embedding = models.ForeignKey(
+        BookEmbedding, on_delete=models.CASCADE, related_name="related_entries"
+    )
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField(default=0, help_text="유사도 순위 (0부터)")
+    score = models.FloatField(null=True, blank=True, help_text="코사인 유사도")
+
+    class Meta:
+        ordering = ("rank", "id")
+        indexes = [models.Index(fields=["embedding", "rank"])]
+
+    def __str__(self):
+        return f"{self.embedding_id} -> {self.book_id} ({self.rank})"
+
+
 class Thread(models.Model):
     title = models.CharField(max_length=100)
     content = models.TextField()
@@ -60,6 +131,13 @@ class Thread(models.Model):
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True
     )
 
+    class Meta:
+        indexes = [
+            # 커서 페이지네이션 (created_at, id) 키셋 조회용
+            models.Index(fields=["-created_at", "-id"]),
+            models.Index(fields=["user", "-created_at", "-id"]),
+        ]
+
     def __str__(self):
         return self.title
 
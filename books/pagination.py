@@ -0,0 +1,69 @@
+"""
+키셋(커서) 페이지네이션
+- ?pagination=cursor 또는 ?cursor=... 로 선택 (기본은 기존 페이지 번호 방식)
+- COUNT(*)/OFFSET 없이 정렬 키 기준으로 다음 페이지를 조회해 깊은 페이지도 일정한 속도
+- next/previous 링크에 불투명(opaque) 커서 포함
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+def wants_cursor_pagination(request):
+    """커서 페이지네이션 요청 여부"""
+    params = request.query_params
+    return params.get("pagination") == "cursor" or "cursor" in params
+
+
+class BookCursorPagination(CursorPagination):
+    """도서 목록 (id 순)"""
+
+    page_size = 9
+    ordering = "id"
+
+
+class SavedBookCursorPagination(CursorPagination):
+    """사용자가 저장한 책 목록 (최신 id 순)"""
+
+    page_size = 10
+    ordering = "-id"
+
+
+class ThreadCursorPagination(CursorPagination):
+    """쓰레드 목록 (created_at, id 최신순)"""
+
+    page_size = 10
+    ordering = ("-created_at", "-id")
+
+
+class OptionalCursorPaginationMixin:
+    """
+    GenericAPIView용 믹스인
+    커서 요청이 오면 cursor_pagination_class를, 아니면 기본 페이지네이션을 사용합니다.
+    """
+
+    cursor_pagination_class = None
+
+    def use_cursor_pagination(self):
+        return self.cursor_pagination_class is not None and wants_cursor_pagination(
+            self.request
+        )
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator") and self.use_cursor_pagination():
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
+
+
+def paginate_with_cursor(pagination_class, queryset, request, view=None):
+    """
+    APIView에서 커서 페이지네이션 적용
+    반환값: (현재 페이지 객체 목록, 응답 메타데이터)
+    """
+    paginator = pagination_class()
+    page = paginator.paginate_queryset(queryset, request, view=view)
+    meta = {
+        "next": paginator.get_next_link(),
+        "previous": paginator.get_previous_link(),
+    }
+    return page, meta
@@ -0,0 +1,117 @@
+"""
+검색 결과 캐시
+- 검색어 정규화 (유니코드 NFC, 대소문자, 공백) 후 캐시 키 생성
+- Count-Min Sketch로 반복 조회된 검색어만 캐시에 저장 (1회성 오타 제외)
+- 적중/미스/저장/거절 횟수 집계
+"""
+
+import hashlib
+import threading
+import unicodedata
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+# 이 횟수 이상 미스가 난 검색어만 캐시에 저장
+ADMIT_THRESHOLD = 2
+
+STAT_NAMES = ("hits", "misses", "admitted", "rejected")
+
+
+def normalize_query(query):
+    """검색어 정규화: NFC + 소문자 + 연속 공백 제거"""
+    query = unicodedata.normalize("NFC", query or "")
+    return " ".join(query.lower().split())
+
+
+class CountMinSketch:
+    """
+    고정 메모리 빈도 추정기
+    일정 횟수마다 모든 카운터를 절반으로 줄여 오래된 인기도는 잊습니다.
+    """
+
+    def __init__(self, width=4096, depth=4, reset_interval=None):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.uint32)
+        self.reset_interval = reset_interval or width * 10
+        self.additions = 0
+        self._lock = threading.Lock()
+
+    def _indexes(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key):
+        """빈도를 1 올리고 추정 빈도를 반환"""
+        indexes = self._indexes(key)
+        with self._lock:
+            rows = np.arange(self.depth)
+            self.table[rows, indexes] += 1
+            estimate = int(self.table[rows, indexes].min())
+            self.additions += 1
+            if self.additions >= self.reset_interval:
+                self.table >>= 1
+                self.additions = 0
+        return estimate
+
+    def estimate(self, key):
+        indexes = self._indexes(key)
+        return int(self.table[np.arange(self.depth), indexes].min())
+
+
+class SearchResultCache:
+    """정규화된 검색어 기반 결과 캐시 (인기 검색어만 저장)"""
+
+    def __init__(self, threshold=ADMIT_THRESHOLD, sketch=None):
+        self.threshold = threshold
+        self.sketch = sketch or CountMinSketch()
+
+    def make_key(self, namespace, query, *extra):
+        parts = [settings.CACHE_KEY_PREFIX, namespace, *map(str, extra)]
+        parts.append(normalize_query(query))
+        return ":".join(parts)
+
+    def get(self, key):
+        value = cache.get(key)
+        self._incr("hits" if value is not None else "misses")
+        return value
+
+    def set(self, key, value, timeout=None):
+        """충분히 반복 조회된 키만 저장하고 저장 여부를 반환"""
+        if self.sketch.add(key) < self.threshold:
+            self._incr("rejected")
+            return False
+        cache.set(key, value, timeout or settings.CACHE_TTL)
+        self._incr("admitted")
+        return True
+
+    def _stat_key(self, name):
+        return f"{settings.CACHE_KEY_PREFIX}:search_cache:stats:{name}"
+
+    def _incr(self, name):
+        key = self._stat_key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 0, None)
+            cache.incr(key)
+
+    def stats(self):
+        """캐시 적중률 통계 (모든 워커 합계)"""
+        values = cache.get_many([self._stat_key(name) for name in STAT_NAMES])
+        stats = {name: values.get(self._stat_key(name), 0) for name in STAT_NAMES}
+        lookups = stats["hits"] + stats["misses"]
+        writes = stats["admitted"] + stats["rejected"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["admit_ratio"] = round(stats["admitted"] / writes, 4) if writes else 0.0
+        return stats
+
+    def reset_stats(self):
+        cache.delete_many([self._stat_key(name) for name in STAT_NAMES])
+
+
+search_cache = SearchResultCache()
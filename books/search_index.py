@@ -0,0 +1,299 @@
+"""
+도서 전문 검색용 역색인 (in-process inverted index)
+- 카탈로그 전체를 한 번 색인한 뒤 프로세스 메모리에 유지
+- Book.search_tokens에 저장된 분석 결과로 색인 (요청 시 텍스트 분석 없음)
+- BM25F 랭킹 (필드별 가중치 + 필드 길이 정규화)
+- 초성 검색용 접두어 색인 (정렬 배열 + 이분 탐색)
+- Book 변경 시 캐시의 버전 키를 올려 모든 워커가 다시 색인
+"""
+
+import bisect
+import logging
+import math
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+
+from .analysis import (
+    SEARCH_FIELDS,
+    analyze_fields,
+    get_analyzer,
+    is_chosung_query,
+    query_term_sets,
+    to_chosung,
+)
+from .versions import bump_version, get_version
+
+logger = logging.getLogger(__name__)
+
+# 필드별 가중치 (제목 > 저자 > 출판사 = 설명)
+FIELD_BOOSTS = {"title": 3.0, "author": 2.0, "publisher": 1.0, "description": 1.0}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def _version_key():
+    return f"{settings.CACHE_KEY_PREFIX}:book_search_index:version"
+
+
+def current_version():
+    """도서 색인 버전 토큰 (도서가 바뀔 때마다 새 토큰)"""
+    return get_version(_version_key())
+
+
+class BookSearchIndex:
+    """BM25F 점수를 계산하는 도서 역색인"""
+
+    def __init__(self, fields=SEARCH_FIELDS):
+        self.fields = tuple(fields)
+        # token -> {book_id: (필드별 tf, ...)}
+        self.postings = defaultdict(dict)
+        # book_id -> (필드별 토큰 수, ...)
+        self.field_lengths = {}
+        self.avg_lengths = (0.0,) * len(self.fields)
+        self.chosung = ChosungIndex()
+        # book_id -> category_id
+        self.categories = {}
+
+    def __len__(self):
+        return len(self.field_lengths)
+
+    @classmethod
+    def build(cls, rows, fields=SEARCH_FIELDS):
+        """
+        rows: (book_id, {field: [token, ...]}) 튜플의 iterable
+        """
+        index = cls(fields)
+        for book_id, tokens in rows:
+            index.add(book_id, [tokens.get(f, []) for f in index.fields])
+        index.finalize()
+        return index
+
+    def add(self, book_id, field_tokens):
+        """필드별 토큰 목록으로 문서 한 건을 색인"""
+        counters = [Counter(tokens) for tokens in field_tokens]
+        for token in set().union(*counters):
+            self.postings[token][book_id] = tuple(c.get(token, 0) for c in counters)
+        self.field_lengths[book_id] = tuple(len(tokens) for tokens in field_tokens)
+
+    def finalize(self):
+        """평균 필드 길이 계산 (색인 완료 후 한 번 호출)"""
+        count = len(self.field_lengths) or 1
+        totals = [0] * len(self.fields)
+        for lengths in self.field_lengths.values():
+            for i, length in enumerate(lengths):
+                totals[i] += length
+        self.avg_lengths = tuple((total / count) or 1.0 for total in totals)
+        self.postings = dict(self.postings)
+
+    def _idf(self, token):
+        n = len(self.field_lengths)
+        df = len(self.postings.get(token, ()))
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query, fields=None, limit=None):
+        """
+        검색어의 모든 토큰을 포함하는 도서를 BM25F 점수순으로 반환
+        반환값: [(book_id, score), ...]
+        """
+        for terms in query_term_sets(query):
+            if not terms:
+                continue
+            scored = self._search_terms(terms, fields)
+            if scored:
+                return scored[:limit] if limit else scored
+        return []
+
+    def _search_terms(self, terms, fields):
+        field_idx = [
+            i for i, f in enumerate(self.fields) if fields is None or f in fields
+        ]
+        boosts = [FIELD_BOOSTS.get(self.fields[i], 1.0) for i in field_idx]
+
+        postings = [self.postings.get(term) for term in terms]
+        if not all(postings):
+            return []
+
+        # 가장 짧은 posting list부터 교집합 계산
+        order = sorted(range(len(terms)), key=lambda i: len(postings[i]))
+        candidates = set(postings[order[0]])
+        for i in order[1:]:
+            candidates.intersection_update(postings[i])
+            if not candidates:
+                return []
+
+        idfs = [self._idf(term) for term in terms]
+        scored = []
+        for book_id in candidates:
+            lengths = self.field_lengths[book_id]
+            score = 0.0
+            for term_postings, idf in zip(postings, idfs):
+                tfs = term_postings[book_id]
+                weighted_tf = 0.0
+                for i, boost in zip(field_idx, boosts):
+                    if tfs[i]:
+                        norm = 1 - BM25_B + BM25_B * lengths[i] / self.avg_lengths[i]
+                        weighted_tf += boost * tfs[i] / norm
+                if not weighted_tf:
+                    # 선택한 필드에 없는 토큰이 있으면 제외
+                    break
+                score += idf * weighted_tf / (BM25_K1 + weighted_tf)
+            else:
+                scored.append((book_id, score))
+
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored
+
+
+class ChosungIndex:
+    """
+    제목/저자 초성 키의 접두어 색인
+    단어 시작 위치마다 접미 키를 정렬 배열에 넣어 "ㅇㄷ"로 "소년이 온다"도 찾습니다.
+    """
+
+    FIELDS = ("title", "author")
+
+    def __init__(self):
+        self.keys = []
+        # (book_id, 필드 순서, 단어 위치)
+        self.entries = []
+
+    @classmethod
+    def build(cls, rows):
+        """
+        rows: (book_id, {"title": 초성 키, "author": 초성 키}) 튜플의 iterable
+        """
+        pairs = []
+        for book_id, keys in rows:
+            for field_pos, field in enumerate(cls.FIELDS):
+                words = (keys.get(field) or "").split()
+                for word_pos in range(len(words)):
+                    suffix = "".join(words[word_pos:])
+                    pairs.append((suffix, (book_id, field_pos, word_pos)))
+        pairs.sort()
+        index = cls()
+        index.keys = [key for key, _ in pairs]
+        index.entries = [entry for _, entry in pairs]
+        return index
+
+    def search(self, query, fields=None, limit=None):
+        """
+        초성 접두어가 일치하는 도서 ID를 반환
+        정렬 기준: 전체 일치 > 맨 앞 단어부터 일치 > 제목 > 저자 > ID
+        """
+        prefix = "".join(query.split())
+        if not prefix:
+            return []
+        field_set = set(fields or self.FIELDS)
+
+        best = {}
+        pos = bisect.bisect_left(self.keys, prefix)
+        while pos < len(self.keys) and self.keys[pos].startswith(prefix):
+            book_id, field_pos, word_pos = self.entries[pos]
+            if self.FIELDS[field_pos] in field_set:
+                exact = word_pos == 0 and self.keys[pos] == prefix
+                rank = (not exact, word_pos > 0, field_pos)
+                if book_id not in best or rank < best[book_id]:
+                    best[book_id] = rank
+            pos += 1
+
+        ranked = sorted(best, key=lambda book_id: (best[book_id], book_id))
+        return ranked[:limit] if limit else ranked
+
+
+# === 프로세스 단위 색인 관리 ===
+
+_index = None
+_index_version = None
+_lock = threading.Lock()
+
+
+def _load_rows():
+    """
+    저장된 검색 토큰/초성 키로 색인 입력 생성 (book_id, 토큰, 초성 키, 카테고리 ID)
+    토큰이 없거나 다른 분석기로 만들어진 도서만 텍스트를 다시 분석합니다.
+    """
+    from .models import Book
+
+    analyzer_name = get_analyzer().name
+    stale_ids = []
+    rows = Book.objects.values_list(
+        "id", "search_tokens", "title_chosung", "author_chosung", "category_id"
+    )
+    for book_id, tokens, title_chosung, author_chosung, category_id in rows.iterator():
+        if tokens and tokens.get("analyzer") == analyzer_name and title_chosung:
+            chosung = {"title": title_chosung, "author": author_chosung}
+            yield book_id, tokens, chosung, category_id
+        else:
+            stale_ids.append(book_id)
+
+    if stale_ids:
+        logger.warning(
+            f"⚠️ [SearchIndex] 검색 토큰이 없는 도서 {len(stale_ids)}권 분석 "
+            "(manage.py build_search_tokens 실행 권장)"
+        )
+        rows = Book.objects.filter(id__in=stale_ids).values_list(
+            "id", "category_id", *SEARCH_FIELDS
+        )
+        for row in rows.iterator():
+            values = dict(zip(SEARCH_FIELDS, row[2:]))
+            chosung = {
+                "title": to_chosung(values["title"]),
+                "author": to_chosung(values["author"]),
+            }
+            yield row[0], analyze_fields(values), chosung, row[1]
+
+
+def get_index():
+    """현재 버전의 검색 색인 반환 (버전이 바뀌었으면 다시 색인)"""
+    global _index, _index_version
+
+    version = current_version()
+    if _index is not None and _index_version == version:
+        return _index
+
+    with _lock:
+        if _index is None or _index_version != version:
+            rows = list(_load_rows())
+            index = BookSearchIndex.build(
+                (book_id, tokens) for book_id, tokens, _, _ in rows
+            )
+            index.chosung = ChosungIndex.build(
+                (book_id, chosung) for book_id, _, chosung, _ in rows
+            )
+            # 검색 결과의 카테고리 필터/패싯을 DB 조회 없이 계산
+            index.categories = {
+                book_id: category_id for book_id, _, _, category_id in rows
+            }
+            _index, _index_version = index, version
+            logger.info(f"🔎 [SearchIndex] 색인 생성 완료: {len(index)}권 (v{version})")
+    return _index
+
+
+def invalidate_index():
+    """모든 워커의 검색/자동완성 색인을 무효화 (다음 조회 시 재색인)"""
+    bump_version(_version_key())
+
+
+def search_book_ids(query, fields=None, limit=None):
+    """
+    검색어에 일치하는 도서 ID를 랭킹순으로 반환
+    초성만 입력한 검색어("ㅎㄱ")는 제목/저자 초성 접두어 색인에서 찾습니다.
+    """
+    index = get_index()
+    if is_chosung_query(query):
+        return index.chosung.search(query, fields, limit)
+    return [book_id for book_id, _ in index.search(query, fields, limit)]
+
+
+def book_categories(book_ids):
+    """
+    도서 ID별 카테고리 ID {book_id: category_id} (현재 색인 기준, DB 조회 없음)
+    색인에 없는 도서(삭제된 도서 등)는 제외
+    """
+    categories = get_index().categories
+    return {
+        book_id: categories[book_id] for book_id in book_ids if book_id in categories
+    }
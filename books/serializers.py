@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from .models import Book, Category, Thread, Comment, Reply, BookEmbedding
+from .fieldsets import SparseFieldsetMixin
 
 
-class BookListSerializer(serializers.ModelSerializer):
+class BookListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source="category.name", read_only=True)
 
     class Meta:
@@ -32,37 +33,50 @@ class RelatedBookSerializer(serializers.ModelSerializer):
         )
 
 
-class BookDetailSerializer(serializers.ModelSerializer):
+class BookDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     related_books = serializers.SerializerMethodField()
     is_saved = serializers.SerializerMethodField()
-    saved_count = serializers.SerializerMethodField()
     audiobook_url = serializers.SerializerMethodField()
 
+    column_sources = {"audiobook_url": ("audiobook_file",)}
+
     class Meta:
         model = Book
-        fields = "__all__"
+        # 검색 색인/목록 카드용 비정규화 컬럼은 응답에서 제외
+        exclude = ("search_tokens", "title_chosung", "author_chosung", "card")
 
     def get_related_books(self, obj):
-        """책과 연관된 도서 3권을 반환합니다."""
+        """
+        유사도 순위대로 연관 도서를 반환합니다. (기본 3권, context의 related_limit)
+        BookViewSet.retrieve에서는 순위 상위 k개를 미리 가져오므로 추가 쿼리 없음
+        """
         try:
             # BookEmbedding 객체가 있는지 확인
-            book_embedding = BookEmbedding.objects.get(book=obj)
-            related_books = book_embedding.related_books.all()[:3]
-            return RelatedBookSerializer(related_books, many=True).data
+            book_embedding = obj.embedding
         except BookEmbedding.DoesNotExist:
             return []
+        limit = self.context.get("related_limit", 3)
+        entries = book_embedding.related_entries.all()[:limit]
+        data = []
+        for entry in entries:
+            item = RelatedBookSerializer(entry.book).data
+            item["score"] = entry.score
+            data.append(item)
+        return data
 
     def get_is_saved(self, obj):
-        """현재 사용자가 이 책을 저장했는지 확인"""
+        """
+        현재 사용자가 이 책을 저장했는지 확인
+        context에 saved_book_ids가 있으면 쿼리 없이 집합에서 확인합니다.
+        """
+        saved_ids = self.context.get("saved_book_ids")
+        if saved_ids is not None:
+            return obj.id in saved_ids
         request = self.context.get("request")
         if request and request.user.is_authenticated:
-            return obj.saved_by_users.filter(id=request.user.id).exists()
+            return request.user.saved_books.filter(id=obj.id).exists()
         return False
 
-    def get_saved_count(self, obj):
-        """이 책을 저장한 사용자 수"""
-        return obj.saved_by_users.count()
-
     def get_audiobook_url(self, obj):
         """오디오북 파일의 전체 URL을 반환"""
         if obj.audiobook_file:
@@ -92,12 +106,14 @@ class BookTitleWithCategorySerializer(serializers.ModelSerializer):
 
 
 # 전체 쓰레드
-class ThreadListSerializer(serializers.ModelSerializer):
+class ThreadListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     book = BookTitleWithCategorySerializer()
     likes_count = serializers.SerializerMethodField()
     liked = serializers.SerializerMethodField()
     cover_img_url = serializers.SerializerMethodField()
 
+    column_sources = {"cover_img_url": ("cover_img",)}
+
     class Meta:
         model = Thread
         fields = (
@@ -191,13 +207,15 @@ class ThreadUpdateSerializer(serializers.ModelSerializer):
 
 
 # 단일 쓰레드
-class ThreadDetailSerializer(serializers.ModelSerializer):
+class ThreadDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     book = BookTitleSerializer(read_only=True)
     user = serializers.SerializerMethodField()
     likes_count = serializers.SerializerMethodField()
     liked = serializers.SerializerMethodField()
     cover_img_url = serializers.SerializerMethodField()
 
+    column_sources = {"user": ("user",), "cover_img_url": ("cover_img",)}
+
     class Meta:
         model = Thread
         fields = (
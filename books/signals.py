@@ -0,0 +1,50 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .detail_cache import invalidate_detail, invalidate_related
+from .etags import invalidate_categories
+from .models import Book, Category, RelatedBook
+from .search_index import invalidate_index
+
+
+@receiver(pre_save, sender=Book)
+def analyze_book_search_tokens(sender, instance, **kwargs):
+    """도서 저장(loaddata 포함) 시 검색 토큰과 목록 카드를 미리 계산해 저장"""
+    instance.refresh_search_tokens()
+    instance.refresh_card()
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def invalidate_book_search_index(sender, instance, **kwargs):
+    """도서 추가/수정/삭제 시 검색 색인과 상세 캐시 무효화"""
+    invalidate_index()
+    invalidate_detail(instance.pk)
+
+
+@receiver(post_save, sender=RelatedBook)
+def invalidate_related_details(sender, instance, **kwargs):
+    """
+    연관 도서 저장(loaddata, 관리자 수정) 시 상세 캐시 무효화
+    bulk_create/대량 삭제 경로는 신호가 없으므로 작업 후 invalidate_related를 직접 호출
+    """
+    invalidate_related()
+
+
+@receiver(post_delete, sender=Category)
+def invalidate_category_version(sender, instance, **kwargs):
+    """카테고리 삭제 시 카테고리 버전 증가 (ETag/목록 캐시 무효화)"""
+    invalidate_categories()
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_book_cards(sender, instance, **kwargs):
+    """카테고리 이름 변경(또는 도서보다 늦은 loaddata) 시 소속 도서 카드 갱신"""
+    invalidate_categories()
+    changed = []
+    for book in instance.books.all():
+        if book.card.get("category_name") != instance.name:
+            book.refresh_card(category_name=instance.name)
+            changed.append(book)
+    if changed:
+        Book.objects.bulk_update(changed, ["card"], batch_size=500)
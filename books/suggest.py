@@ -0,0 +1,147 @@
+"""
+검색어 자동완성 (typeahead)
+- 정규화한 제목/저자/출판사의 정렬 배열 + 이분 탐색
+- 짧은 접두어(1~2글자)는 인기순 상위 결과를 미리 계산
+- 카드 표시용 필드를 메모리에 보관해 DB 조회 없이 응답
+"""
+
+import bisect
+import heapq
+import logging
+import threading
+
+from .analysis import is_chosung_query, normalize_text
+from .search_index import current_version, get_index
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_FIELDS = ("title", "author", "publisher")
+# 이 길이 이하의 접두어는 상위 결과를 미리 계산 (범위가 넓어 스캔 비용이 큼)
+PRECOMPUTED_PREFIX_LEN = 2
+PRECOMPUTED_TOP_N = 20
+
+
+def normalize_key(text):
+    """자동완성 키 정규화 (NFKC, 소문자, 연속 공백 제거)"""
+    return " ".join(normalize_text(text).split())
+
+
+class SuggestIndex:
+    """customer_review_rank 순으로 상위 N권을 돌려주는 접두어 색인"""
+
+    def __init__(self):
+        self.keys = []
+        self.book_ids = []
+        # book_id -> 응답용 카드 데이터
+        self.books = {}
+        # book_id -> 인기 점수
+        self.ranks = {}
+        # 짧은 접두어 -> 인기순 book_id 목록
+        self.top_by_prefix = {}
+
+    @classmethod
+    def build(cls, rows):
+        """
+        rows: {"id", "title", "author", "publisher", "cover", "customer_review_rank"}
+        사전의 iterable
+        """
+        index = cls()
+        pairs = []
+        for row in rows:
+            book_id = row["id"]
+            index.books[book_id] = {
+                "id": book_id,
+                "title": row["title"],
+                "author": row["author"],
+                "cover": row["cover"],
+            }
+            index.ranks[book_id] = row["customer_review_rank"] or 0.0
+            for field in SUGGEST_FIELDS:
+                words = normalize_key(row[field]).split(" ")
+                # 각 단어 시작 위치부터의 접미 문자열을 키로 사용
+                for pos in range(len(words)):
+                    key = " ".join(words[pos:])
+                    if key:
+                        pairs.append((key, book_id))
+
+        pairs = sorted(set(pairs))
+        index.keys = [key for key, _ in pairs]
+        index.book_ids = [book_id for _, book_id in pairs]
+        index._precompute_short_prefixes()
+        return index
+
+    def _precompute_short_prefixes(self):
+        candidates = {}
+        for key, book_id in zip(self.keys, self.book_ids):
+            for length in range(1, PRECOMPUTED_PREFIX_LEN + 1):
+                if len(key) >= length:
+                    candidates.setdefault(key[:length], set()).add(book_id)
+        self.top_by_prefix = {
+            prefix: self._top(ids, PRECOMPUTED_TOP_N)
+            for prefix, ids in candidates.items()
+        }
+
+    def _top(self, book_ids, limit):
+        return heapq.nlargest(
+            limit, book_ids, key=lambda book_id: (self.ranks[book_id], -book_id)
+        )
+
+    def suggest_ids(self, prefix, limit=10):
+        prefix = normalize_key(prefix)
+        if not prefix:
+            return []
+        if len(prefix) <= PRECOMPUTED_PREFIX_LEN and limit <= PRECOMPUTED_TOP_N:
+            return self.top_by_prefix.get(prefix, [])[:limit]
+
+        start = bisect.bisect_left(self.keys, prefix)
+        # 접두어로 시작하는 키의 끝 위치 (prefix + 최댓값 문자)
+        end = bisect.bisect_left(self.keys, prefix + "\U0010ffff", start)
+        return self._top(set(self.book_ids[start:end]), limit)
+
+    def suggest(self, prefix, limit=10):
+        return [self.books[book_id] for book_id in self.suggest_ids(prefix, limit)]
+
+
+# === 프로세스 단위 색인 관리 ===
+
+_index = None
+_index_version = None
+_lock = threading.Lock()
+
+
+def _load_rows():
+    from .models import Book
+
+    return Book.objects.values(
+        "id", "title", "author", "publisher", "cover", "customer_review_rank"
+    ).iterator()
+
+
+def get_suggest_index():
+    """현재 버전의 자동완성 색인 반환 (검색 색인과 같은 버전 키 사용)"""
+    global _index, _index_version
+
+    version = current_version()
+    if _index is not None and _index_version == version:
+        return _index
+
+    with _lock:
+        if _index is None or _index_version != version:
+            _index, _index_version = SuggestIndex.build(_load_rows()), version
+            logger.info(
+                f"⌨️ [SuggestIndex] 색인 생성 완료: {len(_index.books)}권 (v{version})"
+            )
+    return _index
+
+
+def get_suggestions(query, limit=10):
+    """
+    자동완성 후보 도서 반환
+    초성 검색어("ㅎㄱ")는 검색 색인의 초성 접두어 색인을 사용합니다.
+    """
+    index = get_suggest_index()
+    if is_chosung_query(query):
+        book_ids = get_index().chosung.search(query)
+        book_ids = [book_id for book_id in book_ids if book_id in index.books]
+        return [index.books[book_id] for book_id in book_ids[:limit]]
+    return index.suggest(query, limit)
@@ -3,14 +3,22 @@ GoBooky API 테스트
 지침에 따른 Django + DRF ViewSet 테스트
 """
 
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
-from .models import Book, Thread, Category
+from .detail_cache import _detail_version_key
+from .models import Book, BookEmbedding, RelatedBook, Thread, Category
+from .serializers import BookListSerializer
 import json
+import time
+from unittest import mock
 
 User = get_user_model()
 
@@ -321,6 +329,512 @@ class CacheTestCase(APITestCase):
         self.assertEqual(response1.data, response2.data)
 
 
+class CursorPaginationTestCase(APITestCase):
+    """커서 페이지네이션 테스트"""
+
+    def setUp(self):
+        """테스트 데이터 설정"""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="cursor@example.com", password="testpass123", username="cursoruser"
+        )
+        self.category = Category.objects.create(name="소설/시/희곡")
+        self.books = [
+            Book.objects.create(
+                category=self.category,
+                title=f"커서 도서 {i}",
+                description="설명",
+                isbn=f"isbn-{i}",
+                cover="https://example.com/cover.jpg",
+                publisher="출판사",
+                pub_date="2023-01-01",
+                author="작가",
+                author_info="작가 정보",
+                author_photo="https://example.com/author.jpg",
+                customer_review_rank=4.0,
+                subTitle="부제목",
+            )
+            for i in range(12)
+        ]
+        for i in range(12):
+            Thread.objects.create(
+                title=f"쓰레드 {i}", content="내용", book=self.books[0], user=self.user
+            )
+        self.user.saved_books.add(*self.books)
+
+    def authenticate_user(self, user):
+        """사용자 인증"""
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    def collect_pages(self, url, params):
+        """next 링크를 따라가며 모든 결과 수집"""
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertIsNone(response.data["previous"])
+        results = list(response.data["results"])
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            results.extend(response.data["results"])
+        return results
+
+    def test_book_list_cursor(self):
+        """도서 목록 커서 페이지 순회"""
+        results = self.collect_pages(reverse("book-list"), {"pagination": "cursor"})
+        self.assertEqual([b["id"] for b in results], [b.id for b in self.books])
+
+    def test_book_list_page_number_default(self):
+        """기본 요청은 기존 페이지 번호 방식 유지"""
+        response = self.client.get(reverse("book-list"))
+        self.assertEqual(response.data["count"], 12)
+
+    def test_thread_list_cursor(self):
+        """쓰레드 목록 커서 페이지 순회 (최신순)"""
+        results = self.collect_pages(reverse("thread-list"), {"pagination": "cursor"})
+        expected = list(
+            Thread.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual([t["id"] for t in results], expected)
+
+    def test_saved_books_cursor(self):
+        """저장한 책 목록 커서 페이지 순회"""
+        self.authenticate_user(self.user)
+        url = reverse("user-books", kwargs={"username": self.user.username})
+        results = self.collect_pages(url, {"pagination": "cursor"})
+        self.assertEqual(
+            [b["id"] for b in results], [b.id for b in reversed(self.books)]
+        )
+
+    def test_user_threads_cursor(self):
+        """사용자 쓰레드 목록 커서 페이지 순회"""
+        self.authenticate_user(self.user)
+        url = reverse("user-threads", kwargs={"username": self.user.username})
+        results = self.collect_pages(url, {"pagination": "cursor"})
+        self.assertEqual(len(results), 12)
+        self.assertEqual(len({t["id"] for t in results}), 12)
+
+
+class SparseFieldsetTestCase(APITestCase):
+    """희소 필드셋(?fields=/?exclude=) 테스트"""
+
+    def setUp(self):
+        """테스트 데이터 설정"""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="fields@example.com", password="testpass123", username="fieldsuser"
+        )
+        self.category = Category.objects.create(name="소설/시/희곡")
+        self.book = Book.objects.create(
+            category=self.category,
+            title="필드 도서",
+            description="긴 설명",
+            isbn="1234567890",
+            cover="https://example.com/cover.jpg",
+            publisher="출판사",
+            pub_date="2023-01-01",
+            author="작가",
+            author_info="긴 작가 정보",
+            author_photo="https://example.com/author.jpg",
+            customer_review_rank=4.0,
+            subTitle="부제목",
+        )
+        self.thread = Thread.objects.create(
+            title="필드 쓰레드", content="내용", book=self.book, user=self.user
+        )
+
+    def test_book_detail_fields(self):
+        """상세 응답과 SQL 컬럼을 요청한 필드로 제한"""
+        url = reverse("book-detail", kwargs={"pk": self.book.pk})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"fields": "id,title,cover"})
+        self.assertEqual(set(response.data), {"id", "title", "cover"})
+        self.assertNotIn("description", queries[0]["sql"])
+        self.assertNotIn("author_info", queries[0]["sql"])
+
+    def test_book_detail_fieldset_cache_key(self):
+        """필드셋별로 다른 캐시를 사용"""
+        url = reverse("book-detail", kwargs={"pk": self.book.pk})
+        response = self.client.get(url, {"fields": "id,title"})
+        self.assertEqual(set(response.data), {"id", "title"})
+        response = self.client.get(url)
+        self.assertIn("description", response.data)
+
+    def test_book_list_exclude(self):
+        """목록 응답에서 제외 필드 제거"""
+        response = self.client.get(
+            reverse("book-list"), {"exclude": "publisher,pub_date"}
+        )
+        item = response.data["results"][0]
+        self.assertNotIn("publisher", item)
+        self.assertNotIn("pub_date", item)
+        self.assertEqual(item["category_name"], "소설/시/희곡")
+
+    def test_thread_list_fields(self):
+        """쓰레드 목록 필드셋"""
+        response = self.client.get(reverse("thread-list"), {"fields": "id,title"})
+        self.assertEqual(
+            response.data["results"], [{"id": self.thread.id, "title": "필드 쓰레드"}]
+        )
+
+    def test_thread_detail_fields(self):
+        """쓰레드 상세 필드셋 (메서드 필드가 쓰는 컬럼 포함)"""
+        url = reverse("thread-detail", kwargs={"pk": self.thread.pk})
+        response = self.client.get(url, {"fields": "id,user"})
+        self.assertEqual(set(response.data), {"id", "user"})
+        self.assertEqual(response.data["user"]["username"], "fieldsuser")
+
+
+class BookCardTestCase(APITestCase):
+    """비정규화 도서 카드 테스트"""
+
+    def setUp(self):
+        """테스트 데이터 설정"""
+        self.client = APIClient()
+        self.category = Category.objects.create(name="소설/시/희곡")
+        self.book = Book.objects.create(
+            category=self.category,
+            title="카드 도서",
+            description="설명",
+            isbn="1234567890",
+            cover="https://example.com/cover.jpg",
+            publisher="출판사",
+            pub_date="2023-01-01",
+            author="작가",
+            author_info="작가 정보",
+            author_photo="https://example.com/author.jpg",
+            customer_review_rank=4.0,
+            subTitle="부제목",
+        )
+
+    def test_card_matches_serializer(self):
+        """목록 응답은 BookListSerializer와 같은 형식"""
+        expected = BookListSerializer(Book.objects.get(pk=self.book.pk)).data
+        response = self.client.get(reverse("book-list"))
+        self.assertEqual(response.data["results"], [dict(expected)])
+
+    def test_list_reads_card_without_join(self):
+        """목록 조회 시 카테고리 JOIN 없음"""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("book-list"))
+        self.assertFalse(any("books_category" in q["sql"] for q in queries))
+
+    def test_category_rename_updates_card(self):
+        """카테고리 이름 변경 시 카드 갱신"""
+        self.category.name = "시"
+        self.category.save()
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.card["category_name"], "시")
+
+    def test_missing_card_is_filled(self):
+        """카드가 없는 도서(백필 전)도 같은 형식으로 응답"""
+        Book.objects.filter(pk=self.book.pk).update(card={})
+        response = self.client.get(reverse("random-books"))
+        self.assertEqual(response.data[0]["category_name"], "소설/시/희곡")
+        self.assertEqual(response.data[0]["pub_date"], "2023-01-01")
+
+
+class BookDetailQueryTestCase(APITestCase):
+    """도서 상세 쿼리 수 및 저장 수 카운터 테스트"""
+
+    def setUp(self):
+        """테스트 데이터 설정"""
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="detail@example.com", password="testpass123", username="detailuser"
+        )
+        self.category = Category.objects.create(name="소설/시/희곡")
+        self.books = [
+            Book.objects.create(
+                category=self.category,
+                title=f"상세 도서 {i}",
+                description="설명",
+                isbn=f"isbn-{i}",
+                cover="https://example.com/cover.jpg",
+                publisher="출판사",
+                pub_date="2023-01-01",
+                author="작가",
+                author_info="작가 정보",
+                author_photo="https://example.com/author.jpg",
+                customer_review_rank=4.0,
+                subTitle="부제목",
+            )
+            for i in range(5)
+        ]
+        self.book = self.books[0]
+        embedding = BookEmbedding.objects.create(book=self.book)
+        # 유사도 순위: books[4], books[3], books[2], books[1]
+        for rank, book in enumerate(reversed(self.books[1:])):
+            RelatedBook.objects.create(
+                embedding=embedding, book=book, rank=rank, score=0.9 - rank * 0.1
+            )
+
+    def authenticate_user(self, user):
+        """사용자 인증"""
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    def test_detail_query_count(self):
+        """상세 조회는 도서 + 임베딩 + 연관 도서 3개 쿼리"""
+        url = reverse("book-detail", kwargs={"pk": self.book.pk})
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data["related_books"]), 3)
+        self.assertEqual(response.data["saved_count"], 0)
+
+    def test_related_books_ordered_by_rank(self):
+        """연관 도서는 유사도 순위대로, ?related=k 만큼 반환"""
+        url = reverse("book-detail", kwargs={"pk": self.book.pk})
+        response = self.client.get(url)
+        self.assertEqual(
+            [b["id"] for b in response.data["related_books"]],
+            [self.books[4].pk, self.books[3].pk, self.books[2].pk],
+        )
+        self.assertAlmostEqual(response.data["related_books"][0]["score"], 0.9)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {"related": 4})
+        self.assertEqual(len(response.data["related_books"]), 4)
+        self.assertEqual(response.data["related_books"][3]["id"], self.books[1].pk)
+
+    def test_detail_cache_shared_with_user_overlay(self):
+        """공용 상세 캐시에 사용자별 is_saved를 덮어씀"""
+        other = User.objects.create_user(
+            email="other@example.com", password="testpass123", username="otheruser"
+        )
+        self.user.saved_books.add(self.book)
+        url = reverse("book-detail", kwargs={"pk": self.book.pk})
+
+        self.authenticate_user(self.user)
+        self.assertTrue(self.client.get(url).data["is_saved"])
+
+        self.authenticate_user(other)
+        # 상세는 캐시, JWT 사용자 조회 + 사용자 저장 목록 조회만 실행
+        with self.assertNumQueries(2):
+            self.assertFalse(self.client.get(url).data["is_saved"])
+
+        self.client.credentials()
+        self.assertFalse(self.client.get(url).data["is_saved"])
+
+    def test_save_toggle_refreshes_detail(self):
+        """저장 토글 후 상세의 is_saved와 saved_count 갱신"""
+        url = reverse("book-detail", kwargs={"pk": self.book.pk})
+        self.authenticate_user(self.user)
+        self.assertFalse(self.client.get(url).data["is_saved"])
+
+        self.client.post(reverse("book-save-toggle", kwargs={"book_id": self.book.pk}))
+        response = self.client.get(url)
+        self.assertTrue(response.data["is_saved"])
+        self.assertEqual(response.data["saved_count"], 1)
+
+    def test_batch_preserves_order(self):
+        """일괄 조회는 입력 순서를 유지하고 없는 ID는 제외"""
+        ids = [self.books[2].pk, 9999, self.book.pk, self.books[1].pk]
+        with self.assertNumQueries(3):  # 도서 + 임베딩 + 연관 도서 (권수와 무관)
+            response = self.client.get(
+                reverse("batch-books"), {"ids": ",".join(map(str, ids))}
+            )
+        self.assertEqual(
+            [b["id"] for b in response.data],
+            [self.books[2].pk, self.book.pk, self.books[1].pk],
+        )
+        self.assertEqual(len(response.data[1]["related_books"]), 3)
+
+    def test_batch_uses_detail_cache(self):
+        """상세 캐시를 공유하고 미스만 조회"""
+        self.client.get(reverse("book-detail", kwargs={"pk": self.book.pk}))
+        ids = f"{self.book.pk},{self.books[1].pk}"
+        with self.assertNumQueries(2):  # books[1]만 DB 조회 (연관 도서 없음)
+            self.client.get(reverse("batch-books"), {"ids": ids})
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("batch-books"), {"ids": ids})
+        self.assertEqual(
+            [b["id"] for b in response.data], [self.book.pk, self.books[1].pk]
+        )
+
+    def test_batch_user_overlay_reads_saved_ids_once(self):
+        """일괄 조회는 사용자 저장 도서 ID 집합을 권수와 무관하게 한 번만 조회"""
+        self.user.saved_books.add(self.books[1])
+        self.authenticate_user(self.user)
+        ids = ",".join(str(book.pk) for book in self.books)
+        with mock.patch("books.detail_cache.cache.get", wraps=cache.get) as cache_get:
+            response = self.client.get(reverse("batch-books"), {"ids": ids})
+        saved_key_reads = [
+            call
+            for call in cache_get.call_args_list
+            if "saved_book_ids" in call.args[0]
+        ]
+        self.assertEqual(len(saved_key_reads), 1)
+        self.assertEqual(
+            [b["is_saved"] for b in response.data], [False, True, False, False, False]
+        )
+
+    def test_batch_limit(self):
+        """최대 100권 제한 및 잘못된 ID"""
+        ids = ",".join(str(i) for i in range(1, 102))
+        response = self.client.get(reverse("batch-books"), {"ids": ids})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse("batch-books"), {"ids": "1,a"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_save_toggle_updates_counter(self):
+        """저장/해제 시 saved_count 증감"""
+        self.authenticate_user(self.user)
+        url = reverse("book-save-toggle", kwargs={"book_id": self.book.pk})
+
+        response = self.client.post(url)
+        self.assertTrue(response.data["is_saved"])
+        self.assertEqual(response.data["saved_count"], 1)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.saved_count, 1)
+
+        response = self.client.post(url)
+        self.assertFalse(response.data["is_saved"])
+        self.assertEqual(response.data["saved_count"], 0)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.saved_count, 0)
+
+
+class ETagTestCase(APITestCase):
+    """ETag / If-None-Match 조건부 응답 테스트"""
+
+    def setUp(self):
+        """테스트 데이터 설정"""
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name="소설/시/희곡")
+        self.book = Book.objects.create(
+            category=self.category,
+            title="ETag 도서",
+            description="설명",
+            isbn="1234567890",
+            cover="https://example.com/cover.jpg",
+            publisher="출판사",
+            pub_date="2023-01-01",
+            author="작가",
+            author_info="작가 정보",
+            author_photo="https://example.com/author.jpg",
+            customer_review_rank=4.0,
+            subTitle="부제목",
+        )
+
+    def assert_not_modified(self, url, params=None):
+        """ETag를 받아 재요청 시 쿼리 없이 304"""
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        return etag
+
+    def test_book_list_etag(self):
+        """도서 목록 304 및 도서 변경 시 ETag 변경"""
+        url = reverse("book-list")
+        etag = self.assert_not_modified(url, {"page": 1})
+        self.book.title = "수정된 도서"
+        self.book.save()
+        response = self.client.get(url, {"page": 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_book_detail_etag(self):
+        """도서 상세 304"""
+        self.assert_not_modified(reverse("book-detail", kwargs={"pk": self.book.pk}))
+
+    def test_book_detail_etag_after_cache_clear(self):
+        """캐시가 비워진 뒤 도서가 바뀌면 이전 ETag로 304를 받지 않음"""
+        url = reverse("book-detail", kwargs={"pk": self.book.pk})
+        etag = self.assert_not_modified(url)
+        cache.clear()
+        self.book.title = "수정된 도서"
+        self.book.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title"], "수정된 도서")
+
+    def test_book_detail_etag_follows_related_books(self):
+        """연관 도서가 바뀌면 상세 ETag와 캐시가 갱신됨"""
+        url = reverse("book-detail", kwargs={"pk": self.book.pk})
+        etag = self.assert_not_modified(url)
+        other = Book.objects.create(
+            category=self.category,
+            title="연관 도서",
+            description="설명",
+            isbn="0987654321",
+            cover="https://example.com/cover.jpg",
+            publisher="출판사",
+            pub_date="2023-01-01",
+            author="작가",
+            author_info="작가 정보",
+            author_photo="https://example.com/author.jpg",
+            customer_review_rank=4.0,
+            subTitle="부제목",
+        )
+        embedding = BookEmbedding.objects.create(book=self.book)
+        RelatedBook.objects.create(embedding=embedding, book=other, rank=0, score=0.9)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([b["id"] for b in response.data["related_books"]], [other.pk])
+
+    def test_missing_book_versions_expire(self):
+        """없는 도서 ID 요청으로 만든 버전 토큰은 상세 캐시 TTL 이후 만료됨"""
+        response = self.client.get(reverse("book-detail", kwargs={"pk": 9999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.client.get(reverse("batch-books"), {"ids": "9998,9999"})
+        keys = [_detail_version_key(book_id) for book_id in (9998, 9999)]
+        self.assertEqual(len(cache.get_many(keys)), 2)
+
+        expired_at = time.time() + settings.CACHE_TTL * 2 + 1
+        with mock.patch("time.time", return_value=expired_at):
+            self.assertEqual(cache.get_many(keys), {})
+
+    def test_category_etag_after_cache_clear(self):
+        """캐시가 비워진 뒤 카테고리가 바뀌면 이전 ETag로 304를 받지 않음"""
+        url = reverse("category-list")
+        etag = self.assert_not_modified(url)
+        cache.clear()
+        Category.objects.create(name="경제/경영")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_book_detail_hides_internal_columns(self):
+        """상세/일괄 응답에 검색/카드용 비정규화 컬럼 제외 (조회도 하지 않음)"""
+        internal = ("search_tokens", "title_chosung", "author_chosung", "card")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("book-detail", kwargs={"pk": self.book.pk})
+            )
+        for field in internal:
+            self.assertNotIn(field, response.data)
+        book_queries = [q["sql"] for q in queries if 'FROM "books_book"' in q["sql"]]
+        self.assertTrue(book_queries)
+        for sql in book_queries:
+            self.assertNotIn('"search_tokens"', sql)
+            self.assertNotIn('"card"', sql)
+
+        response = self.client.get(reverse("batch-books"), {"ids": str(self.book.pk)})
+        for field in internal:
+            self.assertNotIn(field, response.data[0])
+
+    def test_category_list_etag(self):
+        """카테고리 목록 304 및 카테고리 변경 시 새 목록"""
+        url = reverse("category-list")
+        etag = self.assert_not_modified(url)
+        Category.objects.create(name="경제/경영")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+    def test_random_books_etag(self):
+        """랜덤 도서 304 (캐시된 같은 목록)"""
+        self.assert_not_modified(reverse("random-books"))
+
+
 class PermissionTestCase(APITestCase):
     """권한 테스트"""
 
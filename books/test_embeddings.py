@@ -0,0 +1,817 @@
+"""
+도서 임베딩/의미 검색 테스트
+"""
+
+import json
+import os
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from .ann_index import IVFIndex, recall_report
+from .embedding_worker import (
+    EmbeddingWorkerError,
+    EmbeddingWorkerTimeout,
+    collect_batch,
+    encode_remote,
+    queue_key,
+    reply_key,
+    serve_batch,
+)
+from .embeddings import (
+    VectorIndex,
+    book_text,
+    bulk_save_related_books,
+    content_hash,
+    encode_books,
+    get_vector_index,
+    invalidate_vectors,
+    load_vector_index,
+    normalize_rows,
+    rank_neighbours,
+    rows_needing_neighbours,
+    vector_to_bytes,
+)
+from .fixture_stream import FixtureWriter, iter_fixture_records, load_fixture_records
+from .hybrid_search import reciprocal_rank_fusion
+from .models import BookEmbedding, Category, RelatedBook
+from .test_search import create_book
+from .vector_store import (
+    export_vector_store,
+    read_ann_index,
+    read_vector_store,
+    write_ann_index,
+    write_vector_store,
+)
+
+
+class VectorIndexTestCase(SimpleTestCase):
+    """임베딩 행렬 검색 테스트"""
+
+    def setUp(self):
+        self.index = VectorIndex.from_rows(
+            [
+                (1, vector_to_bytes([1.0, 0.0, 0.0])),
+                (2, vector_to_bytes([0.7, 0.7, 0.0])),
+                (3, vector_to_bytes([0.0, 0.0, 2.0])),
+                (4, None),
+            ]
+        )
+
+    def test_rows_without_vector_skipped(self):
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.matrix.dtype, np.float32)
+
+    def test_cosine_ranking(self):
+        """코사인 유사도 내림차순"""
+        query = np.array([1.0, 0.2, 0.0], dtype=np.float32)
+        query /= np.linalg.norm(query)
+        results = self.index.search(query, limit=2)
+        self.assertEqual([book_id for book_id, _ in results], [1, 2])
+        self.assertAlmostEqual(results[0][1], float(query[0]), places=5)
+
+    def test_exclude(self):
+        query = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+        results = self.index.search(query, limit=3, exclude=[1])
+        self.assertEqual([book_id for book_id, _ in results], [2, 3])
+
+
+class IncrementalNeighboursTestCase(SimpleTestCase):
+    """증분 임베딩 생성 (해시 비교, 연관 도서 재계산 대상) 테스트"""
+
+    def setUp(self):
+        self.matrix = normalize_rows(
+            [[1.0, 0.0, 0.0], [0.9, 0.1, 0.0], [0.0, 1.0, 0.0], [0.0, 0.9, 0.1]]
+        )
+
+    def test_content_hash(self):
+        self.assertEqual(
+            content_hash("제목: 채식주의자"), content_hash("제목: 채식주의자")
+        )
+        self.assertNotEqual(
+            content_hash("제목: 채식주의자"), content_hash("제목: 소년이 온다")
+        )
+
+    def test_rank_neighbours(self):
+        """자기 자신을 제외하고 유사도 내림차순"""
+        neighbours = rank_neighbours(self.matrix, [0, 2], 2)
+        self.assertEqual(neighbours[0][0][0], 1)
+        self.assertEqual([col for col, _ in neighbours[2]], [3, 1])
+        self.assertGreater(neighbours[2][0][1], neighbours[2][1][1])
+
+    def test_blocks_match_full_matrix(self):
+        """블록 단위 top-k가 전체 유사도 행렬 정렬 결과와 같음"""
+        matrix = normalize_rows(np.random.default_rng(0).standard_normal((50, 8)))
+        full = matrix @ matrix.T
+        np.fill_diagonal(full, -np.inf)
+        neighbours = rank_neighbours(matrix, range(50), 5, block_size=7)
+        for row in range(50):
+            self.assertEqual(
+                [col for col, _ in neighbours[row]],
+                np.argsort(-full[row])[:5].tolist(),
+            )
+
+    def test_unchanged_rows_are_skipped(self):
+        current = rank_neighbours(self.matrix, range(4), 1)
+        self.assertEqual(rows_needing_neighbours(self.matrix, [], current, 1), set())
+
+    def test_new_row_updates_only_affected_neighbours(self):
+        """새 책과 더 가까워진 책만 재계산"""
+        current = rank_neighbours(self.matrix, range(4), 1)
+        matrix = normalize_rows(np.vstack([self.matrix, [[1.0, -0.05, 0.0]]]))
+        self.assertEqual(rows_needing_neighbours(matrix, [4], current, 1), {0, 4})
+        self.assertEqual(
+            rows_needing_neighbours(matrix, [4], current, 1, block_size=1), {0, 4}
+        )
+
+    def test_changed_neighbour_and_short_lists(self):
+        """바뀐 책을 이웃으로 가진 책, 목록이 부족하거나 점수가 없는 책은 재계산"""
+        current = rank_neighbours(self.matrix, range(4), 1)
+        current[2] = []
+        current[3] = [(2, None)]
+        self.assertEqual(
+            rows_needing_neighbours(self.matrix, [1], current, 1), {0, 1, 2, 3}
+        )
+
+
+class StubModel:
+    """테스트용 문장 임베딩 모델 (인코딩한 문장을 순서대로 기록)"""
+
+    def __init__(self, fail=False):
+        self.encoded = []
+        self.fail = fail
+        self.stopped = []
+
+    def encode(self, texts, **kwargs):
+        if self.fail:
+            raise RuntimeError("encode failed")
+        self.encoded.append(list(texts))
+        return np.array([[float(text), 1.0] for text in texts], dtype=np.float32)
+
+    def start_multi_process_pool(self, target_devices):
+        return {"devices": target_devices}
+
+    def encode_multi_process(self, texts, pool, batch_size=32):
+        return self.encode(texts)
+
+    def stop_multi_process_pool(self, pool):
+        self.stopped.append(pool)
+
+
+class EncodeBooksTestCase(SimpleTestCase):
+    """청크 단위 인코딩 테스트"""
+
+    def setUp(self):
+        self.book_ids = [7, 3, *range(100, 140), 5]
+        self.texts = {book_id: str(book_id) for book_id in self.book_ids}
+
+    def test_encodes_each_book_once_in_order(self):
+        """청크 경계를 넘어도 모든 책을 한 번씩 순서대로 인코딩"""
+        model, progress = StubModel(), []
+        vectors = encode_books(
+            model, self.book_ids, self.texts, batch_size=2, on_chunk=progress.append
+        )
+        # batch_size 2 x 8 = 청크 16권 -> 16, 16, 11
+        self.assertEqual([len(chunk) for chunk in model.encoded], [16, 16, 11])
+        self.assertEqual(
+            [text for chunk in model.encoded for text in chunk],
+            [str(book_id) for book_id in self.book_ids],
+        )
+        self.assertEqual(progress, [16, 32, 43])
+        self.assertEqual(list(vectors), self.book_ids)
+        self.assertEqual(
+            {book_id: vector[0] for book_id, vector in vectors.items()},
+            {book_id: float(book_id) for book_id in self.book_ids},
+        )
+
+    def test_pool_chunks(self):
+        """프로세스 풀 사용 시 청크 크기는 프로세스 수만큼 커지고 풀을 종료"""
+        model = StubModel()
+        encode_books(model, self.book_ids, self.texts, batch_size=2, processes=2)
+        self.assertEqual([len(chunk) for chunk in model.encoded], [32, 11])
+        self.assertEqual(model.stopped, [{"devices": ["cpu", "cpu"]}])
+
+    def test_pool_stopped_on_error(self):
+        """인코딩 중 예외가 나도 프로세스 풀 종료"""
+        model = StubModel(fail=True)
+        with self.assertRaises(RuntimeError):
+            encode_books(model, self.book_ids, self.texts, processes=2)
+        self.assertEqual(model.stopped, [{"devices": ["cpu", "cpu"]}])
+
+
+class BulkRelatedBooksTestCase(TestCase):
+    """연관 도서 일괄 저장 테스트"""
+
+    def test_replaces_entries_in_batches(self):
+        category = Category.objects.create(name="소설")
+        books = [create_book(category, title=f"소설 {i}") for i in range(4)]
+        embeddings = [BookEmbedding.objects.create(book=book) for book in books[:2]]
+        RelatedBook.objects.create(embedding=embeddings[0], book=books[3], rank=0)
+
+        # 삭제 1번 + 배치당 INSERT 1번
+        with self.assertNumQueries(3):
+            count = bulk_save_related_books(
+                {
+                    embeddings[0].id: [(books[1].id, 0.9), (books[2].id, 0.5)],
+                    embeddings[1].id: [(books[0].id, 0.9)],
+                },
+                batch_size=2,
+            )
+
+        self.assertEqual(count, 3)
+        self.assertEqual(
+            list(
+                embeddings[0]
+                .related_entries.order_by("rank")
+                .values_list("book_id", "rank", "score")
+            ),
+            [(books[1].id, 0, 0.9), (books[2].id, 1, 0.5)],
+        )
+
+
+class TestBookEmbeddingCommandTestCase(TestCase):
+    """test_book_embedding 커맨드 (저장된 벡터 재사용) 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        # fixture 파일은 작업 디렉터리 기준 books/fixtures에 기록
+        Path(tmp.name, "books", "fixtures").mkdir(parents=True)
+        cwd = os.getcwd()
+        os.chdir(tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        settings_override = override_settings(EMBEDDING_STORE_DIR=tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        category = Category.objects.create(name="에세이")
+        self.books = [create_book(category, title=f"에세이 {i}") for i in range(13)]
+        for i, book in enumerate(self.books[:12]):
+            text = book_text(book.title, book.author, category.name, book.description)
+            BookEmbedding.objects.create(
+                book=book,
+                vector=vector_to_bytes([1.0, i / 10]),
+                content_hash=content_hash(text),
+            )
+        self.missing = self.books[12]
+        self.target = self.books[0]
+        RelatedBook.objects.create(
+            embedding=self.target.embedding, book=self.books[1], rank=0, score=0.9
+        )
+
+    @mock.patch("books.management.commands.test_book_embedding.get_model")
+    def test_reuses_cached_vectors(self, get_model):
+        """캐시된 책은 다시 인코딩하지 않고 벡터가 없는 책만 인코딩"""
+        encode = get_model.return_value.encode
+        encode.side_effect = lambda texts, **kwargs: np.ones(
+            (len(texts), 2), dtype=np.float32
+        )
+        detail_url = reverse("book-detail", kwargs={"pk": self.target.pk})
+        etag = self.client.get(detail_url)["ETag"]
+
+        call_command("test_book_embedding", book_id=self.target.id, stdout=StringIO())
+
+        encode.assert_called_once()
+        (texts,), _ = encode.call_args
+        self.assertEqual(len(texts), 1)
+        self.assertIn(self.missing.title, texts[0])
+
+        # 출력 수(top_k)와 관계없이 related_k개 저장, 상세 캐시/ETag 무효화
+        self.assertEqual(self.target.embedding.related_entries.count(), 10)
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @mock.patch("books.management.commands.test_book_embedding.get_model")
+    def test_skips_deleted_books_in_store(self, get_model):
+        """재사용한 저장소에 삭제된 책이 있어도 존재하는 책만 연관 도서로 저장"""
+        text = book_text(
+            self.missing.title,
+            self.missing.author,
+            self.missing.category.name,
+            self.missing.description,
+        )
+        BookEmbedding.objects.create(
+            book=self.missing,
+            vector=vector_to_bytes([1.0, 1.2]),
+            content_hash=content_hash(text),
+        )
+        # 타겟과 가장 가까운 벡터를 가진 삭제된 책 (ID 99999)
+        book_ids = [book.id for book in self.books] + [99999]
+        matrix = [[1.0, i / 10] for i in range(13)] + [[1.0, 0.01]]
+        write_vector_store(book_ids, matrix)
+
+        out = StringIO()
+        call_command("test_book_embedding", book_id=self.target.id, stdout=out)
+
+        get_model.return_value.encode.assert_not_called()
+        self.assertIn("삭제된 책 1권", out.getvalue())
+        related_ids = list(
+            self.target.embedding.related_entries.values_list("book_id", flat=True)
+        )
+        self.assertEqual(len(related_ids), 10)
+        self.assertNotIn(99999, related_ids)
+        self.assertEqual(related_ids[0], self.books[1].id)
+
+
+class FixtureStreamTestCase(TestCase):
+    """연관 도서 fixture 스트리밍 입출력 테스트"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+        category = Category.objects.create(name="소설")
+        self.books = [create_book(category, title=f"소설 {i}") for i in range(3)]
+        self.records = [
+            {
+                "model": "books.bookembedding",
+                "pk": 10,
+                "fields": {"book": self.books[0].id},
+            },
+            {
+                "model": "books.relatedbook",
+                "pk": 20,
+                "fields": {
+                    "embedding": 10,
+                    "book": self.books[1].id,
+                    "rank": 0,
+                    "score": 0.9,
+                },
+            },
+            {
+                "model": "books.relatedbook",
+                "pk": 21,
+                "fields": {
+                    "embedding": 10,
+                    "book": self.books[2].id,
+                    "rank": 1,
+                    "score": None,
+                },
+            },
+        ]
+
+    def test_formats_round_trip(self):
+        """각 형식으로 쓴 파일을 작은 청크로 나눠 읽어도 같은 레코드"""
+        for fmt, name in (
+            ("compact", "a.json"),
+            ("indent", "b.json"),
+            ("jsonl", "c.jsonl"),
+        ):
+            path = self.directory / name
+            with FixtureWriter(path, fmt) as writer:
+                writer.write_many(iter(self.records))
+            self.assertEqual(writer.count, 3)
+            self.assertEqual(
+                list(iter_fixture_records(path, chunk_size=7)), self.records
+            )
+            if fmt != "jsonl":
+                self.assertEqual(
+                    json.loads(path.read_text(encoding="utf-8")), self.records
+                )
+
+        compact = (self.directory / "a.json").read_text(encoding="utf-8")
+        self.assertEqual(len(compact.splitlines()), 5)
+
+    def test_empty_fixture(self):
+        path = self.directory / "empty.json"
+        with FixtureWriter(path):
+            pass
+        self.assertEqual(json.loads(path.read_text(encoding="utf-8")), [])
+        self.assertEqual(list(iter_fixture_records(path)), [])
+
+    def test_load_records(self):
+        """배치로 적재하고 기존 PK는 fixture에 있는 필드만 갱신"""
+        embedding = BookEmbedding.objects.create(
+            pk=10, book=self.books[0], vector=vector_to_bytes([1, 0])
+        )
+
+        with self.assertNumQueries(6):
+            count = load_fixture_records(iter(self.records), batch_size=2)
+
+        self.assertEqual(count, 3)
+        embedding.refresh_from_db()
+        self.assertEqual(bytes(embedding.vector), vector_to_bytes([1, 0]))
+        self.assertEqual(
+            list(
+                embedding.related_entries.values_list("pk", "book_id", "rank", "score")
+            ),
+            [(20, self.books[1].id, 0, 0.9), (21, self.books[2].id, 1, None)],
+        )
+
+    def test_load_invalidates_details_after_commit(self):
+        """상세 캐시 무효화는 트랜잭션 커밋 후 한 번만 실행"""
+        with mock.patch("books.fixture_stream.invalidate_related") as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                load_fixture_records(iter(self.records))
+                invalidate.assert_not_called()
+        invalidate.assert_called_once_with()
+
+    def test_rejects_models_with_save_signals(self):
+        """저장 신호가 필요한 모델(도서 등)은 적재하지 않고 전체 롤백"""
+        book = {
+            "model": "books.book",
+            "pk": 100,
+            "fields": {"title": "fixture 도서"},
+        }
+        with self.assertRaisesMessage(ValueError, "books.book"):
+            load_fixture_records(iter([*self.records, book]), batch_size=1)
+        self.assertFalse(BookEmbedding.objects.exists())
+
+
+class VectorStoreTestCase(TestCase):
+    """임베딩 파일 저장소 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    def test_write_and_mmap(self):
+        """정규화된 float32 행렬을 메모리 맵으로 읽음"""
+        write_vector_store([3, 1], [[3, 4], [0, 2]], self.directory)
+        book_ids, matrix, _ = read_vector_store(self.directory)
+        self.assertEqual(book_ids.tolist(), [3, 1])
+        self.assertIsInstance(matrix, np.memmap)
+        self.assertEqual(matrix.dtype, np.float32)
+        np.testing.assert_allclose(matrix, [[0.6, 0.8], [0, 1]], rtol=1e-6)
+
+    def test_rewrite_keeps_previous_generation(self):
+        """새 버전을 쓰면 직전 버전 파일은 남기고 그 이전 버전 파일만 삭제"""
+        first = write_vector_store([1], [[1, 0]], self.directory)
+        second = write_vector_store([1, 2], [[1, 0], [0, 1]], self.directory)
+        self.assertNotEqual(first["version"], second["version"])
+        book_ids, _, _ = read_vector_store(self.directory)
+        self.assertEqual(book_ids.tolist(), [1, 2])
+        # 첫 버전 manifest를 읽은 워커도 파일을 열 수 있음
+        directory = Path(self.directory)
+        self.assertEqual(np.load(directory / first["ids"]).tolist(), [1])
+
+        third = write_vector_store([2], [[0, 1]], self.directory)
+        remaining = {path.name for path in directory.glob("*.npy")}
+        self.assertEqual(
+            remaining,
+            {second["vectors"], second["ids"], third["vectors"], third["ids"]},
+        )
+
+    def test_missing_store(self):
+        self.assertIsNone(read_vector_store(self.directory))
+
+    def test_vector_index_prefers_store(self):
+        """저장소가 있으면 DB 대신 메모리 맵 행렬 사용"""
+        category = Category.objects.create(name="에세이")
+        book1 = create_book(category, title="위로의 에세이")
+        book2 = create_book(category, title="수학의 정석")
+        BookEmbedding.objects.create(book=book1, vector=vector_to_bytes([1, 0]))
+        BookEmbedding.objects.create(book=book2, vector=vector_to_bytes([0, 1]))
+
+        with override_settings(EMBEDDING_STORE_DIR=self.directory):
+            export_vector_store()
+            index = load_vector_index()
+
+        self.assertIsInstance(index.matrix, np.memmap)
+        self.assertEqual(
+            [book_id for book_id, _ in index.search(np.array([0.1, 0.9]), 2)],
+            [book2.id, book1.id],
+        )
+
+
+class AnnIndexTestCase(SimpleTestCase):
+    """IVF 근사 최근접 이웃 인덱스 테스트"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        centers = rng.standard_normal((8, 16))
+        self.matrix = normalize_rows(
+            centers[rng.integers(0, 8, 400)] + 0.1 * rng.standard_normal((400, 16))
+        )
+        self.index = VectorIndex(np.arange(1, 401), self.matrix)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    def test_probe_all_lists_is_exact(self):
+        ivf = IVFIndex.build(self.matrix, n_lists=8)
+        query = self.matrix[0]
+        self.assertEqual(
+            self.index.search(query, 5, nprobe=8, ann=ivf),
+            self.index.search(query, 5, exact=True),
+        )
+
+    def test_recall_report(self):
+        """nprobe가 늘면 재현율이 줄지 않음"""
+        ivf = IVFIndex.build(self.matrix, n_lists=16)
+        report = recall_report(self.index, ivf, [1, 4, 16], k=5, queries=50)
+        recalls = [row["recall"] for row in report]
+        self.assertEqual(recalls, sorted(recalls))
+        self.assertEqual(recalls[-1], 1.0)
+        self.assertEqual(report[-1]["scanned"], 1.0)
+
+    def test_exclude_with_ann(self):
+        ivf = IVFIndex.build(self.matrix, n_lists=4)
+        results = self.index.search(self.matrix[0], 3, exclude=[1], nprobe=4, ann=ivf)
+        self.assertNotIn(1, [book_id for book_id, _ in results])
+
+    def test_probe_returns_limit_rows(self):
+        """탐색한 목록의 행이 limit보다 적으면 목록을 더 탐색해 limit개 반환"""
+        rng = np.random.default_rng(1)
+        centers = rng.standard_normal((20, 32))
+        matrix = normalize_rows(
+            centers[rng.integers(0, 20, 1000)] + 0.3 * rng.standard_normal((1000, 32))
+        )
+        index = VectorIndex(np.arange(1, 1001), matrix)
+        ivf = IVFIndex.build(matrix, nprobe=1)
+
+        hits = 0
+        for row in range(0, 1000, 50):
+            results = index.search(matrix[row], 100, exclude=[row + 1], ann=ivf)
+            self.assertEqual(len(results), 100)
+            exact = index.search(matrix[row], 10, exclude=[row + 1], exact=True)
+            hits += len(
+                {book_id for book_id, _ in exact}
+                & {book_id for book_id, _ in results[:10]}
+            )
+        self.assertGreaterEqual(hits / 200, 0.9)
+
+    def test_small_index_skips_ann(self):
+        """도서 수가 ANN_MIN_ROWS 미만이면 ANN 인덱스를 적재하지 않고 전수 비교"""
+        loader = mock.Mock()
+        index = VectorIndex(np.arange(1, 401), self.matrix, ann_loader=loader)
+        self.assertEqual(
+            index.search(self.matrix[0], 5),
+            index.search(self.matrix[0], 5, exact=True),
+        )
+        loader.assert_not_called()
+
+    @mock.patch("books.embeddings.ANN_MIN_ROWS", 0)
+    def test_saved_next_to_store_and_loaded_lazily(self):
+        """ANN 인덱스는 저장소 버전과 함께 저장되고 첫 검색 때 적재"""
+        write_vector_store(np.arange(1, 401), self.matrix, self.directory)
+        write_ann_index(lists=8, nprobe=2, directory=self.directory)
+        _, matrix, manifest = read_vector_store(self.directory)
+
+        loader = mock.Mock(side_effect=lambda: read_ann_index(manifest, self.directory))
+        index = VectorIndex(np.arange(1, 401), matrix, ann_loader=loader)
+        loader.assert_not_called()
+        index.search(self.matrix[0], 3)
+        index.search(self.matrix[1], 3)
+        loader.assert_called_once()
+        self.assertEqual((index.ann.n_lists, index.ann.nprobe), (8, 2))
+
+    def test_rebuilt_when_store_is_rewritten(self):
+        """저장소를 다시 쓰면 같은 설정으로 ANN 인덱스 재생성, 직전 버전까지만 유지"""
+        first = write_vector_store(np.arange(1, 401), self.matrix, self.directory)
+        write_ann_index(lists=8, directory=self.directory)
+        second = write_vector_store(
+            np.arange(1, 301), self.matrix[:300], self.directory
+        )
+        self.assertEqual(second["ann"]["lists"], 8)
+        self.assertEqual(len(read_ann_index(second, self.directory)), 300)
+
+        third = write_vector_store(np.arange(1, 201), self.matrix[:200], self.directory)
+        remaining = {path.name for path in Path(self.directory).glob("ivf-*.npz")}
+        self.assertNotIn(f"ivf-{first['version']}.npz", remaining)
+        self.assertEqual(remaining, {second["ann"]["file"], third["ann"]["file"]})
+
+
+class FakeRedisLists:
+    """테스트용 Redis 리스트 (워커는 on_wait로 클라이언트 대기 중에 실행)"""
+
+    def __init__(self, on_wait=None):
+        self.lists = {}
+        self.on_wait = on_wait
+
+    def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value)
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value)
+
+    def rpop(self, key):
+        items = self.lists.get(key)
+        return items.pop() if items else None
+
+    def brpop(self, key, timeout=0):
+        value = self.rpop(key)
+        return None if value is None else (key, value)
+
+    def blpop(self, key, timeout=0):
+        if self.on_wait:
+            self.on_wait(self)
+        items = self.lists.get(key)
+        return (key, items.pop(0)) if items else None
+
+    def expire(self, key, seconds):
+        pass
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+
+def fake_encode(texts):
+    return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+class EmbeddingWorkerTestCase(SimpleTestCase):
+    """임베딩 워커 요청 큐 테스트"""
+
+    def run_worker(self, conn, encode=fake_encode):
+        serve_batch(conn, encode, collect_batch(conn, 256, 0))
+
+    def test_round_trip(self):
+        conn = FakeRedisLists(on_wait=self.run_worker)
+        vectors = encode_remote(["가", "나다"], timeout=1, conn=conn)
+        np.testing.assert_array_equal(vectors, [[1, 1], [2, 1]])
+
+    def test_micro_batch(self):
+        """대기 중인 요청을 한 번의 인코딩으로 처리하고 요청별로 나눠 응답"""
+        conn = FakeRedisLists()
+        for texts in (["가"], ["나다", "라"]):
+            conn.lpush(
+                queue_key(),
+                json.dumps({"id": texts[0], "texts": texts, "deadline": 1e12}),
+            )
+        encode = mock.Mock(side_effect=fake_encode)
+
+        self.run_worker(conn, encode)
+
+        encode.assert_called_once_with(["가", "나다", "라"])
+        self.assertEqual(len(conn.lists[reply_key("나다")]), 1)
+
+    def test_expired_requests_are_skipped(self):
+        conn = FakeRedisLists()
+        conn.lpush(
+            queue_key(),
+            json.dumps({"id": "old", "texts": ["가"], "deadline": 0}),
+        )
+        self.assertEqual(collect_batch(conn, 256, 0), [])
+
+    def test_malformed_requests_are_dropped(self):
+        """형식이 잘못된 요청은 로그를 남기고 버린 뒤 나머지 요청을 처리"""
+        conn = FakeRedisLists()
+        for raw in (
+            b"{not json",
+            json.dumps({"id": "bad", "texts": "가", "deadline": 1e12}),
+            json.dumps({"id": "ok", "texts": ["가"], "deadline": 1e12}),
+            json.dumps(["가"]),
+            b"\xff",
+        ):
+            conn.lpush(queue_key(), raw)
+
+        requests = []
+        with self.assertLogs("books.embedding_worker", "WARNING") as logs:
+            while conn.lists[queue_key()]:
+                requests += collect_batch(conn, 256, 0)
+        self.assertEqual([request["id"] for request in requests], ["ok"])
+        self.assertEqual(len(logs.output), 4)
+        self.assertIn("{not json", logs.output[0])
+
+    def test_timeout(self):
+        with self.assertRaises(EmbeddingWorkerTimeout):
+            encode_remote(["가"], timeout=0.01, conn=FakeRedisLists())
+
+    def test_encode_error(self):
+        def failing_worker(conn):
+            self.run_worker(conn, mock.Mock(side_effect=RuntimeError("OOM")))
+
+        with self.assertRaisesMessage(EmbeddingWorkerError, "OOM"):
+            encode_remote(
+                ["가"], timeout=1, conn=FakeRedisLists(on_wait=failing_worker)
+            )
+
+
+class ReciprocalRankFusionTestCase(SimpleTestCase):
+    """RRF 결합 테스트"""
+
+    def test_items_in_both_lists_ranked_first(self):
+        fused = reciprocal_rank_fusion([[1, 2, 3], [3, 4, 1]])
+        self.assertEqual([book_id for book_id, _ in fused][:2], [1, 3])
+        self.assertEqual({book_id for book_id, _ in fused}, {1, 2, 3, 4})
+
+    def test_empty_list_ignored(self):
+        fused = reciprocal_rank_fusion([[5, 6], []])
+        self.assertEqual([book_id for book_id, _ in fused], [5, 6])
+
+
+class SemanticSearchAPITestCase(APITestCase):
+    """의미 검색 API 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        category = Category.objects.create(name="에세이")
+        self.book1 = create_book(category, title="위로의 에세이")
+        self.book2 = create_book(category, title="수학의 정석")
+        BookEmbedding.objects.create(book=self.book1, vector=vector_to_bytes([1, 0]))
+        BookEmbedding.objects.create(book=self.book2, vector=vector_to_bytes([0, 1]))
+        invalidate_vectors()
+
+    @mock.patch("books.embeddings.encode_query")
+    def test_semantic_search(self, encode_query):
+        encode_query.return_value = np.array([0.9, 0.1], dtype=np.float32)
+
+        response = self.client.get(
+            reverse("semantic-search-books"), {"q": "위로가 되는 에세이"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [b["id"] for b in response.data], [self.book1.id, self.book2.id]
+        )
+        self.assertIn("score", response.data[0])
+        encode_query.assert_called_once_with("위로가 되는 에세이")
+
+    @mock.patch("books.embeddings.encode_query")
+    def test_semantic_search_cache_follows_vectors(self, encode_query):
+        """임베딩을 다시 만들면 캐시된 의미 검색 결과를 사용하지 않음"""
+        encode_query.return_value = np.array([0.9, 0.1], dtype=np.float32)
+        url = reverse("semantic-search-books")
+        for _ in range(3):
+            response = self.client.get(url, {"q": "캐시된 에세이"})
+        self.assertEqual(len(response.data), 2)
+
+        book3 = create_book(self.book1.category, title="새 에세이")
+        BookEmbedding.objects.create(book=book3, vector=vector_to_bytes([1, 0]))
+        invalidate_vectors()
+        response = self.client.get(url, {"q": "캐시된 에세이"})
+        self.assertIn(book3.id, [b["id"] for b in response.data])
+
+    def test_vectors_version_survives_cache_clear(self):
+        """캐시가 비워진 뒤 임베딩을 다시 만들어도 이전 행렬을 재사용하지 않음"""
+        self.assertEqual(len(get_vector_index()), 2)
+
+        cache.clear()
+        book3 = create_book(self.book1.category, title="새 에세이")
+        BookEmbedding.objects.create(book=book3, vector=vector_to_bytes([1, 1]))
+        invalidate_vectors()
+        self.assertEqual(len(get_vector_index()), 3)
+
+    @override_settings(EMBEDDING_WORKER_ENABLED=True)
+    @mock.patch("books.embedding_worker.get_connection")
+    def test_semantic_search_worker_timeout(self, get_connection):
+        """임베딩 워커가 응답하지 않으면 503"""
+        get_connection.return_value = FakeRedisLists()
+
+        response = self.client.get(reverse("semantic-search-books"), {"q": "에세이"})
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    @mock.patch("books.embeddings.encode_query")
+    def test_hybrid_search(self, encode_query):
+        """키워드 결과와 벡터 결과를 결합하고 단계별 시간을 헤더로 반환"""
+        encode_query.return_value = np.array([0.1, 0.9], dtype=np.float32)
+
+        response = self.client.get(
+            reverse("search-books"), {"q": "에세이", "mode": "hybrid"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # 키워드 1위(book1)와 벡터 1위(book2)가 모두 포함
+        self.assertEqual(
+            {b["id"] for b in response.data}, {self.book1.id, self.book2.id}
+        )
+        self.assertIn("lexical;dur=", response["Server-Timing"])
+        self.assertIn("vector;dur=", response["Server-Timing"])
+        self.assertIn("hydrate;dur=", response["Server-Timing"])
+
+    @mock.patch("books.embeddings.encode_query")
+    def test_hybrid_book_list(self, encode_query):
+        encode_query.return_value = np.array([0.0, 1.0], dtype=np.float32)
+
+        response = self.client.get(
+            reverse("book-list"), {"search": "수학", "mode": "hybrid"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["id"], self.book2.id)
+        self.assertIn("fusion;dur=", response["Server-Timing"])
+
+    @mock.patch("books.embeddings.encode_query")
+    def test_hybrid_book_list_after_cache_clear(self, encode_query):
+        """캐시가 비워진 뒤 추가된 도서도 하이브리드 목록에 포함 (테스트 간 색인 공유 방지)"""
+        encode_query.return_value = np.array([0.0, 1.0], dtype=np.float32)
+        self.client.get(reverse("book-list"), {"search": "수학", "mode": "hybrid"})
+
+        cache.clear()
+        book3 = create_book(self.book1.category, title="수학 산책")
+        BookEmbedding.objects.create(book=book3, vector=vector_to_bytes([0, 1]))
+        invalidate_vectors()
+
+        response = self.client.get(
+            reverse("book-list"), {"search": "수학", "mode": "hybrid"}
+        )
+        ids = [b["id"] for b in response.data["results"]]
+        self.assertEqual(set(ids[:2]), {self.book2.id, book3.id})
@@ -0,0 +1,387 @@
+"""
+도서 검색 테스트
+역색인/분석기 단위 테스트 및 검색 API 테스트
+"""
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+from .analysis import (
+    MecabAnalyzer,
+    NgramAnalyzer,
+    analyze_fields,
+    is_chosung_query,
+    to_chosung,
+)
+from .models import Book, Category
+from .search_cache import CountMinSketch, SearchResultCache, normalize_query
+from .search_index import BookSearchIndex, ChosungIndex
+from .suggest import SuggestIndex
+
+
+def create_book(category, **fields):
+    """테스트용 도서 생성"""
+    data = {
+        "description": "",
+        "isbn": "1234567890",
+        "cover": "https://example.com/cover.jpg",
+        "publisher": "테스트 출판사",
+        "pub_date": "2023-01-01",
+        "author": "테스트 작가",
+        "author_info": "테스트 작가 정보",
+        "author_photo": "https://example.com/author.jpg",
+        "customer_review_rank": 4.5,
+        "subTitle": "",
+    }
+    data.update(fields)
+    return Book.objects.create(category=category, **data)
+
+
+class SearchIndexTestCase(SimpleTestCase):
+    """역색인 단위 테스트"""
+
+    def setUp(self):
+        books = [
+            (1, {"title": "소년이 온다", "author": "한강", "description": "광주"}),
+            (2, {"title": "채식주의자", "author": "한강", "description": ""}),
+            (3, {"title": "한강의 기적", "author": "홍길동", "description": ""}),
+            (4, {"title": "코스모스", "author": "칼 세이건", "description": "한강"}),
+        ]
+        self.index = BookSearchIndex.build(
+            (book_id, analyze_fields(values)) for book_id, values in books
+        )
+
+    def test_tokenize_hangul_ngrams(self):
+        """한글 단어는 조사가 붙어도 부분 일치하도록 n-gram 색인"""
+        analyzer = NgramAnalyzer()
+        self.assertIn("한강", analyzer.tokenize("한강의"))
+        self.assertEqual(
+            analyzer.query_term_sets("  채식주의자 "),
+            [["채식", "식주", "주의", "의자"]],
+        )
+
+    def test_latin_partial_word(self):
+        """영문 단어 일부로도 검색 (3-gram, 대소문자 무시)"""
+        index = BookSearchIndex.build(
+            [
+                (1, analyze_fields({"title": "Python Cookbook", "author": "Beazley"})),
+                (2, analyze_fields({"title": "Cooking Basics", "author": "Kim"})),
+            ]
+        )
+
+        def search(query):
+            return sorted(book_id for book_id, _ in index.search(query))
+
+        self.assertEqual(search("cook"), [1, 2])
+        self.assertEqual(search("PYTHON cook"), [1])
+        self.assertEqual(search("book"), [1])
+        self.assertEqual(search("thon"), [1])
+        self.assertEqual(search("cookies"), [])
+
+    def test_search_matches_all_terms(self):
+        """모든 검색 토큰을 포함한 도서만 반환"""
+        ids = [book_id for book_id, _ in self.index.search("채식주의자")]
+        self.assertEqual(ids, [2])
+
+    def test_field_boost_ranking(self):
+        """제목/저자 일치가 설명 일치보다 높은 순위"""
+        ids = [book_id for book_id, _ in self.index.search("한강")]
+        self.assertEqual(set(ids), {1, 2, 3, 4})
+        self.assertEqual(ids[-1], 4)
+
+    def test_field_restriction(self):
+        """필드를 제한하면 다른 필드 일치는 제외"""
+        ids = [
+            book_id
+            for book_id, _ in self.index.search("한강", fields=("title", "author"))
+        ]
+        self.assertNotIn(4, ids)
+
+
+class FakeNode:
+    def __init__(self, surface, feature, next_node=None):
+        self.surface = surface
+        self.feature = feature
+        self.next = next_node
+
+
+class FakeTagger:
+    """mecab-ko-dic 출력 형식을 흉내내는 테스트용 태거"""
+
+    def parseToNode(self, text):
+        nodes = FakeNode("", "BOS/EOS,*,*,*,*,*,*,*")
+        nodes.next = FakeNode(
+            "책",
+            "NNG,*,F,책,*,*,*,*",
+            FakeNode(
+                "을",
+                "JKO,*,T,을,*,*,*,*",
+                FakeNode(
+                    "읽었다",
+                    "VV+EP+EF,*,F,읽었다,Inflect,VV,EF,읽/VV/*+었/EP/*+다/EF/*",
+                ),
+            ),
+        )
+        return nodes
+
+
+class MecabAnalyzerTestCase(SimpleTestCase):
+    """형태소 분석기 테스트"""
+
+    def test_inflected_forms_use_lemma(self):
+        """활용형은 원형으로, 조사는 제외하고 추출"""
+        analyzer = MecabAnalyzer(FakeTagger())
+        self.assertEqual(analyzer.morphemes("책을 읽었다"), ["책", "읽"])
+        self.assertEqual(analyzer.query_term_sets("책을 읽었다")[0], ["책", "읽"])
+
+
+class ChosungIndexTestCase(SimpleTestCase):
+    """초성 접두어 색인 테스트"""
+
+    def setUp(self):
+        books = [
+            (1, "소년이 온다", "한강"),
+            (2, "한강의 기적", "홍길동"),
+            (3, "하늘과 바람과 별과 시", "윤동주"),
+        ]
+        self.index = ChosungIndex.build(
+            (book_id, {"title": to_chosung(title), "author": to_chosung(author)})
+            for book_id, title, author in books
+        )
+
+    def test_to_chosung(self):
+        self.assertEqual(to_chosung("소년이 온다"), "ㅅㄴㅇ ㅇㄷ")
+        self.assertTrue(is_chosung_query(" ㅎㄱ "))
+        self.assertFalse(is_chosung_query("한ㄱ"))
+
+    def test_exact_match_ranked_first(self):
+        """초성 전체 일치(저자 한강)가 접두어 일치보다 앞"""
+        self.assertEqual(self.index.search("ㅎㄱ"), [1, 2])
+
+    def test_word_start_match(self):
+        """중간 단어의 초성으로도 검색 (맨 앞 단어부터 일치한 결과가 우선)"""
+        self.assertEqual(self.index.search("ㅂㄹ"), [3])
+        self.assertEqual(self.index.search("ㅇㄷ"), [3, 1])
+
+
+class SuggestIndexTestCase(SimpleTestCase):
+    """자동완성 접두어 색인 테스트"""
+
+    def setUp(self):
+        rows = [
+            (1, "Harry Potter", "J.K. Rowling", 4.0),
+            (2, "Harry Potter 2", "J.K. Rowling", 4.8),
+            (3, "소년이 온다", "한강", 4.5),
+            (4, "해리 포터", "롤링", 3.0),
+        ]
+        self.index = SuggestIndex.build(
+            {
+                "id": book_id,
+                "title": title,
+                "author": author,
+                "publisher": "출판사",
+                "cover": "",
+                "customer_review_rank": rank,
+            }
+            for book_id, title, author, rank in rows
+        )
+
+    def test_prefix_ranked_by_review(self):
+        """접두어 일치 결과는 평점순"""
+        self.assertEqual(self.index.suggest_ids("harry p"), [2, 1])
+        self.assertEqual(self.index.suggest_ids("  HARRY   po"), [2, 1])
+
+    def test_short_prefix_precomputed(self):
+        """짧은 접두어도 같은 결과 (미리 계산한 상위 목록)"""
+        self.assertEqual(self.index.suggest_ids("h", limit=2), [2, 1])
+        self.assertEqual(self.index.suggest_ids("온다"), [3])
+
+    def test_author_match(self):
+        self.assertEqual(self.index.suggest_ids("rowl"), [2, 1])
+
+
+class SearchResultCacheTestCase(SimpleTestCase):
+    """검색 결과 캐시 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        self.search_cache = SearchResultCache(threshold=2)
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  한강 "), "한강")
+        self.assertEqual(normalize_query("Harry   POTTER"), "harry potter")
+        # NFD로 입력된 한글도 같은 키
+        self.assertEqual(normalize_query("\u1112\u1161\u11ab"), "한")
+
+    def test_same_key_for_equivalent_queries(self):
+        self.assertEqual(
+            self.search_cache.make_key("book_search", " 한강"),
+            self.search_cache.make_key("book_search", "한강 "),
+        )
+
+    def test_admits_only_repeated_queries(self):
+        """한 번만 조회된 검색어는 저장하지 않음"""
+        key = self.search_cache.make_key("book_search", "오타검색어")
+        self.assertFalse(self.search_cache.set(key, [1]))
+        self.assertIsNone(self.search_cache.get(key))
+        self.assertTrue(self.search_cache.set(key, [1]))
+        self.assertEqual(self.search_cache.get(key), [1])
+
+        stats = self.search_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual((stats["admitted"], stats["rejected"]), (1, 1))
+        self.assertEqual(stats["hit_ratio"], 0.5)
+
+    def test_count_min_sketch_decay(self):
+        sketch = CountMinSketch(width=64, depth=3, reset_interval=4)
+        for _ in range(3):
+            sketch.add("a")
+        self.assertEqual(sketch.estimate("a"), 3)
+        sketch.add("b")  # 4번째 추가 시 카운터 절반으로 감소
+        self.assertEqual(sketch.estimate("a"), 1)
+
+
+class SearchAPITestCase(APITestCase):
+    """검색 API 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name="소설/시/희곡")
+        self.book1 = create_book(self.category, title="소년이 온다", author="한강")
+        self.book2 = create_book(
+            self.category,
+            title="코스모스",
+            author="칼 세이건",
+            description="한강 이야기",
+        )
+
+    def test_search_books_endpoint(self):
+        """/api/books/search/ 는 제목/저자/출판사만 검색"""
+        response = self.client.get(reverse("search-books"), {"q": "한강"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([b["id"] for b in response.data], [self.book1.id])
+
+    def test_book_list_search(self):
+        """목록 API 검색은 설명까지 포함해 랭킹순 반환"""
+        response = self.client.get(reverse("book-list"), {"search": "한강"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [b["id"] for b in response.data["results"]]
+        self.assertEqual(ids, [self.book1.id, self.book2.id])
+
+    def test_search_books_facets(self):
+        """facets=category 요청 시 카테고리별 건수를 함께 반환"""
+        other = Category.objects.create(name="에세이")
+        book3 = create_book(other, title="한강 산책", author="김작가")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("search-books"), {"q": "한강", "facets": "category"}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # 검색 결과 ID로 도서를 다시 집계하지 않음 (카드 조회 + 카테고리 이름 조회)
+        self.assertFalse([q for q in queries if "GROUP BY" in q["sql"]])
+        self.assertEqual(
+            {b["id"] for b in response.data["results"]}, {self.book1.id, book3.id}
+        )
+        self.assertEqual(
+            response.data["facets"]["category"],
+            [
+                {"id": self.category.id, "name": "소설/시/희곡", "count": 1},
+                {"id": other.id, "name": "에세이", "count": 1},
+            ],
+        )
+
+    def test_book_list_facets_ignore_category_filter(self):
+        """목록 패싯은 카테고리 필터 적용 전 검색 결과로 집계"""
+        other = Category.objects.create(name="에세이")
+        create_book(other, title="한강 산책")
+        create_book(other, title="한강 걷기")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("book-list"),
+                {"search": "한강", "category": other.id, "facets": "category"},
+            )
+        # 카테고리별 count()/GROUP BY 없이 색인의 카테고리로 집계
+        grouped = [q for q in queries if "GROUP BY" in q["sql"]]
+        self.assertEqual(len(grouped), 0)
+        self.assertEqual(len(response.data["results"]), 2)
+        counts = {f["id"]: f["count"] for f in response.data["facets"]["category"]}
+        self.assertEqual(counts, {self.category.id: 2, other.id: 2})
+
+    def test_book_list_search_loads_only_page(self):
+        """검색 결과는 Python에서 페이지를 자르고 해당 페이지 도서만 조회"""
+        books = [
+            create_book(self.category, title=f"소년 {i}", author="작가")
+            for i in range(20)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("book-list"), {"search": "소년", "page": 2}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 21)
+        self.assertEqual(len(response.data["results"]), 9)
+
+        # 카드 조회 쿼리에는 현재 페이지의 ID만 전달
+        page_ids = [b["id"] for b in response.data["results"]]
+        card_queries = [q["sql"] for q in queries if '"card"' in q["sql"]]
+        self.assertEqual(len(card_queries), 1)
+        other_ids = {b.id for b in books} - set(page_ids)
+        self.assertTrue(
+            all(f" {book_id}," not in card_queries[0] for book_id in other_ids)
+        )
+
+    def test_index_version_survives_cache_clear(self):
+        """캐시가 비워진 뒤 추가된 도서도 검색됨 (이전 색인 버전과 겹치지 않음)"""
+        cache.clear()
+        book = create_book(self.category, title="채식주의자", author="한강")
+        response = self.client.get(reverse("search-books"), {"q": "채식"})
+        self.assertEqual([b["id"] for b in response.data], [book.id])
+
+        # 버전 키가 사라진 뒤 도서 추가 (카운터였다면 이전과 같은 버전)
+        cache.clear()
+        book = create_book(self.category, title="흰", author="한강")
+        response = self.client.get(reverse("search-books"), {"q": "흰"})
+        self.assertEqual([b["id"] for b in response.data], [book.id])
+
+    def test_latin_partial_word_endpoints(self):
+        """검색 API/목록 검색 모두 영문 단어 일부로 검색"""
+        book = create_book(self.category, title="Python Cookbook", author="Beazley")
+        response = self.client.get(reverse("search-books"), {"q": "cook"})
+        self.assertEqual([b["id"] for b in response.data], [book.id])
+        response = self.client.get(reverse("book-list"), {"search": "PYTHON cook"})
+        self.assertEqual([b["id"] for b in response.data["results"]], [book.id])
+
+    def test_chosung_search_endpoint(self):
+        """초성 검색어는 초성 색인에서 조회"""
+        response = self.client.get(reverse("search-books"), {"q": "ㅅㄴㅇ"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([b["id"] for b in response.data], [self.book1.id])
+
+    def test_suggest_endpoint(self):
+        """자동완성 API는 카드 데이터를 반환"""
+        response = self.client.get(reverse("suggest-books"), {"q": "소년"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]["id"], self.book1.id)
+        self.assertEqual(response.data[0]["title"], "소년이 온다")
+
+        response = self.client.get(reverse("suggest-books"), {"q": "ㅋㅅ"})
+        self.assertEqual([b["id"] for b in response.data], [self.book2.id])
+
+    def test_search_tokens_saved_on_write(self):
+        """도서 저장 시 검색 토큰이 미리 분석되어 저장됨"""
+        self.book1.refresh_from_db()
+        self.assertEqual(self.book1.search_tokens["analyzer"], "ngram-v2")
+        self.assertIn("소년", self.book1.search_tokens["title"])
+
+    def test_index_refreshes_on_book_save(self):
+        """도서 추가 시 색인이 갱신됨"""
+        self.client.get(reverse("search-books"), {"q": "채식"})
+        create_book(self.category, title="채식주의자", author="한강")
+        response = self.client.get(reverse("search-books"), {"q": "채식주의자"})
+        self.assertEqual(len(response.data), 1)
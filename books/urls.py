@@ -31,6 +31,18 @@ urlpatterns = [
     path("api/books/random/", views.random_books, name="random-books"),
     path("api/threads/popular/", views.popular_threads, name="popular-threads"),
     path("api/books/search/", views.search_books, name="search-books"),
+    path(
+        "api/books/search/cache-stats/",
+        views.search_cache_stats,
+        name="search-cache-stats",
+    ),
+    path("api/books/suggest/", views.suggest_books, name="suggest-books"),
+    path("api/books/batch/", views.batch_books, name="batch-books"),
+    path(
+        "api/books/semantic-search/",
+        views.semantic_search_books,
+        name="semantic-search-books",
+    ),
     # ViewSet 기반 URL (권장)
     path("api/", include(router.urls)),
     path("api/", include(threads_router.urls)),
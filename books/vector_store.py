@@ -0,0 +1,212 @@
+"""
+임베딩 벡터 파일 저장소
+- 정규화된 float32 행렬(.npy)과 도서 ID 배열(.npy)을 EMBEDDING_STORE_DIR에 저장
+- 워커는 np.load(mmap_mode="r")로 읽어 같은 서버의 gunicorn 워커들이 페이지 캐시를 공유
+- manifest.json을 마지막에 원자적으로 교체하므로 읽는 쪽은 항상 완성된 파일만 봄
+- 직전 버전 파일은 다음 기록 때까지 남겨 이전 manifest를 읽은 워커도 파일을 열 수 있음
+- ANN 인덱스(ivf-<버전>.npz)를 같은 버전으로 함께 저장 (manifest의 "ann" 항목)
+"""
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from .embeddings import (
+    EMBEDDING_DTYPE,
+    EMBEDDING_MODEL_NAME,
+    bytes_to_vector,
+    normalize_rows,
+)
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+STORE_FILE_PATTERNS = ("vectors-*.npy", "ids-*.npy", "ivf-*.npz")
+
+
+def store_dir(directory=None):
+    return Path(directory or settings.EMBEDDING_STORE_DIR)
+
+
+def read_manifest(directory=None):
+    """저장소 manifest 반환 (없으면 None)"""
+    path = store_dir(directory) / MANIFEST_NAME
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _replace_manifest(directory, manifest):
+    tmp_path = directory / f"{MANIFEST_NAME}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, directory / MANIFEST_NAME)
+
+
+def _save_ann_index(directory, manifest, matrix, options):
+    """ANN 인덱스를 만들어 manifest 버전으로 저장 (manifest["ann"] 갱신)"""
+    from .ann_index import IVFIndex
+
+    ivf = IVFIndex.build(
+        matrix, n_lists=options.get("lists") or None, nprobe=options["nprobe"]
+    )
+    file_name = f"ivf-{manifest['version']}.npz"
+    tmp_path = directory / f"{file_name}.tmp"
+    ivf.save(tmp_path)
+    os.replace(tmp_path, directory / file_name)
+    manifest["ann"] = {**options, "file": file_name, "n_lists": ivf.n_lists}
+    return ivf
+
+
+def _manifest_files(manifest):
+    files = {manifest["vectors"], manifest["ids"]}
+    if manifest.get("ann"):
+        files.add(manifest["ann"]["file"])
+    return files
+
+
+def _remove_old_files(directory, *manifests):
+    """주어진 manifest들이 가리키지 않는 저장소 파일 삭제"""
+    keep = set()
+    for manifest in manifests:
+        if manifest:
+            keep |= _manifest_files(manifest)
+    for pattern in STORE_FILE_PATTERNS:
+        for path in directory.glob(pattern):
+            if path.name not in keep:
+                path.unlink(missing_ok=True)
+
+
+def write_vector_store(book_ids, matrix, directory=None):
+    """
+    도서 ID와 임베딩 행렬을 저장소에 기록 (행 단위 L2 정규화 후 float32)
+    반환값: 새 manifest
+    """
+    directory = store_dir(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    book_ids = np.asarray(book_ids, dtype=np.int64)
+    matrix = normalize_rows(matrix).astype(EMBEDDING_DTYPE, copy=False)
+    if matrix.ndim != 2 or len(matrix) != len(book_ids):
+        raise ValueError("도서 ID 수와 임베딩 행 수가 다릅니다.")
+
+    version = f"{time.time_ns():x}"
+    manifest = {
+        "version": version,
+        "model": EMBEDDING_MODEL_NAME,
+        "count": int(matrix.shape[0]),
+        "dim": int(matrix.shape[1]),
+        "vectors": f"vectors-{version}.npy",
+        "ids": f"ids-{version}.npy",
+    }
+    np.save(directory / manifest["vectors"], np.ascontiguousarray(matrix))
+    np.save(directory / manifest["ids"], book_ids)
+
+    # 이전 버전에 ANN 인덱스가 있었으면 같은 설정으로 다시 생성
+    previous = read_manifest(directory)
+    if previous and previous.get("ann"):
+        options = {
+            key: previous["ann"][key]
+            for key in ("lists", "nprobe")
+            if key in previous["ann"]
+        }
+        _save_ann_index(directory, manifest, matrix, options)
+
+    _replace_manifest(directory, manifest)
+
+    # 새 버전과 직전 버전을 제외한 이전 파일 정리
+    # (직전 manifest를 읽고 아직 파일을 열지 않은 워커가 있을 수 있음)
+    _remove_old_files(directory, manifest, previous)
+
+    logger.info(
+        f"💾 [VectorStore] 저장 완료: {manifest['count']}권 x {manifest['dim']}차원"
+    )
+    return manifest
+
+
+def read_vector_store(directory=None, mmap=True):
+    """
+    저장소의 (도서 ID 배열, 임베딩 행렬, manifest) 반환
+    mmap=True면 행렬을 읽기 전용 메모리 맵으로 열어 프로세스 간 페이지 공유
+    저장소가 없거나 다른 모델로 만든 경우 None
+    """
+    manifest = read_manifest(directory)
+    if manifest is None:
+        return None
+    if manifest.get("model") != EMBEDDING_MODEL_NAME:
+        logger.warning(f"⚠️ 임베딩 저장소 모델 불일치: {manifest.get('model')}")
+        return None
+
+    directory = store_dir(directory)
+    book_ids = np.load(directory / manifest["ids"])
+    matrix = np.load(directory / manifest["vectors"], mmap_mode="r" if mmap else None)
+    return book_ids, matrix, manifest
+
+
+def write_ann_index(lists=0, nprobe=None, directory=None):
+    """
+    현재 저장소 버전의 ANN 인덱스 생성 후 manifest에 기록
+    lists=0이면 도서 수에 맞춰 목록 수 결정, 이후 저장소를 다시 쓸 때도 같은 설정으로 재생성
+    반환값: IVFIndex
+    """
+    from .ann_index import DEFAULT_NPROBE
+
+    stored = read_vector_store(directory)
+    if stored is None:
+        raise ValueError(
+            "임베딩 저장소가 없습니다. build_vector_store를 먼저 실행하세요."
+        )
+    _, matrix, manifest = stored
+
+    directory = store_dir(directory)
+    previous_file = manifest.get("ann", {}).get("file")
+    options = {"lists": lists, "nprobe": nprobe or DEFAULT_NPROBE}
+    ivf = _save_ann_index(directory, manifest, matrix, options)
+    _replace_manifest(directory, manifest)
+    if previous_file and previous_file != manifest["ann"]["file"]:
+        (directory / previous_file).unlink(missing_ok=True)
+
+    logger.info(
+        f"💾 [VectorStore] ANN 인덱스 저장 완료: 목록 {ivf.n_lists}개, nprobe {ivf.nprobe}"
+    )
+    return ivf
+
+
+def read_ann_index(manifest, directory=None):
+    """manifest 버전의 ANN 인덱스 반환 (없으면 None)"""
+    from .ann_index import IVFIndex
+
+    ann = manifest.get("ann")
+    if not ann:
+        return None
+    path = store_dir(directory) / ann["file"]
+    try:
+        ivf = IVFIndex.load(path)
+    except FileNotFoundError:
+        return None
+    if len(ivf) != manifest["count"]:
+        logger.warning(f"⚠️ ANN 인덱스 크기 불일치: {path}")
+        return None
+    return ivf
+
+
+def export_vector_store(directory=None):
+    """DB의 BookEmbedding.vector 전체를 저장소로 내보내기 (반환값: manifest)"""
+    from .models import BookEmbedding
+
+    book_ids, vectors = [], []
+    rows = BookEmbedding.objects.exclude(vector=None).order_by("book_id")
+    for book_id, data in rows.values_list("book_id", "vector").iterator():
+        if data:
+            book_ids.append(book_id)
+            vectors.append(bytes_to_vector(data))
+    if not vectors:
+        return None
+    return write_vector_store(book_ids, np.vstack(vectors), directory)
@@ -0,0 +1,43 @@
+"""
+캐시 버전 토큰
+- 캐시 키/ETag에 쓰는 리소스별 버전 (도서 색인, 임베딩, 카테고리, 도서 상세)
+- 증가하는 숫자 대신 무작위 토큰을 저장하므로 캐시가 비워지거나 키가 만료돼도
+  이전 버전 값이 다시 나오지 않음 (프로세스 내 색인/ETag가 잘못 일치하지 않음)
+- 키 개수가 요청에 따라 늘어나는 버전(도서별 상세)은 timeout을 지정해 만료시킴
+  (만료된 토큰은 새 버전으로 취급)
+"""
+
+import uuid
+
+from django.core.cache import cache
+
+
+def new_token():
+    return uuid.uuid4().hex[:12]
+
+
+def get_version(key, timeout=None):
+    """버전 토큰 조회 (없으면 새 토큰을 만들어 저장, 동시에 만들어도 하나만 사용)"""
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, new_token(), timeout)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(keys, timeout=None):
+    """
+    여러 버전 토큰을 한 번에 조회 {key: version}
+    없는 키는 새 토큰을 만들어 한 번에 저장 (동시에 덮어써도 새 토큰이므로 무효화는 유지)
+    """
+    versions = cache.get_many(keys)
+    missing = {key: new_token() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout)
+        versions.update(missing)
+    return versions
+
+
+def bump_version(key, timeout=None):
+    """새 버전 토큰 저장 (해당 버전을 쓰는 캐시/ETag 무효화)"""
+    cache.set(key, new_token(), timeout)
@@ -1,19 +1,20 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from django.shortcuts import get_object_or_404
 from django.core.cache import cache
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models import Prefetch
 import logging
 
 logger = logging.getLogger(__name__)
 from django.conf import settings
-from .models import Book, Thread, Category, Comment, Reply, BookEmbedding
+from .models import Book, Thread, Category, Comment, Reply, BookEmbedding, RelatedBook
 from .serializers import (
     BookListSerializer,
     BookDetailSerializer,
+    RelatedBookSerializer,
     ThreadListSerializer,
     ThreadCreateSerializer,
     ThreadUpdateSerializer,
@@ -24,62 +25,199 @@ from .serializers import (
     ReplyCreateSerializer,
 )
 from .utils import create_thread_image
+from .search_index import book_categories, current_version, search_book_ids
+from .search_cache import normalize_query, search_cache
+from .suggest import get_suggestions
+from .embedding_worker import EmbeddingWorkerError
+from .embeddings import semantic_search, vectors_version
+from .etags import category_version, make_etag, not_modified
+from .hybrid_search import StageTimer, hybrid_search_ids
+from .facets import build_facets, requested_facets
+from .cards import CARD_COLUMNS, card_list, cards_in_order
+from .detail_cache import (
+    RELATED_DEFAULT,
+    apply_user_overlay,
+    detail_cache_key,
+    detail_cache_keys,
+    detail_version,
+    related_limit,
+    request_saved_book_ids,
+    saved_book_ids,
+)
+from .fieldsets import fieldset_cache_key, narrow_queryset
+from .pagination import (
+    BookCursorPagination,
+    OptionalCursorPaginationMixin,
+    ThreadCursorPagination,
+)
 from accounts.permissions import IsAuthorOrReadOnly
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 일괄 조회 API 최대 도서 수
+BATCH_MAX_IDS = 100
+
+
+def with_related_books(queryset, limit=RELATED_DEFAULT):
+    """
+    상세 응답용 연관 도서를 미리 가져오는 queryset (임베딩 벡터는 제외)
+    (embedding, rank) 인덱스로 순위 상위 limit개만 조회
+    """
+    related_book_fields = [f"book__{f}" for f in RelatedBookSerializer.Meta.fields]
+    return queryset.prefetch_related(
+        Prefetch("embedding", queryset=BookEmbedding.objects.defer("vector")),
+        Prefetch(
+            "embedding__related_entries",
+            queryset=RelatedBook.objects.filter(rank__lt=limit)
+            .select_related("book")
+            .only("embedding", "rank", "score", *related_book_fields),
+        ),
+    )
+
 
-class BookViewSet(viewsets.ReadOnlyModelViewSet):
+class BookViewSet(OptionalCursorPaginationMixin, viewsets.ReadOnlyModelViewSet):
     """
     지침에 따른 Book ViewSet
     - 읽기 전용 (목록, 상세)
     - 캐시 최적화
     - 카테고리 필터링
+    - 검색 (mode=hybrid 시 키워드 + 벡터 결합)
+    - 커서 페이지네이션 (?pagination=cursor, 검색 시에는 페이지 번호 방식)
+    - 카테고리별 건수 패싯 (?facets=category)
+    - 희소 필드셋 (?fields=id,title / ?exclude=description)
+    - ETag / If-None-Match 조건부 응답 (304)
     """
 
     queryset = Book.objects.all()
     permission_classes = [AllowAny]
+    cursor_pagination_class = BookCursorPagination
+    search_timer = None
+    # 카테고리 필터 적용 전 queryset (패싯 집계용)
+    facet_queryset = None
+
+    def use_cursor_pagination(self):
+        # 검색 결과는 랭킹순이라 id 키셋으로 자를 수 없음
+        if self.request.query_params.get("search"):
+            return False
+        return super().use_cursor_pagination()
 
     def get_serializer_class(self):
         if self.action == "list":
             return BookListSerializer
         return BookDetailSerializer
 
+    def category_filter(self):
+        """?category= 카테고리 ID (없거나 잘못된 값이면 None)"""
+        category_pk = self.request.query_params.get("category")
+        if category_pk and category_pk != "null":
+            try:
+                return int(category_pk)
+            except (ValueError, TypeError):
+                pass  # 잘못된 카테고리 값은 무시
+        return None
+
+    def search_ids(self, search_query):
+        """
+        검색어의 랭킹순 도서 ID와 도서별 카테고리 {book_id: category_id}
+        (mode=hybrid 시 키워드 + 임베딩 결과를 RRF로 결합)
+        """
+        logger.info(f"🔍 [BookViewSet] 검색어: {search_query}")
+        self.search_timer = StageTimer()
+        if self.request.query_params.get("mode") == "hybrid":
+            book_ids = hybrid_search_ids(search_query, timer=self.search_timer)
+        else:
+            # 역색인에서 BM25 랭킹순 ID 조회 (테이블 스캔 없음)
+            with self.search_timer.measure("lexical"):
+                book_ids = search_book_ids(search_query)
+        # 색인에 없는(삭제된) 도서 제외
+        categories = book_categories(book_ids)
+        book_ids = [book_id for book_id in book_ids if book_id in categories]
+        logger.info(f"🔍 [BookViewSet] 검색 결과 수: {len(book_ids)}")
+        return book_ids, categories
+
     def get_queryset(self):
         queryset = Book.objects.all()
 
-        # 검색 기능
-        search_query = self.request.query_params.get("search")
-        if search_query:
-            logger.info(f"🔍 [BookViewSet] 검색어: {search_query}")
-            queryset = queryset.filter(
-                Q(title__icontains=search_query)
-                | Q(author__icontains=search_query)
-                | Q(publisher__icontains=search_query)
-                | Q(description__icontains=search_query)
-            )
-            logger.info(f"🔍 [BookViewSet] 검색 결과 수: {queryset.count()}")
+        # 패싯은 선택한 카테고리 외의 건수도 보여주도록 필터 전 결과로 집계
+        self.facet_queryset = queryset
 
         # 카테고리 필터링
-        category_pk = self.request.query_params.get("category")
-        if category_pk and category_pk != "null":
-            try:
-                category_pk = int(category_pk)
-                queryset = queryset.filter(category_id=category_pk)
-                logger.info(
-                    f"📂 [BookViewSet] 카테고리 필터링: {category_pk}, 결과 수: {queryset.count()}"
+        category_pk = self.category_filter()
+        if category_pk is not None:
+            queryset = queryset.filter(category_id=category_pk)
+            logger.info(
+                f"📂 [BookViewSet] 카테고리 필터링: {category_pk}, 결과 수: {queryset.count()}"
+            )
+
+        # 상세 조회: 연관 도서를 미리 가져와 쿼리 수를 고정
+        if self.action == "retrieve":
+            queryset = with_related_books(queryset, related_limit(self.request))
+
+        # 요청된 필드에 필요한 컬럼만 조회
+        return narrow_queryset(queryset, self.get_serializer_class(), self.request)
+
+    def search_list(self, request, search_query, facets):
+        """
+        검색 결과 목록 (랭킹순 ID 목록을 페이지 단위로 잘라 해당 페이지만 조회)
+        카테고리 필터/패싯은 색인의 도서별 카테고리로 계산하므로
+        검색 결과 ID 전체를 DB로 보내지 않음
+        """
+        book_ids, categories = self.search_ids(search_query)
+
+        category_pk = self.category_filter()
+        if category_pk is not None:
+            book_ids = [
+                book_id for book_id in book_ids if categories[book_id] == category_pk
+            ]
+
+        page_ids = self.paginate_queryset(book_ids)
+        with self.search_timer.measure("hydrate"):
+            if page_ids is not None:
+                response = self.get_paginated_response(
+                    cards_in_order(page_ids, request)
                 )
-            except (ValueError, TypeError):
-                pass  # 잘못된 카테고리 값은 무시
+            else:
+                response = Response(cards_in_order(book_ids, request))
 
-        return queryset
+        if facets:
+            response.data["facets"] = build_facets(facets, book_categories=categories)
+        return response
+
+    def list_etag(self, request):
+        """도서/카테고리(/임베딩) 버전과 쿼리 파라미터로 목록 ETag 계산"""
+        versions = [current_version(), category_version()]
+        if request.GET.get("mode") == "hybrid":
+            versions.append(vectors_version())
+        return make_etag("book_list", *versions, request.GET.urlencode())
+
+    def detail_etag(self, request, book_id):
+        """도서 상세 버전, 필드셋, 현재 사용자의 저장 여부로 상세 ETag 계산"""
+        user = request.user
+        is_saved = user.is_authenticated and int(book_id) in saved_book_ids(user)
+        return make_etag(
+            "book_detail",
+            book_id,
+            detail_version(book_id),
+            fieldset_cache_key(request),
+            related_limit(request),
+            int(is_saved),
+        )
 
     def list(self, request, *args, **kwargs):
         """캐시된 도서 목록 반환"""
+        # 버전이 같으면 검색/DB 조회 없이 304
+        etag = self.list_etag(request)
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
         category_pk = request.GET.get("category", "all")
-        search_query = request.GET.get("search", "")
+        search_query = normalize_query(request.GET.get("search", ""))
+        mode = request.GET.get("mode", "lexical")
         page = request.GET.get("page", "1")
+        cursor = request.GET.get("cursor", "")
+        facets = requested_facets(request)
 
         logger.info(
             f"📚 [BookViewSet] list 호출 - category: {category_pk}, search: {search_query}, page: {page}"
@@ -88,7 +226,9 @@ class BookViewSet(viewsets.ReadOnlyModelViewSet):
         # 검색어와 카테고리를 포함한 캐시 키 생성
         cache_key = (
             f"{settings.CACHE_KEY_PREFIX}:book_list:"
-            f"cat_{category_pk}:search_{search_query}:page_{page}"
+            f"cat_{category_pk}:search_{search_query}:mode_{mode}:page_{page}"
+            f":cursor_{cursor}:facets_{','.join(facets)}"
+            f":{fieldset_cache_key(request)}"
         )
 
         # 임시로 캐시 비활성화
@@ -97,36 +237,75 @@ class BookViewSet(viewsets.ReadOnlyModelViewSet):
         #     logger.info(f"📚 [CACHE HIT] Book list: {cache_key}")
         #     return Response(cached)
 
-        response = super().list(request, *args, **kwargs)
+        raw_search = request.query_params.get("search")
+        if raw_search:
+            response = self.search_list(request, raw_search, facets)
+        else:
+            # 비정규화된 카드 컬럼만 조회 (카테고리 JOIN/시리얼라이저 없음)
+            queryset = self.filter_queryset(self.get_queryset()).values(*CARD_COLUMNS)
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                response = self.get_paginated_response(card_list(page, request))
+            else:
+                response = Response(card_list(queryset, request))
+
+            if facets and response.status_code == 200:
+                response.data["facets"] = build_facets(facets, self.facet_queryset)
         logger.info(f"📚 [BookViewSet] 응답 데이터: {response.data}")
 
+        if self.search_timer is not None:
+            response["Server-Timing"] = self.search_timer.header()
+
         if response.status_code == 200:
             cache.set(cache_key, response.data, settings.CACHE_TTL)
             logger.info(f"📚 [CACHE SET] Book list: {cache_key}")
+            response["ETag"] = etag
 
         return response
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == "retrieve":
+            # 공용 캐시용 응답은 사용자와 무관하게 생성 (is_saved는 오버레이로 채움)
+            context["saved_book_ids"] = frozenset()
+            context["related_limit"] = related_limit(self.request)
+        return context
+
     def retrieve(self, request, *args, **kwargs):
-        """캐시된 도서 상세 정보 반환 (연관 도서 포함)"""
+        """
+        캐시된 도서 상세 정보 반환 (연관 도서 포함)
+        사용자와 무관한 응답을 도서당 하나만 캐싱하고 is_saved는 요청마다 덮어씁니다.
+        """
         book_id = kwargs.get("pk")
-        # 연관 도서 정보를 포함하는 캐시 키
-        cache_key = f"{settings.CACHE_KEY_PREFIX}:book_detail_with_related:{book_id}"
+        if not str(book_id).isdigit():
+            return super().retrieve(request, *args, **kwargs)
+
+        etag = self.detail_etag(request, book_id)
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+        cache_key = detail_cache_key(book_id, request)
 
         cached = cache.get(cache_key)
         if cached:
             logger.info(f"📖 [CACHE HIT] Book detail with related: {cache_key}")
-            return Response(cached)
+            response = Response(apply_user_overlay(cached, request, book_id))
+            response["ETag"] = etag
+            return response
 
         response = super().retrieve(request, *args, **kwargs)
 
         if response.status_code == 200:
             cache.set(cache_key, response.data, settings.CACHE_TTL)
             logger.info(f"📖 [CACHE SET] Book detail with related: {cache_key}")
+            response.data = apply_user_overlay(response.data, request, book_id)
+            response["ETag"] = etag
 
         return response
 
 
-class ThreadViewSet(viewsets.ModelViewSet):
+class ThreadViewSet(OptionalCursorPaginationMixin, viewsets.ModelViewSet):
     """
     지침에 따른 Thread ViewSet
     - CRUD 전체 지원
@@ -137,6 +316,16 @@ class ThreadViewSet(viewsets.ModelViewSet):
 
     queryset = Thread.objects.all().order_by("-created_at")
     permission_classes = [IsAuthenticated]
+    cursor_pagination_class = ThreadCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # 조회 시에만 요청된 필드의 컬럼으로 제한 (수정/삭제는 전체 컬럼)
+        if self.action in ("list", "retrieve"):
+            queryset = narrow_queryset(
+                queryset, self.get_serializer_class(), self.request
+            )
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -320,6 +509,7 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     카테고리 ViewSet
     - 읽기 전용 (목록만 제공)
     - 캐시 최적화
+    - ETag / If-None-Match 조건부 응답 (304)
     """
 
     queryset = Category.objects.all()
@@ -327,12 +517,21 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
 
     def list(self, request, *args, **kwargs):
         """캐시된 카테고리 목록 반환"""
-        cache_key = f"{settings.CACHE_KEY_PREFIX}:category_list"
+        version = category_version()
+        etag = make_etag("category_list", version)
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+        # 카테고리 변경 시 버전이 바뀌어 새 캐시 키 사용
+        cache_key = f"{settings.CACHE_KEY_PREFIX}:category_list:v{version}"
 
         cached = cache.get(cache_key)
         if cached:
             logger.info(f"📂 [CACHE HIT] Category list: {cache_key}")
-            return Response(cached)
+            response = Response(cached)
+            response["ETag"] = etag
+            return response
 
         categories = Category.objects.all()
         data = [{"pk": cat.pk, "fields": {"name": cat.name}} for cat in categories]
@@ -340,7 +539,9 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
         cache.set(cache_key, data, settings.CACHE_TTL)
         logger.info(f"📂 [CACHE SET] Category list: {cache_key}")
 
-        return Response(data)
+        response = Response(data)
+        response["ETag"] = etag
+        return response
 
 
 # 기존 함수 기반 뷰들 (호환성 유지용)
@@ -764,32 +965,201 @@ class ReplyViewSet(viewsets.ModelViewSet):
 
 @api_view(["GET"])
 def search_books(request):
-    """도서 검색 API"""
-    query = request.GET.get("q", "")
+    """
+    도서 검색 API
+    - 기본: 제목/저자/출판사 키워드 검색
+    - mode=hybrid: 키워드 + 임베딩 검색 결과를 RRF로 결합
+    - facets=category: {"results": [...], "facets": {"category": [...]}} 형태로 반환
+    단계별 소요 시간은 Server-Timing 헤더로 반환합니다.
+    """
+    query = normalize_query(request.GET.get("q", ""))
+    mode = request.GET.get("mode", "lexical")
+    facets = requested_facets(request)
 
     if not query:
+        return Response({"results": [], "facets": {}} if facets else [])
+
+    # 정규화된 검색어 + 색인(/임베딩) 버전으로 캐시 키 생성 (도서 변경 시 자동 무효화)
+    versions = [current_version()]
+    if mode == "hybrid":
+        versions.append(vectors_version())
+    cache_key = search_cache.make_key(
+        "book_search",
+        query,
+        mode,
+        ",".join(facets),
+        fieldset_cache_key(request),
+        *versions,
+    )
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return Response(cached)
+
+    timer = StageTimer()
+    fields = ("title", "author", "publisher")
+    if mode == "hybrid":
+        book_ids = hybrid_search_ids(query, fields=fields, timer=timer)
+    else:
+        # 제목, 저자, 출판사 역색인에서 검색 (랭킹순)
+        with timer.measure("lexical"):
+            book_ids = search_book_ids(query, fields=fields)
+
+    # 후보 ID의 카드를 한 번의 쿼리로 조회 (JOIN/N+1 없음)
+    with timer.measure("hydrate"):
+        data = cards_in_order(book_ids, request)
+
+    # 색인의 도서별 카테고리로 패싯 집계 (DB 조회 없음, 결과 페이지와 함께 캐싱)
+    if facets:
+        with timer.measure("facets"):
+            facet_data = build_facets(facets, book_categories=book_categories(book_ids))
+        data = {"results": data, "facets": facet_data}
+
+    # 반복 조회된 검색어만 캐싱
+    search_cache.set(cache_key, data)
+
+    response = Response(data)
+    response["Server-Timing"] = timer.header()
+    return response
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def batch_books(request):
+    """
+    도서 상세 일괄 조회 API (?ids=3,1,2, 최대 100권)
+    - 도서별 상세 캐시를 한 번에 조회(MGET)하고 미스만 in_bulk 한 번으로 조회
+    - 조회한 상세는 한 번에 캐시에 저장(파이프라인)
+    - 입력 순서 유지, 없는 ID는 제외
+    """
+    try:
+        book_ids = [int(i) for i in request.GET.get("ids", "").split(",") if i.strip()]
+    except ValueError:
+        return Response(
+            {"error": "ids는 쉼표로 구분된 숫자여야 합니다."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    book_ids = list(dict.fromkeys(book_ids))
+    if len(book_ids) > BATCH_MAX_IDS:
+        return Response(
+            {"error": f"한 번에 최대 {BATCH_MAX_IDS}권까지 조회할 수 있습니다."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if not book_ids:
         return Response([])
 
-    # 캐시 키 생성
-    cache_key = f"{settings.CACHE_KEY_PREFIX}:book_search:{query}"
-    cached = cache.get(cache_key)
-    if cached:
-        return Response(cached)
+    cache_keys = detail_cache_keys(book_ids, request)
+    cached = cache.get_many(list(cache_keys.values()))
+    details = {
+        book_id: cached[key] for book_id, key in cache_keys.items() if key in cached
+    }
+
+    missing = [book_id for book_id in book_ids if book_id not in details]
+    if missing:
+        limit = related_limit(request)
+        queryset = narrow_queryset(
+            with_related_books(Book.objects.all(), limit), BookDetailSerializer, request
+        )
+        context = {
+            "request": request,
+            "saved_book_ids": frozenset(),
+            "related_limit": limit,
+        }
+        loaded = {
+            book_id: BookDetailSerializer(book, context=context).data
+            for book_id, book in queryset.in_bulk(missing).items()
+        }
+        cache.set_many(
+            {cache_keys[book_id]: data for book_id, data in loaded.items()},
+            settings.CACHE_TTL,
+        )
+        details.update(loaded)
+        logger.info(f"📖 [CACHE SET] Book batch: {len(loaded)}/{len(book_ids)}권")
 
-    # 제목, 저자, 출판사, 설명에서 검색
-    books = Book.objects.filter(
-        Q(title__icontains=query)
-        | Q(author__icontains=query)
-        | Q(publisher__icontains=query)
-        # | Q(description__icontains=query)
+    # 사용자의 저장 도서 ID 집합은 도서마다가 아니라 한 번만 조회
+    saved_ids = request_saved_book_ids(request)
+    return Response(
+        [
+            apply_user_overlay(details[book_id], request, book_id, saved_ids)
+            for book_id in book_ids
+            if book_id in details
+        ]
     )
 
-    serializer = BookListSerializer(books, many=True)
 
-    # 결과 캐싱
-    cache.set(cache_key, serializer.data, settings.CACHE_TTL)
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def search_cache_stats(request):
+    """검색 캐시 적중률 통계 (관리자 전용, ?reset=1 이면 초기화)"""
+    stats = search_cache.stats()
+    if request.GET.get("reset") == "1":
+        search_cache.reset_stats()
+    return Response(stats)
 
-    return Response(serializer.data)
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def semantic_search_books(request):
+    """의미 기반 도서 검색 API (임베딩 코사인 유사도)"""
+    query = normalize_query(request.GET.get("q", ""))
+
+    if not query:
+        return Response([])
+
+    try:
+        limit = int(request.GET.get("limit", 10))
+        limit = max(1, min(limit, 50))  # 최대 50권으로 제한
+    except (ValueError, TypeError):
+        limit = 10
+
+    # 임베딩 재생성/도서 변경 시 자동 무효화
+    cache_key = search_cache.make_key(
+        "book_semantic_search", query, limit, vectors_version(), current_version()
+    )
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return Response(cached)
+
+    try:
+        results = semantic_search(query, limit)
+    except (ImportError, EmbeddingWorkerError) as e:
+        # 모델 미설치 또는 임베딩 워커 오류/타임아웃
+        logger.error(f"❌ 임베딩 모델을 사용할 수 없어 의미 검색 불가: {e}")
+        return Response(
+            {"error": "의미 검색을 사용할 수 없습니다."},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    book_ids = [book_id for book_id, _ in results]
+    books_by_id = Book.objects.select_related("category").in_bulk(book_ids)
+
+    data = []
+    for book_id, score in results:
+        if book_id in books_by_id:
+            item = BookListSerializer(books_by_id[book_id]).data
+            item["score"] = round(score, 4)
+            data.append(item)
+
+    search_cache.set(cache_key, data)
+
+    return Response(data)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def suggest_books(request):
+    """검색어 자동완성 API (메모리 접두어 색인, DB 조회 없음)"""
+    query = request.GET.get("q", "")
+
+    if not query.strip():
+        return Response([])
+
+    try:
+        limit = int(request.GET.get("limit", 10))
+        limit = max(1, min(limit, 20))  # 최대 20개로 제한
+    except (ValueError, TypeError):
+        limit = 10
+
+    return Response(get_suggestions(query, limit))
 
 
 @api_view(["GET"])
@@ -802,21 +1172,30 @@ def random_books(request):
     except (ValueError, TypeError):
         count = 10
 
-    # 캐시 키 생성
+    # 캐시 키 생성 (캐시에는 응답과 ETag를 함께 저장)
     cache_key = f"{settings.CACHE_KEY_PREFIX}:random_books:{count}"
     cached = cache.get(cache_key)
     if cached:
-        return Response(cached)
+        # 같은 랜덤 목록을 이미 받은 클라이언트는 304
+        response = not_modified(request, cached["etag"])
+        if response is None:
+            response = Response(cached["results"])
+            response["ETag"] = cached["etag"]
+        return response
 
     # 랜덤하게 도서 선택
-    books = Book.objects.order_by("?")[:count]
+    books = Book.objects.order_by("?").values(*CARD_COLUMNS)[:count]
+    data = card_list(books)
 
-    serializer = BookListSerializer(books, many=True)
+    # 새로 뽑을 때마다 다른 ETag (도서 버전 + 선택된 ID)
+    etag = make_etag("random_books", current_version(), *[b["id"] for b in data])
 
     # 결과 캐싱 (5분)
-    cache.set(cache_key, serializer.data, 300)
+    cache.set(cache_key, {"etag": etag, "results": data}, 300)
 
-    return Response(serializer.data)
+    response = Response(data)
+    response["ETag"] = etag
+    return response
 
 
 @api_view(["GET"])
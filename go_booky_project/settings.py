@@ -330,6 +330,17 @@ CACHES = {
     }
 }
 
+# 검색 형태소 분석기 (mecab-ko-dic 사전 경로, 비어 있으면 n-gram 분석기 사용)
+MECAB_DICDIR = env("MECAB_DICDIR", default="")
+
+# 임베딩 벡터 파일 저장소 (float32 .npy, 워커에서 메모리 맵으로 공유)
+EMBEDDING_STORE_DIR = env("EMBEDDING_STORE_DIR", default=str(BASE_DIR / "embeddings"))
+
+# 임베딩 워커 (run_embedding_worker) 사용 여부와 응답 대기 시간 (초)
+# 사용하지 않으면 웹 프로세스에서 직접 모델을 로드
+EMBEDDING_WORKER_ENABLED = env.bool("EMBEDDING_WORKER_ENABLED", default=False)
+EMBEDDING_WORKER_TIMEOUT = env.float("EMBEDDING_WORKER_TIMEOUT", default=2.0)
+
 # Cache timeout settings
 CACHE_TTL = env.int("CACHE_TTL")  # 15 minutes
 CACHE_KEY_PREFIX = env("CACHE_KEY_PREFIX")
@@ -47,3 +47,6 @@ EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 PASSWORD_HASHERS = [
     "django.contrib.auth.hashers.MD5PasswordHasher",
 ]
+
+# 테스트 시 임베딩 파일 저장소 (없으면 DB에서 적재)
+EMBEDDING_STORE_DIR = "/tmp/test_embeddings"